@@ -79,6 +79,20 @@ async function deleteAllChats() {
     });
 }
 
+// Tell Python to go home: through the DevTools binding when it is listening,
+// otherwise with a marker element that it polls for
+function signalChatsDeleted() {
+    if (typeof window.veoNavSignal === 'function') {
+        window.veoNavSignal('chats-deleted');
+        return;
+    }
+    const navSignal = document.createElement('div');
+    navSignal.id = 'veo-chats-deleted-go-home';
+    navSignal.style.display = 'none';
+    navSignal.setAttribute('data-timestamp', Date.now());
+    document.body.appendChild(navSignal);
+}
+
 // Function to be called when home button is clicked
 window.deleteAllChatsAndGoHome = async function() {
     // Starting chat deletion before going home
@@ -88,19 +102,12 @@ window.deleteAllChatsAndGoHome = async function() {
         // Chat deletion completed
         
         // Signal to Python that deletion is complete and ready to go home
-        const navSignal = document.createElement('div');
-        navSignal.id = 'veo-chats-deleted-go-home';
-        navSignal.style.display = 'none';
-        navSignal.setAttribute('data-timestamp', Date.now());
-        document.body.appendChild(navSignal);
+        signalChatsDeleted();
         
     } catch (error) {
         // Error during deletion
         // Go home anyway
-        const navSignal = document.createElement('div');
-        navSignal.id = 'veo-chats-deleted-go-home';
-        navSignal.style.display = 'none';
-        document.body.appendChild(navSignal);
+        signalChatsDeleted();
     }
 };
 
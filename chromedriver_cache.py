@@ -0,0 +1,143 @@
+"""ChromeDriver paths cached by installed Chrome major version"""
+
+import json
+import os
+import platform
+import stat
+import threading
+
+try:
+    import winreg
+    WINREG_AVAILABLE = True
+except ImportError:
+    WINREG_AVAILABLE = False
+
+MAC_CHROME_PLIST = '/Applications/Google Chrome.app/Contents/Info.plist'
+
+
+def _version_from_registry():
+    if not WINREG_AVAILABLE:
+        return None
+    for hive in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+        try:
+            with winreg.OpenKey(hive, r'Software\Google\Chrome\BLBeacon') as key:
+                return winreg.QueryValueEx(key, 'version')[0]
+        except OSError:
+            continue
+    return None
+
+
+def _version_from_plist():
+    try:
+        import plistlib
+        with open(MAC_CHROME_PLIST, 'rb') as f:
+            return plistlib.load(f).get('CFBundleShortVersionString')
+    except (OSError, ValueError):
+        return None
+
+
+def _version_from_profile(user_data_dir):
+    # Chrome records the version that last used the profile
+    try:
+        with open(os.path.join(user_data_dir, 'Last Version'), 'r', encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def detect_chrome_version(user_data_dir=None):
+    """Installed Chrome version without spawning Chrome, or None if unknown"""
+    system = platform.system()
+    version = None
+    if system == 'Windows':
+        version = _version_from_registry()
+    elif system == 'Darwin':
+        version = _version_from_plist()
+    if not version and user_data_dir:
+        version = _version_from_profile(user_data_dir)
+    return version
+
+
+class ChromeDriverCache:
+    """Remembers which ChromeDriver binary works with each Chrome major version
+
+    lookup() answers from a small JSON file plus a couple of file reads, so a
+    warm start never needs webdriver_manager or the network. If Chrome was
+    updated and the cached driver no longer matches, invalidate() drops the
+    entry and the next resolution goes through webdriver_manager again.
+    """
+
+    def __init__(self, cache_path, user_data_dir=None):
+        self.cache_path = cache_path
+        self.user_data_dir = user_data_dir
+        self._lock = threading.Lock()
+        self._major = None
+
+    def chrome_major(self):
+        """Major version of the installed Chrome (detected once per run)"""
+        if self._major is None:
+            version = detect_chrome_version(self.user_data_dir)
+            self._major = version.split('.')[0] if version else ''
+        return self._major or None
+
+    def _load(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, cache):
+        try:
+            with open(self.cache_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, indent=2)
+        except OSError as e:
+            print(f"Could not save ChromeDriver cache: {e}")
+
+    def lookup(self):
+        """Cached driver path for the installed Chrome, or None"""
+        major = self.chrome_major()
+        if not major:
+            return None
+        with self._lock:
+            driver_path = self._load().get(major)
+        if driver_path and os.path.isfile(driver_path):
+            ensure_executable(driver_path)
+            return driver_path
+        return None
+
+    def store(self, driver_path, chrome_version=None):
+        """Remember driver_path for chrome_version (default: the detected version)"""
+        major = chrome_version.split('.')[0] if chrome_version else self.chrome_major()
+        if not major:
+            return
+        self._major = major
+        with self._lock:
+            cache = self._load()
+            cache[major] = driver_path
+            self._save(cache)
+
+    def invalidate(self, driver_path):
+        """Forget driver_path; returns True if it was cached"""
+        with self._lock:
+            cache = self._load()
+            stale = [major for major, path in cache.items() if path == driver_path]
+            for major in stale:
+                del cache[major]
+            if stale:
+                self._save(cache)
+        # Detect again in case Chrome was just updated
+        self._major = None
+        return bool(stale)
+
+
+def ensure_executable(driver_path):
+    """Set the execute bit if it is missing (no-op on Windows)"""
+    if platform.system() == 'Windows':
+        return
+    try:
+        mode = os.stat(driver_path).st_mode
+        if not mode & stat.S_IXUSR:
+            os.chmod(driver_path, mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    except OSError as e:
+        print(f"Warning: Could not set execute permissions: {e}")
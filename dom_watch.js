@@ -0,0 +1,264 @@
+// Shared DOM watch runtime - one MutationObserver for every page script
+// Scripts register a handler with veoDomWatch.watch(name, run, options) instead of
+// running their own subtree observer and setInterval poller. Mutations only mark
+// handlers dirty; dirty handlers run together once per animation frame (or idle
+// period), and each handler's cost is tracked for veoDomWatch.report().
+(function() {
+    if (window.veoDomWatch) return;
+
+    // A single handler run longer than this gets one console warning
+    const SLOW_HANDLER_MS = 16;
+
+    const watchers = [];
+    const observerCost = { name: '(observer)', runs: 0, totalMs: 0, maxMs: 0 };
+    let observer = null;
+    let observedConfig = '';
+    let frameScheduled = false;
+    let idleScheduled = false;
+
+    function record(entry, started) {
+        const elapsed = performance.now() - started;
+        entry.runs++;
+        entry.totalMs += elapsed;
+        if (elapsed > entry.maxMs) entry.maxMs = elapsed;
+        return elapsed;
+    }
+
+    // Does node (added, removed or changed) concern a watcher with this selector?
+    function nodeMatches(node, selector) {
+        if (node.nodeType === Node.ELEMENT_NODE) {
+            return node.matches(selector) || !!node.querySelector(selector);
+        }
+        const parent = node.parentElement;
+        return !!(parent && parent.closest(selector));
+    }
+
+    function concerns(watcher, mutation) {
+        if (mutation.type === 'attributes') {
+            return !!watcher.attributes && watcher.attributes.includes(mutation.attributeName) &&
+                   (!watcher.selector || mutation.target.matches(watcher.selector));
+        }
+        if (mutation.type === 'characterData') {
+            return watcher.text && (!watcher.selector || nodeMatches(mutation.target, watcher.selector));
+        }
+        if (!watcher.selector) return true;
+        for (const node of mutation.addedNodes) {
+            if (nodeMatches(node, watcher.selector)) return true;
+        }
+        if (watcher.removals) {
+            for (const node of mutation.removedNodes) {
+                if (node.nodeType === Node.ELEMENT_NODE && nodeMatches(node, watcher.selector)) return true;
+            }
+            // A removed text node no longer has a parent; use the mutation target
+            if (mutation.removedNodes.length && mutation.target.closest && mutation.target.closest(watcher.selector)) {
+                return true;
+            }
+        }
+        return false;
+    }
+
+    // Like concerns(), but keeps the matching added nodes for the next run
+    function collectAdded(watcher, mutations) {
+        for (const mutation of mutations) {
+            if (!concerns(watcher, mutation)) continue;
+            watcher.dirty = true;
+            for (const node of mutation.addedNodes) {
+                if (!watcher.selector || nodeMatches(node, watcher.selector)) watcher.added.push(node);
+            }
+        }
+    }
+
+    function handleMutations(mutations) {
+        const started = performance.now();
+        for (const watcher of watchers) {
+            if (watcher.stopped) continue;
+            if (watcher.collect) {
+                collectAdded(watcher, mutations);
+                continue;
+            }
+            if (watcher.dirty) continue;
+            for (const mutation of mutations) {
+                if (concerns(watcher, mutation)) {
+                    watcher.dirty = true;
+                    break;
+                }
+            }
+        }
+        record(observerCost, started);
+        schedule();
+    }
+
+    // Observe only what some watcher needs: characterData and attributes are opt-in
+    function updateObserver() {
+        const root = document.documentElement;
+        if (!root) return;
+
+        const config = { childList: true, subtree: true };
+        const attributes = new Set();
+        for (const watcher of watchers) {
+            if (watcher.stopped) continue;
+            if (watcher.text) config.characterData = true;
+            (watcher.attributes || []).forEach(name => attributes.add(name));
+        }
+        if (attributes.size) {
+            config.attributes = true;
+            config.attributeFilter = Array.from(attributes);
+        }
+
+        const key = JSON.stringify(config);
+        if (observer && key === observedConfig) return;
+
+        if (observer) {
+            // Keep whatever was queued under the old configuration
+            const pending = observer.takeRecords();
+            observer.disconnect();
+            if (pending.length) handleMutations(pending);
+        } else {
+            observer = new MutationObserver(handleMutations);
+        }
+        observer.observe(root, config);
+        observedConfig = key;
+    }
+
+    function schedule() {
+        let frameWork = false;
+        let idleWork = false;
+        for (const watcher of watchers) {
+            if (!watcher.dirty || watcher.stopped || watcher.timer) continue;
+            if (watcher.idle) idleWork = true;
+            else frameWork = true;
+        }
+
+        if (frameWork && !frameScheduled) {
+            frameScheduled = true;
+            // Background tabs get no animation frames
+            if (document.hidden) setTimeout(flushFrame, 100);
+            else requestAnimationFrame(flushFrame);
+        }
+        if (idleWork && !idleScheduled) {
+            idleScheduled = true;
+            if (window.requestIdleCallback) requestIdleCallback(flushIdle, { timeout: 500 });
+            else setTimeout(flushIdle, 50);
+        }
+    }
+
+    function runWatcher(watcher) {
+        const wait = watcher.minInterval - (Date.now() - watcher.lastRun);
+        if (wait > 0) {
+            // Throttled: come back once the interval has passed
+            watcher.timer = setTimeout(() => {
+                watcher.timer = null;
+                schedule();
+            }, wait);
+            return;
+        }
+
+        watcher.dirty = false;
+        watcher.lastRun = Date.now();
+        const added = watcher.added;
+        if (added) watcher.added = [];
+        const started = performance.now();
+        try {
+            watcher.run(added);
+        } catch (e) {
+            console.error(`[DomWatch] ${watcher.name} failed:`, e);
+        }
+        const elapsed = record(watcher, started);
+        if (elapsed > SLOW_HANDLER_MS && !watcher.warned) {
+            watcher.warned = true;
+            console.warn(`[DomWatch] ${watcher.name} took ${elapsed.toFixed(1)}ms`);
+        }
+    }
+
+    function flush(idle) {
+        for (const watcher of watchers.slice()) {
+            if (watcher.dirty && !watcher.stopped && !watcher.timer && !!watcher.idle === idle) {
+                runWatcher(watcher);
+            }
+        }
+        // Handlers may have marked others (or themselves) dirty again
+        schedule();
+    }
+
+    function flushFrame() {
+        frameScheduled = false;
+        flush(false);
+    }
+
+    function flushIdle() {
+        idleScheduled = false;
+        flush(true);
+    }
+
+    // Register run() to be called when the DOM changes in a way it cares about
+    //   selector     only for added nodes matching or containing it (default: any change)
+    //   removals     also for removed nodes matching the selector
+    //   text         also for text changes (characterData) within the selector
+    //   attributes   attribute names that count as a change on matching elements
+    //   minInterval  run at most once per this many ms
+    //   idle         run in an idle callback instead of the next animation frame
+    //   collect      pass run() the nodes added since its last run
+    //   immediate    run once right after registering (default true)
+    function watch(name, run, options = {}) {
+        const watcher = {
+            name,
+            run,
+            selector: options.selector || null,
+            removals: !!options.removals,
+            text: !!options.text,
+            attributes: options.attributes || null,
+            minInterval: options.minInterval || 0,
+            idle: !!options.idle,
+            collect: !!options.collect,
+            added: options.collect ? [] : null,
+            dirty: options.immediate !== false,
+            stopped: false,
+            timer: null,
+            lastRun: 0,
+            runs: 0,
+            totalMs: 0,
+            maxMs: 0,
+            warned: false
+        };
+        watchers.push(watcher);
+        updateObserver();
+        schedule();
+
+        return {
+            // Run on the next flush even without a matching mutation
+            trigger: () => {
+                watcher.dirty = true;
+                schedule();
+            },
+            stop: () => {
+                watcher.stopped = true;
+                clearTimeout(watcher.timer);
+                watcher.timer = null;
+                updateObserver();
+            }
+        };
+    }
+
+    function stats() {
+        return [observerCost].concat(watchers).map(entry => ({
+            handler: entry.name,
+            runs: entry.runs,
+            totalMs: +entry.totalMs.toFixed(2),
+            avgMs: entry.runs ? +(entry.totalMs / entry.runs).toFixed(3) : 0,
+            maxMs: +entry.maxMs.toFixed(2)
+        }));
+    }
+
+    function report() {
+        const rows = stats().sort((a, b) => b.totalMs - a.totalMs);
+        console.table(rows);
+        return rows;
+    }
+
+    window.veoDomWatch = { watch, stats, report };
+
+    // Scripts may register before <html> exists at document start
+    if (!document.documentElement) {
+        document.addEventListener('readystatechange', updateObserver, { once: true });
+    }
+})();
@@ -0,0 +1,219 @@
+"""Non-blocking download completion detection driven by watcher events"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from download_watcher import EVENT_CREATED, EVENT_CLOSED, EVENT_MOVED, EVENT_DELETED
+
+# Per-file states
+STATE_PARTIAL = 'partial'    # browser is still writing (temp name or growing file)
+STATE_RENAMED = 'renamed'    # final name is in place, waiting for data to settle
+STATE_STABLE = 'stable'      # complete and handed off
+
+# Completed files remembered so a late duplicate event does not complete them twice
+RECENT_COMPLETIONS = 64
+
+# Temporary names used by browsers while a download is in progress
+PARTIAL_SUFFIXES = ('.crdownload', '.part', '.partial', '.download', '.tmp')
+
+
+def split_partial_name(filename):
+    """Return the final name for a browser temp file, or None if not a temp file"""
+    lower = filename.lower()
+    for suffix in PARTIAL_SUFFIXES:
+        if lower.endswith(suffix):
+            return filename[:-len(suffix)]
+    return None
+
+
+class DownloadCompletionTracker:
+    """Tracks each download through partial -> renamed -> stable
+
+    Events come from a download watcher and are handled without sleeping, so
+    any number of downloads can be in flight at once. When the watcher cannot
+    report closes (polling backend) a single settle thread samples file sizes
+    of the pending files only, and parks while nothing is pending. A file is
+    forgotten once on_complete has run; only its size and mtime stay in a
+    small bounded list of recent completions.
+    """
+
+    def __init__(self, directory, is_wanted, on_complete, on_started=None,
+                 reports_close=True, settle_interval=0.3):
+        self.directory = directory
+        self.is_wanted = is_wanted
+        self.on_complete = on_complete
+        self.on_started = on_started
+        self.reports_close = reports_close
+        self.settle_interval = settle_interval
+        self.files = {}  # final filename -> {'state', 'size', 'since'}
+        self._completed = OrderedDict()  # final filename -> (size, mtime), most recent last
+        self._lock = threading.Condition()
+        self._running = False
+        self._settle_thread = None
+
+    def start(self):
+        """Start the settle thread used when closes are not reported"""
+        self._running = True
+        if not self.reports_close:
+            self._settle_thread = threading.Thread(target=self._settle_loop, daemon=True)
+            self._settle_thread.start()
+
+    def stop(self):
+        """Stop tracking"""
+        with self._lock:
+            self._running = False
+            self._lock.notify_all()
+        if self._settle_thread:
+            self._settle_thread.join(timeout=2)
+
+    def states(self):
+        """Snapshot of tracked files and their states"""
+        with self._lock:
+            return {name: entry['state'] for name, entry in self.files.items()}
+
+    def handle_event(self, event, filename):
+        """Feed one watcher event into the tracker"""
+        final_name = split_partial_name(filename)
+        is_partial = final_name is not None
+        if not is_partial:
+            final_name = filename
+
+        # Chrome's "Unconfirmed 1234.crdownload" does not reveal the final name
+        if not self.is_wanted(final_name):
+            return
+
+        if event == EVENT_DELETED:
+            if not is_partial:
+                with self._lock:
+                    self.files.pop(final_name, None)
+            return
+
+        if is_partial:
+            # Temp file created or written; the real file arrives by rename
+            self._mark(final_name, STATE_PARTIAL)
+        elif event == EVENT_MOVED:
+            # Browser renamed the finished temp file into place
+            self._mark(final_name, STATE_RENAMED)
+            self._complete_if_ready(final_name)
+        elif event == EVENT_CLOSED:
+            self._complete_if_ready(final_name)
+        elif event == EVENT_CREATED:
+            self._mark(final_name, STATE_PARTIAL)
+
+        if not self.reports_close:
+            with self._lock:
+                self._lock.notify_all()
+
+    def _mark(self, final_name, state):
+        """Record a state change, announcing newly seen downloads"""
+        started = False
+        with self._lock:
+            entry = self.files.get(final_name)
+            if entry is None or (entry['state'] == STATE_STABLE and state == STATE_PARTIAL):
+                entry = {'state': state, 'size': -1, 'since': time.time()}
+                self.files[final_name] = entry
+                # A new download under a name that completed before
+                self._completed.pop(final_name, None)
+                started = True
+            elif entry['state'] != STATE_STABLE:
+                entry['state'] = state
+
+        if started and self.on_started:
+            self._call(self.on_started, final_name)
+
+    def _complete_if_ready(self, final_name):
+        """Hand off the file if it has data and is not a placeholder"""
+        filepath = os.path.join(self.directory, final_name)
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return
+        size = stat.st_size
+
+        # Chrome creates an empty placeholder under the final name first
+        if size == 0:
+            self._mark(final_name, STATE_PARTIAL)
+            return
+
+        with self._lock:
+            entry = self.files.get(final_name)
+            if entry is None and self._completed.get(final_name) == (size, stat.st_mtime):
+                # Trailing event for a file that was already handed off
+                return
+            if entry is None:
+                entry = {'state': STATE_PARTIAL, 'size': size, 'since': time.time()}
+                self.files[final_name] = entry
+                announce = True
+            else:
+                announce = False
+            if entry['state'] == STATE_STABLE:
+                return
+            entry['state'] = STATE_STABLE
+            entry['size'] = size
+
+        if announce and self.on_started:
+            self._call(self.on_started, final_name)
+        self._call(self.on_complete, final_name)
+
+        with self._lock:
+            # Forget the file unless a new download reused the name meanwhile
+            if self.files.get(final_name) is entry:
+                del self.files[final_name]
+                self._completed[final_name] = (size, stat.st_mtime)
+                self._completed.move_to_end(final_name)
+                while len(self._completed) > RECENT_COMPLETIONS:
+                    self._completed.popitem(last=False)
+
+    def _settle_loop(self):
+        """Sample sizes of pending files until they stop growing (polling only)"""
+        with self._lock:
+            while self._running:
+                pending = [name for name, entry in self.files.items()
+                           if entry['state'] != STATE_STABLE]
+                if not pending:
+                    self._lock.wait()
+                    continue
+
+                self._lock.wait(self.settle_interval)
+                ready = []
+                now = time.time()
+                for name in pending:
+                    entry = self.files.get(name)
+                    if not entry or entry['state'] == STATE_STABLE:
+                        continue
+                    if now - entry.get('checked', 0) < self.settle_interval:
+                        continue
+                    entry['checked'] = now
+
+                    filepath = os.path.join(self.directory, name)
+                    if any(os.path.exists(filepath + suffix) for suffix in PARTIAL_SUFFIXES):
+                        entry['state'] = STATE_PARTIAL
+                        continue
+                    try:
+                        size = os.path.getsize(filepath)
+                    except OSError:
+                        # Download was cancelled
+                        self.files.pop(name, None)
+                        continue
+
+                    # Temp file is gone: the final file must keep its size for one interval
+                    if entry['state'] == STATE_RENAMED and size > 0 and size == entry['size']:
+                        ready.append(name)
+                    entry['state'] = STATE_RENAMED
+                    entry['size'] = size
+
+                if ready:
+                    self._lock.release()
+                    try:
+                        for name in ready:
+                            self._complete_if_ready(name)
+                    finally:
+                        self._lock.acquire()
+
+    def _call(self, callback, final_name):
+        try:
+            callback(os.path.join(self.directory, final_name), final_name)
+        except Exception as e:
+            print(f"Download tracker callback error: {e}")
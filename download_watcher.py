@@ -0,0 +1,192 @@
+"""Event-driven watcher for the Downloads folder (inotify on Linux, polling elsewhere)"""
+
+import os
+import ctypes
+import ctypes.util
+import platform
+import select
+import struct
+import threading
+
+# Events delivered to the watcher callback as callback(event, filename)
+EVENT_CREATED = 'created'   # a new name appeared in the folder
+EVENT_CLOSED = 'closed'     # a file opened for writing was closed
+EVENT_MOVED = 'moved'       # a file was renamed into (or inside) the folder
+EVENT_DELETED = 'deleted'   # a file was removed or renamed away
+
+# inotify constants from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0o2000000)
+
+WATCH_MASK = IN_CREATE | IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE
+
+_EVENT_HEADER = struct.Struct('iIII')
+_READ_SIZE = 64 * 1024
+
+
+class PollingWatcher:
+    """Fallback watcher that diffs directory listings on an interval"""
+
+    backend = 'polling'
+    reports_close = False
+
+    def __init__(self, directory, callback, interval=0.5):
+        self.directory = directory
+        self.callback = callback
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        """Scan the folder until stop() is called"""
+        try:
+            known_files = set(os.listdir(self.directory))
+        except OSError:
+            known_files = set()
+
+        while not self._stop_event.wait(self.interval):
+            try:
+                current_files = set(os.listdir(self.directory))
+            except OSError as e:
+                print(f"Watcher scan error: {e}")
+                continue
+
+            for filename in current_files - known_files:
+                self._emit(EVENT_CREATED, filename)
+            for filename in known_files - current_files:
+                self._emit(EVENT_DELETED, filename)
+
+            known_files = current_files
+
+    def stop(self):
+        """Stop the scan loop"""
+        self._stop_event.set()
+
+    def _emit(self, event, filename):
+        try:
+            self.callback(event, filename)
+        except Exception as e:
+            print(f"Watcher callback error: {e}")
+
+
+class InotifyWatcher:
+    """Linux watcher that blocks on inotify and costs no CPU while idle"""
+
+    backend = 'inotify'
+    reports_close = True
+
+    def __init__(self, directory, callback, libc):
+        self.directory = directory
+        self.callback = callback
+        self._libc = libc
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+
+        wd = libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f'inotify_add_watch failed for {directory}')
+
+        # Self-pipe so stop() can wake the blocking select()
+        self._wake_r, self._wake_w = os.pipe()
+        self._stopped = False
+
+    def run(self):
+        """Dispatch inotify events until stop() is called"""
+        try:
+            while not self._stopped:
+                readable, _, _ = select.select([self._fd, self._wake_r], [], [])
+                if self._wake_r in readable:
+                    break
+                self._read_events()
+        finally:
+            self._close()
+
+    def stop(self):
+        """Wake the event loop and release the inotify descriptor"""
+        if self._stopped:
+            return
+        self._stopped = True
+        try:
+            os.write(self._wake_w, b'x')
+        except OSError:
+            pass
+
+    def _read_events(self):
+        try:
+            data = os.read(self._fd, _READ_SIZE)
+        except BlockingIOError:
+            return
+
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _wd, mask, _cookie, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + name_len].rstrip(b'\0')
+            offset += name_len
+
+            if mask & IN_Q_OVERFLOW:
+                print("⚠️  Download watcher queue overflowed, some events were dropped")
+                continue
+            if mask & (IN_ISDIR | IN_IGNORED) or not name:
+                continue
+
+            filename = os.fsdecode(name)
+            if mask & IN_CREATE:
+                self._emit(EVENT_CREATED, filename)
+            if mask & IN_CLOSE_WRITE:
+                self._emit(EVENT_CLOSED, filename)
+            if mask & IN_MOVED_TO:
+                self._emit(EVENT_MOVED, filename)
+            if mask & (IN_MOVED_FROM | IN_DELETE):
+                self._emit(EVENT_DELETED, filename)
+
+    def _emit(self, event, filename):
+        try:
+            self.callback(event, filename)
+        except Exception as e:
+            print(f"Watcher callback error: {e}")
+
+    def _close(self):
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+def _load_libc():
+    """Return libc with inotify symbols, or None when unavailable"""
+    if platform.system() != 'Linux':
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+def create_download_watcher(directory, callback, poll_interval=0.5):
+    """Create the best available watcher for directory
+
+    callback(event, filename) is called from the watcher thread for every
+    EVENT_* change. Falls back to polling when inotify is not available.
+    """
+    libc = _load_libc()
+    if libc is not None:
+        try:
+            return InotifyWatcher(directory, callback, libc)
+        except OSError as e:
+            print(f"inotify unavailable ({e}), falling back to polling")
+    return PollingWatcher(directory, callback, interval=poll_interval)
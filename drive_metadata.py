@@ -0,0 +1,141 @@
+"""Batched Drive metadata calls: pre-generated file IDs and public permission grants"""
+
+import threading
+import time
+from concurrent.futures import Future
+
+PUBLIC_PERMISSION = {'type': 'anyone', 'role': 'reader'}
+
+# Keep enough IDs for a burst of uploads; refill below the low-water mark
+ID_POOL_SIZE = 10
+ID_POOL_LOW = 3
+
+MAX_GRANT_ATTEMPTS = 3
+# How long an upload waits for its grant before giving up on the link
+GRANT_TIMEOUT = 30
+
+
+class DriveMetadata:
+    """Runs Drive metadata requests off the upload path in single batch round trips
+
+    File IDs are generated ahead of time, so an upload knows its file ID (and
+    therefore its download link) before the first byte is sent. Permission
+    grants are queued and sent together, with an ID refill if the pool is low,
+    in one Drive batch HTTP request on a background thread. make_public()
+    returns a Future per file, resolved True once that file's grant is
+    confirmed or False once it is dropped, so callers can hold the link back
+    until the file is actually public.
+    """
+
+    def __init__(self, service_factory):
+        self.service_factory = service_factory
+        self._cond = threading.Condition()
+        self._id_pool = []
+        self._pending_grants = {}  # file_id -> attempts so far
+        self._grant_results = {}  # file_id -> Future[bool] for grants not yet settled
+        self._refill_requested = True
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Start the batching thread and prefetch the first IDs"""
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the batching thread after flushing queued grants"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def reserve_file_id(self):
+        """Pop a pre-generated file ID, or None if the pool is empty"""
+        with self._cond:
+            file_id = self._id_pool.pop() if self._id_pool else None
+            if len(self._id_pool) < ID_POOL_LOW:
+                self._refill_requested = True
+                self._cond.notify_all()
+            return file_id
+
+    def make_public(self, file_id):
+        """Queue a public read permission for file_id; returns a Future[bool] for the outcome"""
+        with self._cond:
+            result = self._grant_results.get(file_id)
+            if result is None:
+                result = self._grant_results[file_id] = Future()
+                self._pending_grants[file_id] = 0
+                self._cond.notify_all()
+            return result
+
+    def _settle(self, file_id, granted):
+        with self._cond:
+            result = self._grant_results.pop(file_id, None)
+        if result is not None:
+            result.set_result(granted)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: not self._running or self._pending_grants or self._refill_requested)
+                if not self._running and not self._pending_grants:
+                    return
+                grants = dict(self._pending_grants)
+                self._pending_grants.clear()
+                refill = self._refill_requested
+                self._refill_requested = False
+
+            try:
+                self._send_batch(grants, refill)
+            except Exception as e:
+                print(f"Drive metadata batch error: {e}")
+                self._requeue(grants)
+                time.sleep(1)
+
+    def _send_batch(self, grants, refill):
+        service = self.service_factory()
+        failed = {}
+        new_ids = []
+
+        def on_response(request_id, response, exception):
+            if request_id == 'generate-ids':
+                if exception is None:
+                    new_ids.extend(response.get('ids', []))
+                return
+            if exception is not None:
+                print(f"Warning: Could not make file public: {exception}")
+                failed[request_id] = grants[request_id]
+            else:
+                self._settle(request_id, True)
+
+        batch = service.new_batch_http_request(callback=on_response)
+        for file_id in grants:
+            batch.add(
+                service.permissions().create(fileId=file_id, body=PUBLIC_PERMISSION, fields='id'),
+                request_id=file_id
+            )
+        if refill:
+            batch.add(
+                service.files().generateIds(count=ID_POOL_SIZE, space='drive'),
+                request_id='generate-ids'
+            )
+        batch.execute()
+
+        with self._cond:
+            self._id_pool.extend(new_ids)
+        self._requeue(failed)
+
+    def _requeue(self, grants):
+        """Put failed grants back for the next batch, giving up after a few attempts"""
+        dropped = []
+        with self._cond:
+            for file_id, attempts in grants.items():
+                if attempts + 1 < MAX_GRANT_ATTEMPTS:
+                    self._pending_grants[file_id] = attempts + 1
+                else:
+                    dropped.append(file_id)
+        for file_id in dropped:
+            print(f"Giving up making {file_id} public after {MAX_GRANT_ATTEMPTS} attempts")
+            self._settle(file_id, False)
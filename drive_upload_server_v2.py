@@ -1,41 +1,40 @@
 #!/usr/bin/env python3
-from flask import Flask, request, jsonify
+from flask import Flask, jsonify
 from flask_cors import CORS
 from google_drive_service import get_drive_service
-import threading
-import time
-import os
+from monitor_jobs import MonitorJobService, ServiceBusy
+
+try:
+    from waitress import serve
+    WAITRESS_AVAILABLE = True
+except ImportError:
+    WAITRESS_AVAILABLE = False
+
+PORT = 5000
+REQUEST_THREADS = 8
 
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "*"}})  # Enable CORS for all routes and origins
 
-# Track active upload operations
-active_uploads = {}
+# Monitor jobs share one Downloads poller and a fixed upload pool; the shared
+# GoogleDriveService builds a separate Drive client for each upload thread
+jobs = MonitorJobService(get_drive_service)
 
 @app.route('/start-upload-monitor', methods=['POST'])
 def start_upload_monitor():
     """Start monitoring for a new download and upload it"""
     try:
-        upload_id = str(int(time.time() * 1000))
-        
-        # Start monitoring in background
-        def monitor_task():
-            service = get_drive_service()
-            result = service.monitor_and_upload(timeout=60)
-            active_uploads[upload_id] = result
-        
-        thread = threading.Thread(target=monitor_task)
-        thread.daemon = True
-        thread.start()
-        
-        active_uploads[upload_id] = {'status': 'monitoring'}
+        job = jobs.submit()
         
         return jsonify({
             'success': True,
-            'upload_id': upload_id,
+            'upload_id': job.id,
             'message': 'Monitoring started'
         })
         
+    except ServiceBusy as e:
+        print(f"Rejecting monitor request: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 503
     except Exception as e:
         print(f"Error starting monitor: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -43,22 +42,15 @@ def start_upload_monitor():
 @app.route('/check-upload-status/<upload_id>', methods=['GET'])
 def check_upload_status(upload_id):
     """Check the status of an upload operation"""
-    if upload_id not in active_uploads:
+    job = jobs.get(upload_id)
+    if job is None:
         return jsonify({'success': False, 'error': 'Invalid upload ID'}), 404
     
-    result = active_uploads[upload_id]
+    result = job.status()
     
-    # If still monitoring
-    if isinstance(result, dict) and result.get('status') == 'monitoring':
-        return jsonify({
-            'success': True,
-            'status': 'monitoring',
-            'message': 'Still waiting for download to complete'
-        })
-    
-    # If completed, return the result and clean up
-    if result.get('success'):
-        del active_uploads[upload_id]
+    # If completed, return the result and clean up (failures expire via TTL)
+    if result.get('success') and result.get('status') != 'monitoring':
+        jobs.forget(upload_id)
     
     return jsonify(result)
 
@@ -66,20 +58,8 @@ def check_upload_status(upload_id):
 def check_and_upload():
     """Check for new video files and upload to Drive immediately"""
     try:
-        service = get_drive_service()
-        
         # Check for latest video with shorter max age (10 seconds)
-        latest_video = service.find_latest_video(max_age_seconds=10)
-        
-        if latest_video:
-            print(f"Found video: {latest_video}")
-            result = service.upload_file(latest_video)
-            return jsonify(result)
-        else:
-            return jsonify({
-                'success': False,
-                'message': 'No new video found'
-            })
+        return jsonify(jobs.upload_latest(max_age_seconds=10))
             
     except Exception as e:
         print(f"Error: {e}")
@@ -89,10 +69,11 @@ def check_and_upload():
 def health():
     """Health check endpoint"""
     try:
-        service = get_drive_service()
+        service = jobs.service_factory()
         return jsonify({
             'status': 'ok',
-            'service_ready': service is not None
+            'service_ready': service is not None,
+            'jobs': jobs.stats()
         })
     except Exception as e:
         return jsonify({
@@ -100,16 +81,28 @@ def health():
             'error': str(e)
         }), 500
 
+def run_server(port=PORT):
+    """Serve the app with waitress when installed, else Flask's threaded server"""
+    jobs.start()
+    try:
+        if WAITRESS_AVAILABLE:
+            serve(app, host='localhost', port=port, threads=REQUEST_THREADS)
+        else:
+            print("waitress not installed, using Flask's built-in server (pip install waitress)")
+            app.run(port=port, debug=False, threaded=True)
+    finally:
+        jobs.stop()
+
 if __name__ == '__main__':
     print("=" * 60)
     print("Google Drive Upload Server v2")
     print("Using Service Account Authentication")
     print("=" * 60)
-    print(f"Server running on: http://localhost:5000")
+    print(f"Server running on: http://localhost:{PORT}")
     print("Endpoints:")
     print("  POST /start-upload-monitor - Start monitoring for downloads")
     print("  GET  /check-upload-status/<id> - Check upload status")
     print("  POST /check-and-upload - Check and upload immediately")
     print("=" * 60)
     
-    app.run(port=5000, debug=False)
\ No newline at end of file
+    run_server()
@@ -42,58 +42,139 @@
         'queue', 'pending', 'fulfilled', 'rejected'
     ];
     
-    // Super aggressive filter
-    function shouldFilter(args) {
-        if (!args || args.length === 0) return false;
+    // All keywords compiled once into a single case-insensitive alternation
+    const filterPattern = new RegExp(
+        filterKeywords.map(keyword => keyword.replace(/[.*+?^${}()|[\]\\]/g, '\\$&')).join('|'), 'i');
+    
+    // Objects are classified without serializing: network objects by type, the
+    // rest by their first few keys and primitive values
+    const MAX_KEYS = 20;
+    const networkTypes = ['Request', 'Response', 'XMLHttpRequest', 'ProgressEvent', 'WebSocket', 'Headers']
+        .map(name => window[name]).filter(Boolean);
+    
+    // Counters and per-call cost, see veoConsoleFilter.report()
+    const stats = {
+        calls: 0,
+        filtered: 0,
+        totalMs: 0,
+        maxMs: 0,
+        byMethod: {},
+        byKeyword: {}
+    };
+    
+    function matchValue(value) {
+        switch (typeof value) {
+            case 'string':
+                return filterPattern.exec(value);
+            case 'number':
+            case 'boolean':
+            case 'bigint':
+                return filterPattern.exec(String(value));
+            default:
+                return null;
+        }
+    }
+    
+    function matchObject(obj) {
+        // Errors: message and stack are already strings
+        if (obj instanceof Error || (typeof obj.stack === 'string' && typeof obj.message === 'string')) {
+            return filterPattern.exec(obj.message) || filterPattern.exec(obj.stack);
+        }
+        for (const type of networkTypes) {
+            if (obj instanceof type) return ['network'];
+        }
+        if (obj instanceof Node) return null;
+        
+        if (Array.isArray(obj)) {
+            const count = Math.min(obj.length, MAX_KEYS);
+            for (let i = 0; i < count; i++) {
+                const match = matchValue(obj[i]);
+                if (match) return match;
+            }
+            return null;
+        }
         
+        let seen = 0;
+        for (const key in obj) {
+            if (!Object.prototype.hasOwnProperty.call(obj, key)) continue;
+            const match = filterPattern.exec(key) || matchValue(obj[key]);
+            if (match) return match;
+            if (++seen >= MAX_KEYS) break;
+        }
+        return null;
+    }
+    
+    // Super aggressive filter; returns the matched keyword or null
+    function shouldFilter(args) {
         try {
-            const message = args.map(arg => {
-                if (arg === null || arg === undefined) return '';
-                if (typeof arg === 'object') {
-                    try {
-                        // Check if it's an Error object with stack trace
-                        if (arg.stack && arg.message) {
-                            return arg.message + ' ' + arg.stack;
-                        }
-                        return JSON.stringify(arg).substring(0, 1000);
-                    } catch (e) {
-                        return Object.prototype.toString.call(arg);
-                    }
-                }
-                return String(arg);
-            }).join(' ').toLowerCase();
-            
-            // Check against all filter keywords
-            return filterKeywords.some(keyword => message.includes(keyword.toLowerCase()));
+            for (let i = 0; i < args.length; i++) {
+                const arg = args[i];
+                const match = (arg !== null && typeof arg === 'object') ? matchObject(arg) : matchValue(arg);
+                if (match) return match[0].toLowerCase();
+            }
+            return null;
         } catch (e) {
             // If any error in filtering, just suppress to be safe
-            return true;
+            return 'filter error';
         }
     }
     
-    // Create filtered versions of all console methods
-    Object.keys(console_backup).forEach(method => {
-        console[method] = function(...args) {
-            if (!shouldFilter(args)) {
-                console_backup[method].apply(console, args);
+    function filtered(method) {
+        const original = console_backup[method];
+        stats.byMethod[method] = stats.byMethod[method] || { passed: 0, filtered: 0 };
+        const counts = stats.byMethod[method];
+        
+        return function(...args) {
+            const started = performance.now();
+            const keyword = args.length ? shouldFilter(args) : null;
+            const elapsed = performance.now() - started;
+            
+            stats.calls++;
+            stats.totalMs += elapsed;
+            if (elapsed > stats.maxMs) stats.maxMs = elapsed;
+            
+            if (keyword) {
+                stats.filtered++;
+                counts.filtered++;
+                stats.byKeyword[keyword] = (stats.byKeyword[keyword] || 0) + 1;
+            } else {
+                counts.passed++;
+                original.apply(console, args);
             }
         };
+    }
+    
+    // Create filtered versions of all console methods
+    Object.keys(console_backup).forEach(method => {
+        console[method] = filtered(method);
     });
     
     // Also override console.log directly (some frameworks reassign it)
     const descriptor = Object.getOwnPropertyDescriptor(console, 'log');
     if (descriptor && descriptor.configurable) {
         Object.defineProperty(console, 'log', {
-            value: function(...args) {
-                if (!shouldFilter(args)) {
-                    console_backup.log.apply(console, args);
-                }
-            },
+            value: console.log,
             writable: true,
             configurable: true
         });
     }
     
+    window.veoConsoleFilter = {
+        stats: () => JSON.parse(JSON.stringify(stats)),
+        report: () => {
+            const avgUs = stats.calls ? (stats.totalMs / stats.calls) * 1000 : 0;
+            console_backup.log(`[EARLY FILTER] ${stats.filtered}/${stats.calls} calls filtered, ` +
+                               `${stats.totalMs.toFixed(1)}ms total, ${avgUs.toFixed(1)}µs avg, ${stats.maxMs.toFixed(2)}ms max`);
+            console_backup.table(stats.byMethod);
+            console_backup.table(stats.byKeyword);
+        },
+        reset: () => {
+            stats.calls = stats.filtered = stats.totalMs = stats.maxMs = 0;
+            Object.values(stats.byMethod).forEach(counts => { counts.passed = counts.filtered = 0; });
+            stats.byKeyword = {};
+        }
+    };
+    
     // Suppress fetch logging at the source
     if (window.fetch) {
         const originalFetch = window.fetch;
@@ -126,6 +207,11 @@
         window.EventSource = function(url, config) {
             return new originalEventSource(url, config);
         };
+        // Keep the readyState constants scripts compare against
+        window.EventSource.prototype = originalEventSource.prototype;
+        window.EventSource.CONNECTING = originalEventSource.CONNECTING;
+        window.EventSource.OPEN = originalEventSource.OPEN;
+        window.EventSource.CLOSED = originalEventSource.CLOSED;
     }
     
     // Suppress WebSocket logs
@@ -134,6 +220,11 @@
         window.WebSocket = function(url, protocols) {
             return new originalWebSocket(url, protocols);
         };
+        window.WebSocket.prototype = originalWebSocket.prototype;
+        window.WebSocket.CONNECTING = originalWebSocket.CONNECTING;
+        window.WebSocket.OPEN = originalWebSocket.OPEN;
+        window.WebSocket.CLOSING = originalWebSocket.CLOSING;
+        window.WebSocket.CLOSED = originalWebSocket.CLOSED;
     }
     
     // Clear any existing logs that might have been queued
@@ -1,155 +1,129 @@
-from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException, NoSuchElementException
 import time
 
-def change_to_asset_mode(driver):
-    """Change Flow mode to '애셋으로 동영상 만들기' (Asset mode)"""
+ASSET_MODE_TEXT = '애셋으로 동영상 만들기'
+MODE_KEYWORDS = ['동영상', '애셋', '텍스트', '프레임']
+
+# How often conditions are re-checked while waiting
+POLL_INTERVAL = 0.1
+
+# Returns the mode combobox once it is visible and enabled (or its text if
+# arguments[1] is true), else null
+FIND_MODE_BUTTON_SCRIPT = """
+const keywords = arguments[0];
+for (const button of document.querySelectorAll('button[role="combobox"]')) {
+    const text = button.textContent || '';
+    if (keywords.some(keyword => text.includes(keyword))) {
+        if (arguments[1]) return text;
+        const rect = button.getBoundingClientRect();
+        const interactable = !button.disabled && rect.width > 0 && rect.height > 0;
+        return interactable ? button : null;
+    }
+}
+return null;
+"""
+
+# Clicks the first option containing the text; returns true once clicked
+CLICK_OPTION_SCRIPT = """
+const wanted = arguments[0];
+for (const option of document.querySelectorAll('[role="option"]')) {
+    if ((option.textContent || '').includes(wanted)) {
+        option.scrollIntoView({block: 'nearest'});
+        option.click();
+        return true;
+    }
+}
+return false;
+"""
+
+# True once the wanted mode is selected: the option reports aria-selected or
+# data-state="checked" while the listbox is open, or the combobox has collapsed
+# (aria-expanded="false") onto the wanted value
+MODE_SELECTED_SCRIPT = """
+const wanted = arguments[0];
+for (const option of document.querySelectorAll('[role="option"]')) {
+    if (!(option.textContent || '').includes(wanted)) continue;
+    if (option.getAttribute('aria-selected') === 'true' || option.dataset.state === 'checked') return true;
+}
+for (const button of document.querySelectorAll('button[role="combobox"]')) {
+    if (button.getAttribute('aria-expanded') === 'false' && (button.textContent || '').includes(wanted)) return true;
+}
+return false;
+"""
+
+# Text of every visible option, for diagnostics when the wanted one is missing
+LIST_OPTIONS_SCRIPT = """
+return Array.from(document.querySelectorAll('[role="option"]')).slice(0, 10)
+    .map(option => (option.textContent || '').trim());
+"""
+
+
+def _mode_button(driver):
+    return driver.execute_script(FIND_MODE_BUTTON_SCRIPT, MODE_KEYWORDS, False)
+
+
+def _mode_text(driver):
+    return driver.execute_script(FIND_MODE_BUTTON_SCRIPT, MODE_KEYWORDS, True) or ''
+
+
+def change_to_asset_mode(driver, timeout=10):
+    """Change Flow mode to '애셋으로 동영상 만들기' (Asset mode)
+
+    Every step waits for its DOM condition instead of sleeping, so the switch
+    happens as soon as the page allows it.
+    """
+    wait = WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL,
+                         ignored_exceptions=(StaleElementReferenceException, NoSuchElementException))
     try:
-        print("\n" + "=" * 60)
-        print("[MODE CHANGER] Starting mode change to asset mode...")
-        print("[MODE CHANGER] Current URL:", driver.current_url)
-        print("=" * 60)
-        wait = WebDriverWait(driver, 10)
-        
-        # Step 1: Find and check the current mode button
-        print("[MODE CHANGER] Step 1: Looking for mode dropdown button...")
-        mode_button = None
-        
-        # Try to find the combobox button that contains mode text
-        buttons = driver.find_elements(By.CSS_SELECTOR, 'button[role="combobox"]')
-        print(f"[MODE CHANGER] Found {len(buttons)} combobox buttons")
-        
-        for i, button in enumerate(buttons):
-            text = button.text
-            print(f"[MODE CHANGER] Button {i+1}: '{text}'")
-            if any(mode in text for mode in ['동영상', '애셋', '텍스트', '프레임']):
-                mode_button = button
-                print(f"[MODE CHANGER] ✓ Selected mode button: '{text}'")
-                break
-        
-        if not mode_button:
-            print("[MODE CHANGER] Mode button not found")
-            return False
+        print("[MODE CHANGER] Waiting for mode dropdown button...")
+        mode_button = wait.until(_mode_button)
+        mode_text = _mode_text(driver)
+        print(f"[MODE CHANGER] Mode button: '{mode_text}'")
         
         # Check if already in asset mode
-        if '애셋으로 동영상 만들기' in mode_button.text:
+        if ASSET_MODE_TEXT in mode_text:
             print("[MODE CHANGER] ✓ Already in asset mode")
-            print("=" * 60 + "\n")
             return True
         
-        # Step 2: Click to open dropdown
-        print("[MODE CHANGER] Step 2: Opening dropdown...")
-        print(f"[MODE CHANGER] Mode button aria-expanded: {mode_button.get_attribute('aria-expanded')}")
+        # Open dropdown with a real click (the combobox listens for pointer events)
         mode_button.click()
         
-        # Wait a moment for dropdown to open
-        time.sleep(0.5)
-        print(f"[MODE CHANGER] After click - aria-expanded: {mode_button.get_attribute('aria-expanded')}")
-        
-        # Step 3: Find and click the asset option
-        print("[MODE CHANGER] Step 3: Looking for asset option...")
-        
-        # Wait for dropdown options to appear
+        # Find and click the asset option as soon as the listbox renders it
         try:
-            options = wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, '[role="option"]')))
-            print(f"[MODE CHANGER] Found {len(options)} dropdown options")
+            wait.until(lambda d: d.execute_script(CLICK_OPTION_SCRIPT, ASSET_MODE_TEXT))
         except TimeoutException:
-            print("[MODE CHANGER] ✗ Timeout waiting for dropdown options")
-            return False
-        
-        asset_option = None
-        for i, option in enumerate(options):
-            # Check both the option text and any span inside it
-            try:
-                option_text = option.text
-                print(f"[MODE CHANGER] Option {i+1}: '{option_text}'")
-                
-                span_elements = option.find_elements(By.TAG_NAME, 'span')
-                
-                # Check main text
-                if '애셋으로 동영상 만들기' in option_text:
-                    asset_option = option
-                    print(f"[MODE CHANGER] ✓ Found asset option (main text)")
-                    break
-                
-                # Check span text
-                for span in span_elements:
-                    span_text = span.text
-                    if span_text:
-                        print(f"[MODE CHANGER]   Span text: '{span_text}'")
-                    if '애셋으로 동영상 만들기' in span_text:
-                        asset_option = option
-                        print(f"[MODE CHANGER] ✓ Found asset option (span text)")
-                        break
-                
-                if asset_option:
-                    break
-                    
-            except Exception as e:
-                print(f"[MODE CHANGER] Error reading option {i+1}: {e}")
-                continue
-        
-        if not asset_option:
             print("[MODE CHANGER] ✗ Asset option not found in dropdown")
-            print("[MODE CHANGER] Available options were:")
-            for i, opt in enumerate(options[:10]):  # Show first 10 options
-                try:
-                    print(f"  {i+1}. '{opt.text}'")
-                except:
-                    pass
-            # Try to close dropdown by clicking outside
-            driver.find_element(By.TAG_NAME, 'body').click()
-            print("=" * 60 + "\n")
+            print(f"[MODE CHANGER] Available options were: {driver.execute_script(LIST_OPTIONS_SCRIPT)}")
+            driver.execute_script(
+                "document.body.dispatchEvent(new KeyboardEvent('keydown', {key: 'Escape', bubbles: true}));"
+            )
             return False
         
-        print("[MODE CHANGER] Found asset option, clicking...")
-        print(f"[MODE CHANGER] Asset option HTML: {asset_option.get_attribute('outerHTML')[:200]}...")
-        asset_option.click()
-        
-        # Wait for mode change to complete
-        print("[MODE CHANGER] Waiting for mode change to complete...")
-        time.sleep(1)
-        
-        # Verify the change
-        print("[MODE CHANGER] Verifying mode change...")
-        buttons = driver.find_elements(By.CSS_SELECTOR, 'button[role="combobox"]')
-        for button in buttons:
-            text = button.text
-            if any(mode in text for mode in ['동영상', '애셋', '텍스트', '프레임']):
-                print(f"[MODE CHANGER] Current mode button text: '{text}'")
-                if '애셋으로 동영상 만들기' in text:
-                    print("[MODE CHANGER] ✓ Success! Mode changed to asset mode")
-                    print("=" * 60 + "\n")
-                    return True
-        
-        print("[MODE CHANGER] ✗ Mode change verification failed")
-        print("=" * 60 + "\n")
-        return False
-        
+        # Verify the change through the selection attributes
+        wait.until(lambda d: d.execute_script(MODE_SELECTED_SCRIPT, ASSET_MODE_TEXT))
+        print("[MODE CHANGER] ✓ Success! Mode changed to asset mode")
+        return True
+    
     except TimeoutException:
-        print("[MODE CHANGER] ✗ Timeout waiting for elements")
-        print("=" * 60 + "\n")
+        print("[MODE CHANGER] ✗ Timeout waiting for mode change")
         return False
     except Exception as e:
         print(f"[MODE CHANGER] ✗ Error: {e}")
-        import traceback
-        print("[MODE CHANGER] Traceback:")
-        traceback.print_exc()
-        print("=" * 60 + "\n")
         return False
 
 
-def wait_and_change_mode(driver, max_attempts=10):
-    """Wait for page to load and change mode with retries"""
+def wait_and_change_mode(driver, max_attempts=3, timeout=30, step_timeout=10):
+    """Wait for the Flow page and change mode, retrying until timeout"""
     print("\n" + "*" * 60)
     print("[MODE CHANGER] STARTING MODE CHANGE PROCESS")
-    print("[MODE CHANGER] Waiting for page to load before changing mode...")
     print("*" * 60)
     
+    started = time.monotonic()
     for attempt in range(max_attempts):
-        time.sleep(2)  # Wait between attempts
+        remaining = timeout - (time.monotonic() - started)
+        if remaining <= 0:
+            break
         
         print(f"\n[MODE CHANGER] >>> Attempt {attempt + 1}/{max_attempts}")
         
@@ -160,21 +134,11 @@ def wait_and_change_mode(driver, max_attempts=10):
             print(f"[MODE CHANGER] Current URL: {current_url}")
             return False
         
-        # Check page readiness
-        ready_state = driver.execute_script("return document.readyState")
-        print(f"[MODE CHANGER] Page ready state: {ready_state}")
-        
-        # Try to change mode
-        if change_to_asset_mode(driver):
+        if change_to_asset_mode(driver, timeout=min(step_timeout, remaining)):
+            print(f"[MODE CHANGER] Mode changed in {time.monotonic() - started:.2f}s")
             return True
-        
-        # If failed, wait longer before next attempt
-        if attempt < max_attempts - 1:
-            wait_time = 3 + attempt
-            print(f"[MODE CHANGER] ⏳ Waiting {wait_time} seconds before retry...")
-            time.sleep(wait_time)
     
     print("\n" + "*" * 60)
     print("[MODE CHANGER] ✗ FAILED to change mode after all attempts")
     print("*" * 60 + "\n")
-    return False
\ No newline at end of file
+    return False
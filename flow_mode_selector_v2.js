@@ -146,57 +146,83 @@ async function changeFlowMode(targetMode) {
     return true;
 }
 
-// Monitor for navigation to Flow project
-let checkInterval = null;
+// Check for a mode request whenever the mode dropdown is rendered
+let modeWatcher = null;
 
-function startMonitoring() {
-    if (checkInterval) return;
+function checkModeRequest() {
+    const url = window.location.href;
     
-    checkInterval = setInterval(() => {
-        const url = window.location.href;
+    // Check if we're on a Flow project page
+    if (url.includes('labs.google/fx/ko/tools/flow/project/')) {
+        // Check for mode request
+        const requestedMode = sessionStorage.getItem('veo_flow_mode');
         
-        // Check if we're on a Flow project page
-        if (url.includes('labs.google/fx/ko/tools/flow/project/')) {
-            // Check for mode request
-            const requestedMode = sessionStorage.getItem('veo_flow_mode');
+        if (requestedMode) {
+            // console.log(`Mode change requested: ${requestedMode}`);
+            // Consuming the request keeps later checks cheap; monitoring continues for the next one
+            sessionStorage.removeItem('veo_flow_mode');
             
-            if (requestedMode) {
-                // console.log(`Mode change requested: ${requestedMode}`);
-                sessionStorage.removeItem('veo_flow_mode');
-                
-                // Stop monitoring
-                clearInterval(checkInterval);
-                checkInterval = null;
-                
-                // Wait for page to stabilize, then change mode
-                console.log(`[MODE SELECTOR] Mode change requested: ${requestedMode}`);
-                
-                // Function to attempt mode change with retries
-                let attemptCount = 0;
-                const maxAttempts = 10;
-                
-                const attemptModeChange = async () => {
-                    attemptCount++;
-                    console.log(`[MODE SELECTOR] Attempt ${attemptCount}/${maxAttempts} for mode: ${requestedMode}`);
-                    
-                    const success = await changeFlowMode(requestedMode);
-                    if (!success && attemptCount < maxAttempts) {
-                        // Retry with increasing delay
-                        const delay = Math.min(1000 + (attemptCount * 500), 5000);
-                        console.log(`[MODE SELECTOR] Retrying in ${delay}ms...`);
-                        setTimeout(attemptModeChange, delay);
-                    } else if (success) {
-                        console.log(`[MODE SELECTOR] Successfully changed to ${requestedMode} mode`);
-                    } else {
-                        console.log(`[MODE SELECTOR] Failed to change mode after ${maxAttempts} attempts`);
-                    }
-                };
+            // Wait for page to stabilize, then change mode
+            console.log(`[MODE SELECTOR] Mode change requested: ${requestedMode}`);
+            
+            // Function to attempt mode change with retries
+            let attemptCount = 0;
+            const maxAttempts = 10;
+            
+            const attemptModeChange = async () => {
+                attemptCount++;
+                console.log(`[MODE SELECTOR] Attempt ${attemptCount}/${maxAttempts} for mode: ${requestedMode}`);
                 
-                // Start first attempt after initial delay
-                setTimeout(attemptModeChange, 2000);
-            }
+                const success = await changeFlowMode(requestedMode);
+                if (!success && attemptCount < maxAttempts) {
+                    // Retry with increasing delay
+                    const delay = Math.min(1000 + (attemptCount * 500), 5000);
+                    console.log(`[MODE SELECTOR] Retrying in ${delay}ms...`);
+                    setTimeout(attemptModeChange, delay);
+                } else if (success) {
+                    console.log(`[MODE SELECTOR] Successfully changed to ${requestedMode} mode`);
+                } else {
+                    console.log(`[MODE SELECTOR] Failed to change mode after ${maxAttempts} attempts`);
+                }
+            };
+            
+            // Start first attempt after initial delay
+            setTimeout(attemptModeChange, 2000);
+        }
+    }
+}
+
+function startMonitoring() {
+    if (modeWatcher) return;
+    
+    // The combobox rendering (again) is the usual moment to act on a request
+    modeWatcher = veoDomWatch.watch('flow_mode_selector', checkModeRequest, { selector: 'button[role="combobox"]' });
+    
+    // A request can also arrive after the combobox is there: a new hash, an SPA
+    // navigation into /project/ that keeps the combobox, or the marker being written.
+    // The hooks are installed once per document and call the latest watcher.
+    const hooksInstalled = !!window.veoModeRequestCheck;
+    window.veoModeRequestCheck = modeWatcher.trigger;
+    if (hooksInstalled) return;
+    
+    const requestCheck = () => window.veoModeRequestCheck();
+    window.addEventListener('hashchange', requestCheck);
+    window.addEventListener('popstate', requestCheck);
+    for (const method of ['pushState', 'replaceState']) {
+        const original = history[method];
+        history[method] = function() {
+            const result = original.apply(this, arguments);
+            requestCheck();
+            return result;
+        };
+    }
+    const originalSetItem = Storage.prototype.setItem;
+    Storage.prototype.setItem = function(key) {
+        originalSetItem.apply(this, arguments);
+        if (key === 'veo_flow_mode' && this === window.sessionStorage) {
+            requestCheck();
         }
-    }, 500);
+    };
 }
 
 // Check immediately if mode was requested
@@ -218,12 +244,4 @@ window.debugModeSelector = () => {
     console.log('[MODE SELECTOR DEBUG] Available buttons:', Array.from(document.querySelectorAll('button')).map(b => b.textContent).filter(t => t));
 };
 
-// Also check mode periodically in case sessionStorage was set before script loaded
-setInterval(() => {
-    const mode = sessionStorage.getItem('veo_flow_mode');
-    if (mode) {
-        console.log(`[MODE SELECTOR] Found pending mode in sessionStorage: ${mode}`);
-    }
-}, 1000);
-
 console.log('[MODE SELECTOR] Flow mode selector v2 ready');
\ No newline at end of file
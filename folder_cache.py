@@ -0,0 +1,161 @@
+"""Drive upload folder resolution with a persisted ID cache and optional date subfolders"""
+
+import json
+import os
+import threading
+from datetime import datetime
+
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+PUBLIC_PERMISSION = {'type': 'anyone', 'role': 'reader'}
+
+# Seconds an upload waits for the first (uncached) folder lookup
+RESOLVE_TIMEOUT = 60
+
+
+def subfolder_format_from_env():
+    """strftime pattern for date subfolders from VEO_UPLOAD_SUBFOLDER, e.g. %Y-%m-%d"""
+    return os.environ.get('VEO_UPLOAD_SUBFOLDER') or None
+
+
+class DriveFolderResolver:
+    """Resolves the upload folder ID without making startup wait on Drive
+
+    Folder IDs are stored in a small JSON file under cache_key (one key per
+    account). A cached root ID is used straight away and checked in the
+    background; if the folder was deleted or trashed it is looked up or
+    created again. With no cache the lookup runs in the background and the
+    first upload waits for it; if that lookup failed, each upload retries it
+    until one succeeds. Date subfolders are created on demand and remembered
+    in the same cache.
+    """
+
+    def __init__(self, cache_path, cache_key, folder_name, service_factory,
+                 make_public=False, subfolder_format=None):
+        self.cache_path = cache_path
+        self.cache_key = cache_key
+        self.folder_name = folder_name
+        self.service_factory = service_factory
+        self.make_public = make_public
+        self.subfolder_format = subfolder_format
+        self._lock = threading.Lock()
+        self._resolved = threading.Event()
+        self._root_id = None
+        self._subfolders = {}
+
+    @property
+    def root_id(self):
+        """Current root folder ID, or None while it is still being resolved"""
+        return self._root_id
+
+    def start(self):
+        """Use the cached root ID if there is one and validate it in the background"""
+        entry = self._load_cache().get(self.cache_key, {})
+        if entry.get('root'):
+            self._root_id = entry['root']
+            self._subfolders = dict(entry.get('subfolders', {}))
+            self._resolved.set()
+            self._announce('cached')
+        threading.Thread(target=self._validate_root, daemon=True).start()
+
+    def upload_folder(self, when=None, timeout=RESOLVE_TIMEOUT):
+        """Folder ID new uploads go into (today's subfolder when sharding is on)"""
+        if not self._resolved.wait(timeout):
+            return None
+        if not self._root_id and not self._retry_root():
+            return None
+        if not self.subfolder_format:
+            return self._root_id
+
+        name = (when or datetime.now()).strftime(self.subfolder_format)
+        folder_id = self._subfolders.get(name)
+        if folder_id:
+            return folder_id
+        with self._lock:
+            if name not in self._subfolders:
+                try:
+                    self._subfolders[name] = self._find_or_create(name, self._root_id)
+                    self._save_cache()
+                except Exception as e:
+                    print(f"Error with subfolder '{name}': {e}")
+                    return self._root_id
+            return self._subfolders[name]
+
+    def _retry_root(self):
+        """Look the root folder up again after the background lookup failed"""
+        with self._lock:
+            if self._root_id:
+                return self._root_id
+            try:
+                self._root_id = self._find_or_create(self.folder_name)
+                self._subfolders = {}
+                self._save_cache()
+            except Exception as e:
+                print(f"Error with folder: {e}")
+                return None
+        self._announce('found')
+        return self._root_id
+
+    def _validate_root(self):
+        cached_id = self._root_id
+        try:
+            if cached_id and self._folder_exists(cached_id):
+                return
+            with self._lock:
+                self._root_id = self._find_or_create(self.folder_name)
+                self._subfolders = {}
+                self._save_cache()
+            self._announce('found' if not cached_id else 'replaced')
+        except Exception as e:
+            # Keep using a cached ID through network errors
+            print(f"Error with folder: {e}")
+        finally:
+            self._resolved.set()
+
+    def _folder_exists(self, folder_id):
+        try:
+            folder = self.service_factory().files().get(fileId=folder_id, fields='id, trashed').execute()
+        except Exception as e:
+            if getattr(getattr(e, 'resp', None), 'status', None) == 404:
+                return False
+            raise
+        return not folder.get('trashed')
+
+    def _find_or_create(self, name, parent_id=None):
+        service = self.service_factory()
+        query = f"name='{name}' and mimeType='{FOLDER_MIME_TYPE}' and trashed=false"
+        if parent_id:
+            query += f" and '{parent_id}' in parents"
+        files = service.files().list(q=query, spaces='drive', fields='files(id, name)').execute().get('files', [])
+        if files:
+            return files[0]['id']
+
+        file_metadata = {'name': name, 'mimeType': FOLDER_MIME_TYPE}
+        if parent_id:
+            file_metadata['parents'] = [parent_id]
+        folder_id = service.files().create(body=file_metadata, fields='id').execute().get('id')
+        if self.make_public:
+            service.permissions().create(fileId=folder_id, body=PUBLIC_PERMISSION).execute()
+        print(f"✨ Created new folder '{name}'")
+        return folder_id
+
+    def _announce(self, how):
+        print(f"📁 Using folder '{self.folder_name}' (ID: {self._root_id}, {how})")
+        print(f"📂 View all uploads: https://drive.google.com/drive/folders/{self._root_id}")
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self):
+        cache = self._load_cache()
+        cache[self.cache_key] = {'root': self._root_id, 'subfolders': self._subfolders}
+        temp_path = self.cache_path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, indent=2)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            print(f"Could not save folder cache: {e}")
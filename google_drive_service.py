@@ -1,6 +1,7 @@
 import os
 import time
 import json
+import threading
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaFileUpload
@@ -10,16 +11,24 @@ from pathlib import Path
 class GoogleDriveService:
     def __init__(self, service_account_file, folder_id):
         self.folder_id = folder_id
-        self.service = self._authenticate(service_account_file)
+        self.credentials = self._authenticate(service_account_file)
+        self.thread_local = threading.local()
         
     def _authenticate(self, service_account_file):
         """Authenticate using service account"""
         SCOPES = ['https://www.googleapis.com/auth/drive.file']
         
-        credentials = service_account.Credentials.from_service_account_file(
+        return service_account.Credentials.from_service_account_file(
             service_account_file, scopes=SCOPES)
-        
-        return build('drive', 'v3', credentials=credentials)
+    
+    @property
+    def service(self):
+        """Drive client for the calling thread (httplib2 clients are not thread-safe)"""
+        service = getattr(self.thread_local, 'service', None)
+        if service is None:
+            service = build('drive', 'v3', credentials=self.credentials)
+            self.thread_local.service = service
+        return service
     
     def find_latest_video(self, download_dir="~/Downloads", max_age_seconds=60):
         """Find the most recently downloaded video file"""
@@ -147,18 +156,20 @@ class GoogleDriveService:
 
 # Global instance
 _drive_service = None
+_drive_service_lock = threading.Lock()
 
 def get_drive_service():
-    """Get or create the global drive service instance"""
+    """Get or create the global drive service instance (safe to call from upload threads)"""
     global _drive_service
-    if _drive_service is None:
-        service_account_file = os.path.join(
-            os.path.dirname(__file__), 
-            'res', 
-            'drive_api_key.json'
-        )
-        folder_id = "1PlkqWPD7nSxzRLKJpubFP1XiZLMvn35l"
-        _drive_service = GoogleDriveService(service_account_file, folder_id)
+    with _drive_service_lock:
+        if _drive_service is None:
+            service_account_file = os.path.join(
+                os.path.dirname(__file__), 
+                'res', 
+                'drive_api_key.json'
+            )
+            folder_id = "1PlkqWPD7nSxzRLKJpubFP1XiZLMvn35l"
+            _drive_service = GoogleDriveService(service_account_file, folder_id)
     return _drive_service
 
 
@@ -0,0 +1,103 @@
+"""Google login driven by page state instead of fixed sleeps"""
+
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+LOGIN_URL = "https://accounts.google.com"
+
+# Cookies Google sets for a signed-in account
+SESSION_COOKIES = ('SID', '__Secure-1PSID', '__Secure-3PSID')
+
+STATE_LOGGED_IN = 'logged_in'
+STATE_EMAIL = 'email'
+STATE_PASSWORD = 'password'
+
+POLL_INTERVAL = 0.1
+
+# One call per poll: which login step (if any) the page is showing
+LOGIN_STATE_SCRIPT = """
+function visible(el) { return !!el && el.offsetParent !== null && !el.disabled; }
+const url = location.href;
+if (url.includes('myaccount.google.com') || !url.includes('accounts.google.com')) return 'logged_in';
+if (visible(document.querySelector('input[name="Passwd"]'))) return 'password';
+if (visible(document.getElementById('identifierId'))) return 'email';
+return null;
+"""
+
+
+def has_session_cookies(driver):
+    """True if the Chrome profile already holds unexpired Google session cookies"""
+    try:
+        cookies = driver.execute_cdp_cmd('Network.getCookies', {'urls': [LOGIN_URL, 'https://www.google.com']})
+    except (AttributeError, WebDriverException):
+        return False
+    now = time.time()
+    for cookie in cookies.get('cookies', []):
+        if cookie.get('name') in SESSION_COOKIES:
+            expires = cookie.get('expires', -1)
+            if expires in (-1, 0) or expires > now:
+                return True
+    return False
+
+
+def _wait_for_state(driver, states, timeout):
+    """Wait until the page reaches one of states; returns it, or None on timeout"""
+    def reached(d):
+        state = d.execute_script(LOGIN_STATE_SCRIPT)
+        return state if state in states else False
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL,
+                             ignored_exceptions=(WebDriverException,)).until(reached)
+    except TimeoutException:
+        return None
+
+
+def _type_into(driver, selector, text):
+    field = driver.find_element(By.CSS_SELECTOR, selector)
+    field.clear()
+    field.send_keys(text)
+    field.send_keys(Keys.RETURN)
+
+
+def login_to_google(driver, email, password):
+    try:
+        # Warm start: the profile is already signed in, no page load needed
+        if has_session_cookies(driver):
+            print("Already logged in! (session cookies found)")
+            return True
+
+        print("Navigating to Google login...")
+        driver.get(LOGIN_URL)
+
+        # Race: signed-in redirect vs. email field vs. password field
+        state = _wait_for_state(driver, (STATE_LOGGED_IN, STATE_EMAIL, STATE_PASSWORD), timeout=15)
+
+        if state == STATE_EMAIL:
+            _type_into(driver, '#identifierId', email)
+            print("Email entered, proceeding to password...")
+            state = _wait_for_state(driver, (STATE_LOGGED_IN, STATE_PASSWORD), timeout=20)
+
+        if state == STATE_PASSWORD:
+            _type_into(driver, 'input[name="Passwd"]', password)
+            print("Password entered, logging in...")
+            state = _wait_for_state(driver, (STATE_LOGGED_IN,), timeout=20)
+            if state is None:
+                print("Login verification needed. Current URL:", driver.current_url)
+                return True
+
+        if state == STATE_LOGGED_IN:
+            print("Login successful!")
+        else:
+            print("Already logged in or different login flow")
+        return True
+
+    except Exception as e:
+        print(f"Error during login: {e}")
+        # Check if it's a window closed error
+        if "no such window" in str(e) or "target window already closed" in str(e):
+            print("Chrome window was closed. Please don't close the browser window.")
+        return False
@@ -18,93 +18,9 @@
         return homeButton;
     }
     
-    // Function to check for percentage on screen
+    // Generation progress comes from the shared progress tracker
     function hasPercentageOnScreen() {
-        // Method 1: Look for any element containing percentage
-        const allElements = document.getElementsByTagName('*');
-        for (let i = 0; i < allElements.length; i++) {
-            const element = allElements[i];
-            
-            // Skip script and style tags
-            if (element.tagName === 'SCRIPT' || element.tagName === 'STYLE') continue;
-            
-            // Get direct text content (not from children)
-            let text = '';
-            for (let j = 0; j < element.childNodes.length; j++) {
-                const node = element.childNodes[j];
-                if (node.nodeType === Node.TEXT_NODE) {
-                    text += node.textContent;
-                }
-            }
-            
-            text = text.trim();
-            
-            // Check if it contains percentage
-            if (text && /\d+%/.test(text)) {
-                // Make sure element is visible
-                const style = window.getComputedStyle(element);
-                if (style.display !== 'none' && 
-                    style.visibility !== 'hidden' && 
-                    style.opacity !== '0') {
-                    
-                    const rect = element.getBoundingClientRect();
-                    if (rect.width > 0 && rect.height > 0) {
-                        console.log('🎯 Found percentage:', text, 'in', element.className || element.tagName);
-                        return true;
-                    }
-                }
-            }
-        }
-        
-        // Method 2: Check specific selectors for Google's UI
-        const percentageSelectors = [
-            // Styled components patterns
-            'div[class*="sc-"]',
-            'span[class*="sc-"]',
-            // Common progress/loading patterns
-            '[class*="progress"]',
-            '[class*="percent"]',
-            '[class*="loading"]',
-            '[class*="status"]',
-            // Specific classes from example
-            '.krAKfQ',
-            // Any div that might contain percentage
-            'div:not(:empty)',
-            'span:not(:empty)'
-        ];
-        
-        for (const selector of percentageSelectors) {
-            try {
-                const elements = document.querySelectorAll(selector);
-                for (const el of elements) {
-                    const text = el.textContent?.trim() || '';
-                    // More flexible percentage matching
-                    if (/\d{1,3}\s*%/.test(text) || /^\d{1,3}%$/.test(text)) {
-                        // Double check visibility
-                        const rect = el.getBoundingClientRect();
-                        if (rect.top >= 0 && rect.left >= 0 && 
-                            rect.bottom <= window.innerHeight && 
-                            rect.right <= window.innerWidth &&
-                            rect.width > 0 && rect.height > 0) {
-                            console.log('🎯 Found percentage via selector:', selector, text);
-                            return true;
-                        }
-                    }
-                }
-            } catch (e) {
-                // Ignore selector errors
-            }
-        }
-        
-        // Method 3: Check for percentage in page text
-        const bodyText = document.body.innerText || document.body.textContent || '';
-        const percentageMatch = bodyText.match(/\b\d{1,3}%/);
-        if (percentageMatch) {
-            console.log('🎯 Found percentage in page text:', percentageMatch[0]);
-            return true;
-        }
-        
-        return false;
+        return veoProgress.current().active;
     }
     
     // Function to hide/show home button
@@ -126,11 +42,13 @@
                 }
             }, 300);
             isHidden = true;
-            lastPercentageTime = Date.now();
             console.log('🏠 Home button hidden - percentage detected');
         } else if (!hasPercentage && isHidden) {
             // Only show if percentage has been gone for at least 1 second
-            if (Date.now() - lastPercentageTime > 1000) {
+            const remaining = 1000 - (Date.now() - lastPercentageTime);
+            if (remaining > 0) {
+                setTimeout(updateHomeButtonVisibility, remaining);
+            } else {
                 // Show the button
                 homeButton.style.display = '';
                 setTimeout(() => {
@@ -144,64 +62,26 @@
         }
     }
     
-    // Monitor for changes
+    // Re-check whenever generation progress starts, moves or ends
     function startMonitoring() {
-        // Initial check
-        updateHomeButtonVisibility();
-        
-        // Check more frequently during active periods
-        let checkInterval = 250; // Check every 250ms
-        setInterval(updateHomeButtonVisibility, checkInterval);
-        
-        // Also add debug logging
-        setInterval(() => {
-            const hasPercent = hasPercentageOnScreen();
-            if (hasPercent) {
-                console.log('🔍 Percentage detection active - home button should be hidden');
-            }
-        }, 2000);
-        
-        // Also monitor DOM changes
-        const observer = new MutationObserver((mutations) => {
-            // Check if any mutation might have added/removed percentage
-            let shouldCheck = false;
-            
-            for (const mutation of mutations) {
-                if (mutation.type === 'childList') {
-                    // Check added nodes
-                    for (const node of mutation.addedNodes) {
-                        if (node.nodeType === 1 && node.textContent?.includes('%')) {
-                            shouldCheck = true;
-                            break;
-                        }
-                    }
-                    // Check removed nodes
-                    for (const node of mutation.removedNodes) {
-                        if (node.nodeType === 1 && node.textContent?.includes('%')) {
-                            shouldCheck = true;
-                            break;
-                        }
-                    }
-                } else if (mutation.type === 'characterData') {
-                    // Text content changed
-                    if (mutation.target.textContent?.includes('%')) {
-                        shouldCheck = true;
-                    }
-                }
+        veoProgress.subscribe((progress) => {
+            if (progress.active) {
+                lastPercentageTime = Date.now();
             }
-            
-            if (shouldCheck) {
-                updateHomeButtonVisibility();
-            }
-        });
-        
-        observer.observe(document.body, {
-            childList: true,
-            subtree: true,
-            characterData: true
+            updateHomeButtonVisibility();
         });
     }
     
+    // The injector may add (or re-add) the button after progress has started
+    veoDomWatch.watch('home_button_auto_hider', () => {
+        const previous = homeButton;
+        if (findHomeButton() && homeButton !== previous) {
+            // A new button starts out visible
+            isHidden = false;
+            updateHomeButtonVisibility();
+        }
+    }, { selector: '#veo-home-button', immediate: false });
+    
     // Start when page is ready
     if (document.readyState === 'loading') {
         document.addEventListener('DOMContentLoaded', startMonitoring);
@@ -3,8 +3,8 @@
 
 // Function to inject home button
 function injectHomeButton() {
-    // Check if home button already exists
-    if (document.getElementById('veo-home-button')) {
+    // Check if home button already exists (or there is no body to add it to yet)
+    if (!document.body || document.getElementById('veo-home-button')) {
         return;
     }
     
@@ -64,11 +64,16 @@ function injectHomeButton() {
         } else {
             // Not on Flow page or function not available, go home directly
             // Not on Flow page or chat deleter not available - going home directly
-            const navSignal = document.createElement('div');
-            navSignal.id = 'veo-navigate-to-pg1';
-            navSignal.style.display = 'none';
-            navSignal.setAttribute('data-timestamp', Date.now());
-            document.body.appendChild(navSignal);
+            if (typeof window.veoNavSignal === 'function') {
+                // Python is listening on the DevTools binding
+                window.veoNavSignal('direct');
+            } else {
+                const navSignal = document.createElement('div');
+                navSignal.id = 'veo-navigate-to-pg1';
+                navSignal.style.display = 'none';
+                navSignal.setAttribute('data-timestamp', Date.now());
+                document.body.appendChild(navSignal);
+            }
         }
     };
     
@@ -89,14 +94,11 @@ if (document.readyState === 'loading') {
     document.addEventListener('DOMContentLoaded', injectHomeButton);
 }
 
-// Monitor for page changes (for SPAs)
-const observer = new MutationObserver(() => {
-    injectHomeButton();
-});
-
-observer.observe(document.body, {
-    childList: true,
-    subtree: true
+// Re-inject when a re-render removes the button (for SPAs), at most once per frame
+veoDomWatch.watch('home_button_injector', injectHomeButton, {
+    selector: '#veo-home-button',
+    removals: true,
+    immediate: false
 });
 
 // Home button injector ready
\ No newline at end of file
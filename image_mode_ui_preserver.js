@@ -70,55 +70,19 @@
     
     // Monitor for mode changes
     function startMonitoring() {
+        // Re-apply when the toolbar is rendered or its style/class changes
+        veoDomWatch.watch('image_mode_ui_preserver', () => {
+            if (isImageMode()) preserveInputButtons();
+        }, { selector: '.gxAzIM', attributes: ['style', 'class'], idle: true, immediate: false });
+        
         // Initial check
         preserveInputButtons();
         
-        // Check periodically
-        setInterval(preserveInputButtons, 2000);
-        
-        // Also monitor for URL changes
-        let lastHash = window.location.hash;
-        setInterval(() => {
-            if (window.location.hash !== lastHash) {
-                lastHash = window.location.hash;
-                console.log('URL hash changed, checking mode...');
-                setTimeout(preserveInputButtons, 100);
-            }
-        }, 500);
-        
-        // Monitor DOM for toolbar removal
-        const observer = new MutationObserver((mutations) => {
-            for (const mutation of mutations) {
-                if (mutation.type === 'attributes' && 
-                    mutation.attributeName === 'style' &&
-                    mutation.target.classList?.contains('gxAzIM')) {
-                    
-                    if (isImageMode()) {
-                        console.log('Toolbar style changed in image mode - preserving!');
-                        preserveInputButtons();
-                    }
-                }
-            }
+        // Also check when the URL hash changes
+        window.addEventListener('hashchange', () => {
+            console.log('URL hash changed, checking mode...');
+            preserveInputButtons();
         });
-        
-        // Start observing when DOM is ready
-        setTimeout(() => {
-            const toolbar = document.querySelector('.gxAzIM');
-            if (toolbar) {
-                observer.observe(toolbar, {
-                    attributes: true,
-                    attributeFilter: ['style', 'class']
-                });
-            }
-            
-            // Also observe parent containers
-            observer.observe(document.body, {
-                childList: true,
-                subtree: true,
-                attributes: true,
-                attributeFilter: ['style']
-            });
-        }, 1000);
     }
     
     // Start monitoring
@@ -1,19 +1,24 @@
 """Integrated Google Drive service that runs within the main process"""
 
 import os
-import json
 import threading
-import time
 from pathlib import Path
 from datetime import datetime
-import hashlib
-import http.server
-import socketserver
+import mimetypes
+
+from download_watcher import create_download_watcher
+from download_completion import DownloadCompletionTracker
+from upload_status import UploadEventHub, create_status_server, STATUS_PORT
+from resumable_upload import ResumableUploader, chunk_size_from_env
+from upload_jobs import UploadJobQueue, DEFAULT_WORKERS
+from upload_hashing import HashingFileReader, file_sha256, quick_fingerprint
+from drive_metadata import DriveMetadata, GRANT_TIMEOUT
+from folder_cache import DriveFolderResolver, subfolder_format_from_env
 
 try:
     from google.oauth2 import service_account
     from googleapiclient.discovery import build
-    from googleapiclient.http import MediaFileUpload
+    from google.auth.transport.requests import AuthorizedSession
     GOOGLE_API_AVAILABLE = True
 except ImportError:
     GOOGLE_API_AVAILABLE = False
@@ -24,19 +29,35 @@ class IntegratedDriveService:
     
     def __init__(self):
         self.service = None
-        self.folder_id = None  # Will create or find folder
         self.folder_name = 'Veo_Uploads'
+        self.folder_resolver = DriveFolderResolver(
+            os.path.join(os.path.dirname(__file__), 'folder_cache.json'),
+            'service_account',
+            self.folder_name,
+            self.get_thread_service,
+            make_public=True,
+            subfolder_format=subfolder_format_from_env()
+        )
         self.download_dir = os.path.expanduser('~/Downloads')
         self.service_account_path = os.path.join(os.path.dirname(__file__), 'res', 'drive_api_key.json')
         self.monitored_files = set()
-        self.upload_queue = []
+        self.upload_queue = None
+        self.upload_workers = int(os.environ.get('VEO_UPLOAD_WORKERS', DEFAULT_WORKERS))
+        self.upload_chunk_size = chunk_size_from_env()
+        self.thread_local = threading.local()
+        self.credentials = None
         self.running = False
         self.monitor_thread = None
-        self.upload_thread = None
+        self.download_watcher = None
+        self.completion_tracker = None
         self.uploaded_hashes = set()  # Track uploaded files by hash
+        self.uploaded_fingerprints = {}  # Quick fingerprint -> hash (None while uploading)
+        self.deferred_downloads = {}  # Quick fingerprint -> [(filepath, filename)] waiting on an upload in flight
+        self.fingerprint_lock = threading.Lock()  # Guards the three above; workers update them
         self.web_server = None
         self.web_thread = None
-        self.latest_upload_data = None
+        self.upload_events = UploadEventHub()
+        self.drive_metadata = DriveMetadata(self.get_thread_service)
         
     def initialize(self):
         """Initialize the Google Drive service"""
@@ -49,79 +70,23 @@ class IntegratedDriveService:
             return False
             
         try:
-            credentials = service_account.Credentials.from_service_account_file(
+            self.credentials = service_account.Credentials.from_service_account_file(
                 self.service_account_path,
                 scopes=['https://www.googleapis.com/auth/drive']
             )
-            self.service = build('drive', 'v3', credentials=credentials)
+            self.service = build('drive', 'v3', credentials=self.credentials)
             print("✅ Google Drive service initialized")
             
-            # Create or find upload folder
-            self.folder_id = self.get_or_create_folder()
-            if self.folder_id:
-                print(f"📁 Using folder '{self.folder_name}' (ID: {self.folder_id})")
-                folder_link = f"https://drive.google.com/drive/folders/{self.folder_id}"
-                print(f"📂 View all uploads: {folder_link}")
-                return True
-            else:
-                print("ERROR: Could not create/find upload folder")
-                return False
+            # Use the cached upload folder; Drive is checked in the background
+            self.folder_resolver.start()
+            return True
         except Exception as e:
             print(f"ERROR: Failed to initialize Drive service: {e}")
             return False
     
-    def get_or_create_folder(self):
-        """Get or create the upload folder"""
-        try:
-            # Search for existing folder
-            results = self.service.files().list(
-                q=f"name='{self.folder_name}' and mimeType='application/vnd.google-apps.folder' and trashed=false",
-                spaces='drive',
-                fields='files(id, name)'
-            ).execute()
-            
-            files = results.get('files', [])
-            
-            if files:
-                # Folder exists
-                return files[0]['id']
-            else:
-                # Create new folder
-                file_metadata = {
-                    'name': self.folder_name,
-                    'mimeType': 'application/vnd.google-apps.folder'
-                }
-                
-                folder = self.service.files().create(
-                    body=file_metadata,
-                    fields='id'
-                ).execute()
-                
-                folder_id = folder.get('id')
-                
-                # Make folder publicly accessible
-                self.service.permissions().create(
-                    fileId=folder_id,
-                    body={'type': 'anyone', 'role': 'reader'}
-                ).execute()
-                
-                print(f"✨ Created new folder '{self.folder_name}'")
-                return folder_id
-                
-        except Exception as e:
-            print(f"Error with folder: {e}")
-            return None
-    
     def get_file_hash(self, filepath):
         """Get SHA256 hash of file to detect duplicates"""
-        try:
-            sha256_hash = hashlib.sha256()
-            with open(filepath, "rb") as f:
-                for byte_block in iter(lambda: f.read(4096), b""):
-                    sha256_hash.update(byte_block)
-            return sha256_hash.hexdigest()
-        except:
-            return None
+        return file_sha256(filepath)
     
     def is_video_file(self, filename):
         """Check if file is a video"""
@@ -132,101 +97,171 @@ class IntegratedDriveService:
         """Monitor downloads folder for new video files"""
         print(f"📁 Monitoring {self.download_dir} for new videos...")
         
-        # Track existing files at startup
+        self.download_watcher = create_download_watcher(self.download_dir, self.handle_download_event)
+        self.completion_tracker = DownloadCompletionTracker(
+            self.download_dir,
+            is_wanted=self.is_video_file,
+            on_complete=self.queue_finished_download,
+            reports_close=self.download_watcher.reports_close
+        )
+        self.completion_tracker.start()
+        
         try:
-            existing_files = set(os.listdir(self.download_dir))
-        except:
-            existing_files = set()
+            self.download_watcher.run()
+        except Exception as e:
+            print(f"Monitor error: {e}")
+    
+    def handle_download_event(self, event, filename):
+        """Handle a change in the downloads folder reported by the watcher"""
+        self.completion_tracker.handle_event(event, filename)
+    
+    def queue_finished_download(self, filepath, filename):
+        """Fingerprint a completed download and queue it unless already uploaded
+        
+        A quick fingerprint match is only a hint; it must be confirmed with
+        file_sha256. While the matching upload is still in flight its hash is
+        unknown, so the file waits and is checked again when that upload ends.
+        """
+        fingerprint = quick_fingerprint(filepath)
+        if not fingerprint:
+            return
+        
+        with self.fingerprint_lock:
+            seen = fingerprint in self.uploaded_fingerprints
+            if seen and self.uploaded_fingerprints[fingerprint] is None:
+                self.deferred_downloads.setdefault(fingerprint, []).append((filepath, filename))
+                print(f"⏳ {filename} looks like an upload in progress - checking once it finishes")
+                return
         
-        while self.running:
-            try:
-                current_files = set(os.listdir(self.download_dir))
-                new_files = current_files - existing_files
-                
-                for filename in new_files:
-                    if self.is_video_file(filename):
-                        filepath = os.path.join(self.download_dir, filename)
-                        
-                        # Wait for file to be completely written
-                        time.sleep(1)
-                        
-                        # Check if file is complete
-                        try:
-                            file_size = os.path.getsize(filepath)
-                            time.sleep(0.5)
-                            if os.path.getsize(filepath) == file_size:  # File size stable
-                                file_hash = self.get_file_hash(filepath)
-                                
-                                if file_hash and file_hash not in self.uploaded_hashes:
-                                    print(f"🎬 New video detected: {filename}")
-                                    self.upload_queue.append((filepath, filename, file_hash))
-                                    self.uploaded_hashes.add(file_hash)
-                                else:
-                                    print(f"⏭️  Skipping duplicate: {filename}")
-                        except:
-                            pass
-                
-                existing_files = current_files
-                time.sleep(1)
-                
-            except Exception as e:
-                print(f"Monitor error: {e}")
-                time.sleep(2)
+        if seen:
+            file_hash = self.get_file_hash(filepath)
+            with self.fingerprint_lock:
+                duplicate = file_hash in self.uploaded_hashes
+            if duplicate:
+                print(f"⏭️  Skipping duplicate: {filename}")
+                return
+        
+        with self.fingerprint_lock:
+            if self.uploaded_fingerprints.get(fingerprint, False) is None:
+                # Another upload with this fingerprint started while hashing
+                self.deferred_downloads.setdefault(fingerprint, []).append((filepath, filename))
+                return
+            self.uploaded_fingerprints[fingerprint] = None
+        
+        print(f"🎬 New video detected: {filename}")
+        if not self.upload_queue.submit(filepath, filename, fingerprint):
+            self.finish_fingerprint(fingerprint, None)
     
-    def process_uploads(self):
-        """Process upload queue"""
-        while self.running:
-            if self.upload_queue:
-                filepath, filename, file_hash = self.upload_queue.pop(0)
-                
-                if os.path.exists(filepath):
-                    print(f"⬆️  Uploading {filename} to Google Drive...")
-                    download_link = self.upload_file(filepath, filename)
-                    
-                    if download_link:
-                        print(f"✅ Upload complete!")
-                        print(f"🔗 Download link: {download_link}")
-                        
-                        # Inject JavaScript to show QR code
-                        self.show_qr_in_browser(download_link)
-                        
-                        # Optionally delete local file after successful upload
-                        # os.remove(filepath)
-                    else:
-                        print(f"❌ Upload failed for {filename}")
-                        # Remove from uploaded hashes to retry later
-                        self.uploaded_hashes.discard(file_hash)
-                
-            time.sleep(0.5)
+    def finish_fingerprint(self, fingerprint, file_hash):
+        """Record an upload's outcome (file_hash None on failure) and re-check files waiting on it"""
+        with self.fingerprint_lock:
+            if file_hash:
+                self.uploaded_hashes.add(file_hash)
+                self.uploaded_fingerprints[fingerprint] = file_hash
+            else:
+                # Forget the fingerprint to retry later
+                self.uploaded_fingerprints.pop(fingerprint, None)
+            waiting = self.deferred_downloads.pop(fingerprint, [])
+        
+        for filepath, filename in waiting:
+            if os.path.exists(filepath):
+                self.queue_finished_download(filepath, filename)
     
-    def upload_file(self, filepath, filename):
-        """Upload file to Google Drive"""
-        if not self.service or not self.folder_id:
+    def process_upload_job(self, job):
+        """Upload one queued file (runs on an upload worker) and return its link"""
+        filepath, filename, fingerprint = job.filepath, job.filename, job.fingerprint
+        
+        if not os.path.exists(filepath):
+            self.finish_fingerprint(fingerprint, None)
+            return None
+        
+        print(f"⬆️  Uploading {filename} to Google Drive...")
+        download_link = None
+        file_hash = None
+        try:
+            # SHA256 is computed from the same reads sent to Drive
+            with HashingFileReader(filepath) as reader:
+                download_link = self.upload_file(filepath, filename, reader)
+                if download_link:
+                    file_hash = reader.hexdigest()
+        except OSError as e:
+            print(f"Upload error: {e}")
+        finally:
+            self.finish_fingerprint(fingerprint, file_hash)
+        
+        if download_link:
+            print(f"✅ Upload complete!")
+            print(f"🔗 Download link: {download_link}")
+            
+            # Inject JavaScript to show QR code
+            self.show_qr_in_browser(download_link, filename)
+            
+            # Optionally delete local file after successful upload
+            # os.remove(filepath)
+        else:
+            print(f"❌ Upload failed for {filename}")
+        return download_link
+    
+    def get_thread_session(self):
+        """Authorized HTTP session for the calling thread, used for media uploads"""
+        session = getattr(self.thread_local, 'session', None)
+        if session is None:
+            session = AuthorizedSession(self.credentials)
+            self.thread_local.session = session
+        return session
+    
+    def get_thread_service(self):
+        """Drive client for the calling thread (httplib2 clients are not thread-safe)"""
+        service = getattr(self.thread_local, 'service', None)
+        if service is None:
+            service = build('drive', 'v3', credentials=self.credentials)
+            self.thread_local.service = service
+        return service
+    
+    def upload_file(self, filepath, filename, reader=None):
+        """Upload file to Google Drive, reading through reader when given"""
+        if not self.service:
             print("ERROR: Service not initialized properly")
             return None
+        
+        if reader is None:
+            with HashingFileReader(filepath) as reader:
+                return self.upload_file(filepath, filename, reader)
+        
+        folder_id = self.folder_resolver.upload_folder()
+        if not folder_id:
+            print("ERROR: Could not create/find upload folder")
+            return None
             
         try:
             # Prepare file metadata
             file_metadata = {
                 'name': f'veo_{datetime.now().strftime("%Y%m%d_%H%M%S")}_{filename}',
-                'parents': [self.folder_id]
+                'parents': [folder_id]
             }
             
-            # Upload file
-            media = MediaFileUpload(filepath, resumable=True)
-            file = self.service.files().create(
-                body=file_metadata,
-                media_body=media,
-                fields='id'
-            ).execute()
+            # Use a pre-generated ID so the link is known without another round trip
+            reserved_id = self.drive_metadata.reserve_file_id()
+            if reserved_id:
+                file_metadata['id'] = reserved_id
+            
+            # Upload file in resumable chunks, retrying from the last committed offset
+            mimetype = mimetypes.guess_type(filepath)[0] or 'application/octet-stream'
+            uploader = ResumableUploader(self.get_thread_session(), chunk_size=self.upload_chunk_size)
+            file = uploader.upload(
+                reader,
+                os.path.getsize(filepath),
+                file_metadata,
+                mimetype,
+                progress=lambda sent, total: self.show_upload_progress(filename, sent, total)
+            )
             
             file_id = file.get('id')
             
-            # Make file publicly accessible
-            self.service.permissions().create(
-                fileId=file_id,
-                body={'type': 'anyone', 'role': 'reader'}
-            ).execute()
+            # Make file publicly accessible (batched with other grants); the link is
+            # only handed out once this file's grant is confirmed
+            if not self.wait_until_public(file_id, filename):
+                return None
             
             # Return direct download link with confirm parameter
             download_link = f"https://drive.google.com/uc?export=download&id={file_id}&confirm=t"
@@ -239,14 +274,47 @@ class IntegratedDriveService:
                 return f"https://drive.google.com/uc?export=download&id={file_id}&confirm=t"
             return None
     
-    def show_qr_in_browser(self, download_link):
-        """Update latest upload data for browser to read"""
+    def wait_until_public(self, file_id, upload):
+        """Queue the public grant for file_id and wait until it is confirmed
+        
+        Returns False (and tells the browser) if the grant was dropped or timed out.
+        """
         try:
-            # Update in-memory data
-            self.latest_upload_data = {
+            granted = self.drive_metadata.make_public(file_id).result(timeout=GRANT_TIMEOUT)
+        except Exception:
+            granted = False
+        if not granted:
+            print(f"❌ {upload} was uploaded but could not be made public")
+            self.show_upload_failed(upload, 'Could not make the file public')
+        return granted
+    
+    def show_upload_progress(self, upload, sent, total):
+        """Publish upload progress so the spinner can show a percentage"""
+        percent = int(sent * 100 / total) if total else 100
+        self.upload_events.publish({
+            'progress': percent,
+            'upload': upload,
+            'timestamp': datetime.now().isoformat()
+        })
+    
+    def show_upload_failed(self, upload, error):
+        """Publish a failed upload so the spinner stops waiting for a link"""
+        self.upload_events.publish({
+            'failed': True,
+            'error': error,
+            'upload': upload,
+            'timestamp': datetime.now().isoformat()
+        })
+    
+    def show_qr_in_browser(self, download_link, upload=None):
+        """Publish the download link for the browser to show as a QR code"""
+        try:
+            # Push link to subscribed browsers
+            self.upload_events.publish({
                 'link': download_link,
+                'upload': upload,
                 'timestamp': datetime.now().isoformat()
-            }
+            })
             
             print(f"📱 QR code ready. Browser will display it automatically.")
             
@@ -254,34 +322,10 @@ class IntegratedDriveService:
             print(f"Error updating QR data: {e}")
     
     def start_web_server(self):
-        """Start a simple web server to serve upload data"""
-        class UploadDataHandler(http.server.SimpleHTTPRequestHandler):
-            service = self
-            
-            def do_GET(self):
-                if self.path.startswith('/latest_upload.json'):
-                    self.send_response(200)
-                    self.send_header('Content-type', 'application/json')
-                    self.send_header('Access-Control-Allow-Origin', '*')
-                    self.end_headers()
-                    
-                    if self.service.latest_upload_data:
-                        self.wfile.write(json.dumps(self.service.latest_upload_data).encode())
-                    else:
-                        self.wfile.write(b'{}')
-                else:
-                    self.send_response(404)
-                    self.end_headers()
-            
-            def log_message(self, format, *args):
-                # Suppress logging
-                pass
-        
-        UploadDataHandler.service = self
-        
+        """Start the status server that serves and pushes upload events"""
         try:
-            self.web_server = socketserver.TCPServer(('localhost', 8888), UploadDataHandler)
-            print("📡 Web server started on http://localhost:8888")
+            self.web_server = create_status_server(self.upload_events, STATUS_PORT)
+            print(f"📡 Web server started on http://localhost:{STATUS_PORT}")
             self.web_server.serve_forever()
         except Exception as e:
             print(f"Web server error: {e}")
@@ -297,24 +341,33 @@ class IntegratedDriveService:
         self.web_thread = threading.Thread(target=self.start_web_server, daemon=True)
         self.web_thread.start()
         
+        # Start upload workers before anything can be queued
+        self.upload_queue = UploadJobQueue(self.process_upload_job, workers=self.upload_workers)
+        self.upload_queue.start()
+        
+        # Batch permission grants and ID refills off the upload path
+        self.drive_metadata.start()
+        
         # Start monitor thread
         self.monitor_thread = threading.Thread(target=self.monitor_downloads, daemon=True)
         self.monitor_thread.start()
         
-        # Start upload thread
-        self.upload_thread = threading.Thread(target=self.process_uploads, daemon=True)
-        self.upload_thread.start()
-        
         print("🚀 Automatic upload service started")
         return True
     
     def stop(self):
         """Stop the service"""
         self.running = False
+        if self.download_watcher:
+            self.download_watcher.stop()
+        if self.completion_tracker:
+            self.completion_tracker.stop()
         if self.monitor_thread:
             self.monitor_thread.join(timeout=2)
-        if self.upload_thread:
-            self.upload_thread.join(timeout=2)
+        if self.upload_queue:
+            self.upload_queue.stop()
+        self.drive_metadata.stop()
+        self.upload_events.close()
         if self.web_server:
             self.web_server.shutdown()
         print("🛑 Automatic upload service stopped")
@@ -1,11 +1,7 @@
 from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import NoSuchElementException, SessionNotCreatedException
 import json
 import time
 import os
@@ -14,7 +10,16 @@ import sys
 import subprocess
 import threading
 import atexit
+import collections
+import re
 from flow_mode_changer import wait_and_change_mode
+from script_bundle import ScriptBundler, InlineScript, ConditionalScript
+from script_injection import ScriptInjectionManager
+from navigation_events import NavigationEvents, EVENT_NAVIGATED, EVENT_SIGNAL
+from page_cache import RenderedPage
+from startup import StartupOrchestrator
+from chromedriver_cache import ChromeDriverCache, ensure_executable
+from google_login import login_to_google
 
 # Suppress WebDriver logging on Windows
 os.environ['WDM_LOG_LEVEL'] = '0'
@@ -29,6 +34,16 @@ logging.getLogger('urllib3').setLevel(logging.WARNING)
 drive_server_process = None
 oauth_service = None
 
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+script_bundler = ScriptBundler(SCRIPT_DIR)
+script_injection = None
+
+CHROME_USER_DATA_DIR = os.path.join(SCRIPT_DIR, 'chrome_user_data')
+chromedriver_cache = ChromeDriverCache(os.path.join(SCRIPT_DIR, 'chromedriver_cache.json'), CHROME_USER_DATA_DIR)
+
+FLOW_URL = "labs.google/fx/ko/tools/flow"
+SKETCH_URL = "gcdemos-25-int-dreamstudio"
+
 def load_credentials(filepath='credentials.json'):
     with open(filepath, 'r') as file:
         return json.load(file)
@@ -134,7 +149,7 @@ def stop_drive_upload_server():
             drive_server_process.kill()
         drive_server_process = None
 
-def setup_driver():
+def build_chrome_options():
     chrome_options = Options()
     chrome_options.add_argument('--disable-blink-features=AutomationControlled')
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
@@ -192,8 +207,7 @@ def setup_driver():
     
     chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
     
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    user_data_dir = os.path.join(current_dir, 'chrome_user_data')
+    user_data_dir = CHROME_USER_DATA_DIR
     
     if not os.path.exists(user_data_dir):
         os.makedirs(user_data_dir)
@@ -202,8 +216,17 @@ def setup_driver():
         print(f"Using existing Chrome user data directory: {user_data_dir}")
     
     chrome_options.add_argument(f'--user-data-dir={user_data_dir}')
+    return chrome_options
+
+def resolve_chromedriver():
+    """Path to a ChromeDriver matching the installed Chrome"""
+    # A driver that already worked with this Chrome major version needs no manager or network
+    driver_path = chromedriver_cache.lookup()
+    if driver_path:
+        print(f"Using cached ChromeDriver for Chrome {chromedriver_cache.chrome_major()}: {driver_path}")
+        return driver_path
     
-    # Always use webdriver_manager to ensure correct version
+    # Otherwise use webdriver_manager to get the correct version
     print("Setting up ChromeDriver...")
     try:
         from webdriver_manager.chrome import ChromeDriverManager
@@ -226,75 +249,36 @@ def setup_driver():
         
         print(f"Using ChromeDriver: {driver_path}")
         
-        if platform.system() != 'Windows':
-            import subprocess
-            try:
-                subprocess.run(['chmod', '+x', driver_path], check=True)
-            except Exception as e:
-                print(f"Warning: Could not set execute permissions: {e}")
-        
-        service = Service(driver_path)
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        print("Successfully connected to Chrome!")
-        return driver
+        ensure_executable(driver_path)
+        return driver_path
         
     except Exception as e:
         print(f"Error setting up ChromeDriver: {e}")
         raise Exception("Could not setup ChromeDriver. Please run 'python install_chromedriver.py' first.")
 
-def login_to_google(driver, email, password):
+def launch_chrome(driver_path, chrome_options=None, retry=True):
+    """Start Chrome through the ChromeDriver at driver_path"""
     try:
-        print("Navigating to Google login...")
-        driver.get("https://accounts.google.com")
-        
-        # Check if window is still open
-        try:
-            current_url = driver.current_url
-        except:
-            print("Chrome window was closed")
-            return False
-        
-        wait = WebDriverWait(driver, 30)
+        service = Service(driver_path)
+        driver = webdriver.Chrome(service=service, options=chrome_options or build_chrome_options())
+        print("Successfully connected to Chrome!")
         
-        try:
-            # Check if already logged in
-            if "myaccount.google.com" in driver.current_url:
-                print("Already logged in!")
-                return True
-                
-            email_input = wait.until(EC.presence_of_element_located((By.ID, "identifierId")))
-            email_input.clear()
-            email_input.send_keys(email)
-            email_input.send_keys(Keys.RETURN)
-            print("Email entered, proceeding to password...")
-            
-            time.sleep(2)
-            
-            password_input = wait.until(EC.presence_of_element_located((By.NAME, "Passwd")))
-            password_input.clear()
-            password_input.send_keys(password)
-            password_input.send_keys(Keys.RETURN)
-            print("Password entered, logging in...")
-            
-            time.sleep(5)
-            
-            if "myaccount.google.com" in driver.current_url or "google.com" in driver.current_url:
-                print("Login successful!")
-                return True
-            else:
-                print("Login verification needed. Current URL:", driver.current_url)
-                return True
-                
-        except TimeoutException:
-            print("Already logged in or different login flow")
-            return True
-            
+        # Remember the driver under the version Chrome actually reports
+        chromedriver_cache.store(driver_path, driver.capabilities.get('browserVersion'))
+        return driver
+    except SessionNotCreatedException as e:
+        # Chrome was probably updated past the cached driver
+        if retry and chromedriver_cache.invalidate(driver_path):
+            print("Cached ChromeDriver does not match Chrome, resolving again...")
+            return launch_chrome(resolve_chromedriver(), build_chrome_options(), retry=False)
+        print(f"Error setting up ChromeDriver: {e}")
+        raise Exception("Could not setup ChromeDriver. Please run 'python install_chromedriver.py' first.")
     except Exception as e:
-        print(f"Error during login: {e}")
-        # Check if it's a window closed error
-        if "no such window" in str(e) or "target window already closed" in str(e):
-            print("Chrome window was closed. Please don't close the browser window.")
-        return False
+        print(f"Error setting up ChromeDriver: {e}")
+        raise Exception("Could not setup ChromeDriver. Please run 'python install_chromedriver.py' first.")
+
+def setup_driver():
+    return launch_chrome(resolve_chromedriver())
 
 def show_pg1(driver):
     current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -303,216 +287,196 @@ def show_pg1(driver):
     # Re-inject console filter on navigation
     inject_console_filters(driver)
 
+def render_pg2(template):
+    """pg2.html from its template with the Flow project URL filled in"""
+    credentials = load_credentials()
+    flow_project_url = credentials.get('flow_project_url', '')
+    print(f"[PG2] Generated pg2.html with project URL: {flow_project_url[:50]}...")
+    return template.replace('{{FLOW_PROJECT_URL}}', flow_project_url)
+
+
+# Rendered once per template/credentials change. It stays on disk next to pg1.html and
+# res/pg2/: pg1.html opens 'pg2.html' itself, and pg2 loads its images and 'pg1.html'
+# by relative file:// paths, which a data: URL or the status server could not resolve
+pg2_page = RenderedPage(
+    os.path.join(SCRIPT_DIR, 'pg2_template.html'),
+    os.path.join(SCRIPT_DIR, 'pg2.html'),
+    render_pg2,
+    dependencies=['credentials.json']
+)
+
 def show_pg2(driver):
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    # Read the template and inject the project URL
-    template_path = os.path.join(current_dir, 'pg2_template.html')
-    if os.path.exists(template_path):
-        # Load credentials to get project URL
-        credentials = load_credentials()
-        flow_project_url = credentials.get('flow_project_url', '')
-        
-        # Read template and replace placeholder
-        with open(template_path, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-        
-        # Replace the placeholder with actual URL
-        html_content = html_content.replace('{{FLOW_PROJECT_URL}}', flow_project_url)
-        
-        # Write to temporary pg2.html
-        pg2_path = os.path.join(current_dir, 'pg2.html')
-        with open(pg2_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        print(f"[PG2] Generated pg2.html with project URL: {flow_project_url[:50]}...")
-    else:
+    if not os.path.exists(pg2_page.template_path):
         # Fallback to existing pg2.html if template not found
-        pg2_path = os.path.join(current_dir, 'pg2.html')
         print("[PG2] Using existing pg2.html (template not found)")
     
-    driver.get(f"file:///{pg2_path}")
+    driver.get(f"file:///{pg2_page.path()}")
     # Re-inject console filter on navigation
     inject_console_filters(driver)
 
+def scripts_registered():
+    """True when page scripts run from CDP registrations instead of execute_script"""
+    return script_injection is not None and script_injection.available
+
+
 def inject_console_filters(driver):
     """Inject console filters to suppress network logs"""
+    if scripts_registered():
+        return  # Already running from document start
     try:
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        early_filter_path = os.path.join(current_dir, 'early_console_filter.js')
-        if os.path.exists(early_filter_path):
-            with open(early_filter_path, 'r', encoding='utf-8') as f:
-                driver.execute_script(f.read())
+        script_bundler.inject(driver, early_page_scripts())
     except:
         pass
 
 
-def setup_download_qr_interceptor(driver):
-    """Setup download interceptor to show QR code instead of downloading"""
+# Messages printed for each script once it has been injected
+SCRIPT_MESSAGES = {
+    'innerHTML_patcher.js': "innerHTML patcher applied for Windows Trusted Types",
+    'suppress_network_errors.js': "Network error suppression active - localhost:8888 errors hidden",
+    'early_console_filter.js': "Early console filter configured - aggressive network log suppression",
+    'console_filter.js': "Console filter configured - fetch logs suppressed",
+    'dom_watch.js': "DOM watch runtime loaded - use veoDomWatch.report() for handler costs",
+    'progress_tracker.js': "Progress tracker loaded - generation progress fires veo:progress events",
+    'debug_download_monitor.js': "Debug download monitor loaded - Press Ctrl+D for debug panel",
+    'flow_mode_selector_v2.js': "Flow mode selector v2 configured - will auto-select requested mode",
+    'simple_download_monitor.js': "Simple download monitor loaded - will show spinner on download button click",
+    'ui_hide_rules.js': "UI hide rules configured - logo, breadcrumb and toolbar hidden by stylesheet",
+    'quality_filter.js': "Quality filter configured - 270p and 1080p options will be hidden",
+    'chat_deleter.js': "Chat deleter configured - will delete chats before going home",
+    'debug_chat_deleter.js': "Debug chat deleter loaded - use window.debugDeleteChats() in console",
+    'debug_video_finder.js': "Debug video finder loaded - use window.debugVideoFinder() in console",
+    'refresh_blocker.js': "Refresh blocker configured - F5 and Ctrl/Cmd+R disabled",
+    'home_button_injector.js': "Home button injector configured - will add home button to external pages",
+    'veo2_auto_switcher.js': "Veo 2 auto-switcher configured - will auto-click quality switch button",
+    'home_button_auto_hider.js': "Home button auto-hider loaded - will hide during processing",
+    'image_mode_ui_preserver.js': "Image mode UI preserver loaded - input box buttons will be preserved",
+}
+
+
+def base_path_script():
+    """Sets window.veoBasePath for the home button"""
+    return InlineScript('veo_base_path', f"window.veoBasePath = {json.dumps(SCRIPT_DIR)};")
+
+
+def early_page_scripts():
+    """Scripts that must run before anything else on every page"""
+    scripts = []
+    
+    # Windows-specific fixes
+    if platform.system() == 'Windows':
+        scripts += ['innerHTML_patcher.js', 'suppress_network_errors.js']
+    
+    # EARLY console filter first to suppress ALL network logs
+    scripts.append('early_console_filter.js')
+    return scripts
+
+
+def download_qr_interceptor_scripts(upload_enabled=None):
+    """Page scripts for the download QR interceptor, in dependency order"""
+    return early_page_scripts() + flow_page_scripts(upload_enabled)
+
+
+def flow_page_scripts(upload_enabled=None):
+    """Flow page scripts that run once the early scripts are in place
+    
+    upload_enabled defaults to whether the upload service is running; startup
+    phases pass it from the 'drive' phase instead of reading the global.
+    """
+    if upload_enabled is None:
+        upload_enabled = oauth_service is not None
+    # Regular console filter as backup; shared DOM watch runtime and progress tracker before their users
+    scripts = ['ui_hide_rules.js', 'console_filter.js', 'dom_watch.js', 'progress_tracker.js']
+    
+    if '--debug-downloads' in sys.argv:
+        scripts.append('debug_download_monitor.js')
+    
+    # Mode changing is handled in Python when navigating to Flow page
+    scripts.append('flow_mode_selector_v2.js')
+    
+    # Upload QR dialog FIRST (before simple_download_monitor, which uses showUploadLoadingSpinner)
+    if not upload_enabled:
+        # Disable upload monitoring if service is not available
+        scripts.append(InlineScript('disable_upload_monitoring', "window.disableUploadMonitoring = true;"))
+    scripts += ['upload_qr_dialog.js', 'simple_download_monitor.js']
+    
+    scripts += ['quality_filter.js', 'chat_deleter.js']
+    
+    if '--debug-chat' in sys.argv:
+        scripts.append('debug_chat_deleter.js')
+    if '--debug-video' in sys.argv:
+        scripts.append('debug_video_finder.js')
+    
+    # Home button needs the base path set first
+    scripts += ['refresh_blocker.js', base_path_script(), 'home_button_injector.js', 'veo2_auto_switcher.js']
+    
+    # Framework function blocker disabled
+    # if platform.system() == 'Windows':
+    #     scripts.append('aggressive_framework_blocker.js')
+    
+    return scripts
+
+
+def sketch_page_scripts():
+    return ['ui_hide_rules.js', 'dom_watch.js', base_path_script(), 'home_button_injector.js']
+
+
+def register_page_scripts(driver, upload_enabled=None):
+    """Register page scripts with Chrome so every navigation runs them before page JS
+    
+    Returns False if CDP is not available; scripts are then injected after
+    each navigation instead.
+    """
+    global script_injection
+    script_injection = ScriptInjectionManager(driver, script_bundler)
+    if not script_injection.available:
+        return False
+    
+    script_injection.register('console', ['.*'], early=early_page_scripts())
+    
+    # Image mode UI preserver only for asset mode (from the URL hash or session storage)
+    asset_mode = ("location.hash.indexOf('veo_mode=asset') !== -1 || "
+                  "sessionStorage.getItem('veo_flow_mode') === 'asset'")
+    # UI hide rules go in at document start so hidden elements never paint
+    names = script_injection.register('flow', [re.escape(FLOW_URL)], early=['ui_hide_rules.js'], parts=flow_page_scripts(upload_enabled) + [
+        'home_button_auto_hider.js',
+        ConditionalScript('image_mode_ui_preserver.js', asset_mode),
+    ])
+    script_injection.register('sketch', [re.escape(SKETCH_URL)], early=['ui_hide_rules.js'], parts=sketch_page_scripts())
+    
+    if not script_injection.available:
+        return False
+    report_injected_scripts(early_page_scripts() + names)
+    print("Page scripts registered - they will run before page JS on every navigation")
+    return True
+
+
+def report_injected_scripts(names, prefix=""):
+    for name in names:
+        if name == 'upload_qr_dialog.js':
+            if oauth_service:
+                print(f"{prefix}Upload QR dialog configured - will show QR code after Google Drive uploads")
+            else:
+                print(f"{prefix}Upload QR dialog configured - monitoring disabled (no upload service)")
+        elif name in SCRIPT_MESSAGES:
+            print(f"{prefix}{SCRIPT_MESSAGES[name]}")
+
+
+def setup_download_qr_interceptor(driver, extra_scripts=()):
+    """Setup download interceptor to show QR code instead of downloading
+    
+    All scripts, plus any extra_scripts, are sent in a single execute_script call.
+    """
     try:
         # Skip Chrome DevTools Protocol command - it requires downloadPath
         # Just use JavaScript monitoring instead
         print("Setting up download monitor...")
         
-        # Get current directory
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        
-        # Add Windows-specific fixes
-        if platform.system() == 'Windows':
-            # innerHTML patcher for Trusted Types
-            patcher_path = os.path.join(current_dir, 'innerHTML_patcher.js')
-            if os.path.exists(patcher_path):
-                with open(patcher_path, 'r', encoding='utf-8') as f:
-                    patcher_script = f.read()
-                driver.execute_script(patcher_script)
-                print("innerHTML patcher applied for Windows Trusted Types")
-            
-            # Suppress network errors for localhost:8888
-            suppress_errors_path = os.path.join(current_dir, 'suppress_network_errors.js')
-            if os.path.exists(suppress_errors_path):
-                with open(suppress_errors_path, 'r', encoding='utf-8') as f:
-                    suppress_script = f.read()
-                driver.execute_script(suppress_script)
-                print("Network error suppression active - localhost:8888 errors hidden")
-        
-        # Add EARLY console filter first to suppress ALL network logs
-        early_filter_path = os.path.join(current_dir, 'early_console_filter.js')
-        if os.path.exists(early_filter_path):
-            with open(early_filter_path, 'r', encoding='utf-8') as f:
-                early_filter_script = f.read()
-            driver.execute_script(early_filter_script)
-            print("Early console filter configured - aggressive network log suppression")
-        
-        # Then add regular console filter as backup
-        console_filter_path = os.path.join(current_dir, 'console_filter.js')
-        if os.path.exists(console_filter_path):
-            with open(console_filter_path, 'r', encoding='utf-8') as f:
-                console_filter_script = f.read()
-            driver.execute_script(console_filter_script)
-            print("Console filter configured - fetch logs suppressed")
-        
-        # Add debug monitor if requested
-        if '--debug-downloads' in sys.argv:
-            debug_monitor_path = os.path.join(current_dir, 'debug_download_monitor.js')
-            if os.path.exists(debug_monitor_path):
-                with open(debug_monitor_path, 'r', encoding='utf-8') as f:
-                    debug_script = f.read()
-                driver.execute_script(debug_script)
-                print("Debug download monitor loaded - Press Ctrl+D for debug panel")
-        
-        # Download handlers disabled to prevent popups
-        
-        # Mode changing is now handled in Python when navigating to Flow page
-        # No need for JavaScript mode changers here
-        
-        # Add Flow mode selector v2
-        mode_selector_path = os.path.join(current_dir, 'flow_mode_selector_v2.js')
-        if os.path.exists(mode_selector_path):
-            with open(mode_selector_path, 'r', encoding='utf-8') as f:
-                mode_selector_script = f.read()
-            driver.execute_script(mode_selector_script)
-            print("Flow mode selector v2 configured - will auto-select requested mode")
-        
-        
-        # Add upload QR dialog handler FIRST (before simple_download_monitor)
-        upload_qr_path = os.path.join(current_dir, 'upload_qr_dialog.js')
-        if os.path.exists(upload_qr_path):
-            # Check if oauth service is running
-            if not oauth_service:
-                # Disable upload monitoring if service is not available
-                driver.execute_script("window.disableUploadMonitoring = true;")
-            with open(upload_qr_path, 'r', encoding='utf-8') as f:
-                upload_qr_script = f.read()
-            driver.execute_script(upload_qr_script)
-            if oauth_service:
-                print("Upload QR dialog configured - will show QR code after Google Drive uploads")
-            else:
-                print("Upload QR dialog configured - monitoring disabled (no upload service)")
-        
-        # NOW load the full simple download monitor (which uses showUploadLoadingSpinner)
-        simple_monitor_path = os.path.join(current_dir, 'simple_download_monitor.js')
-        if os.path.exists(simple_monitor_path):
-            with open(simple_monitor_path, 'r', encoding='utf-8') as f:
-                simple_monitor_script = f.read()
-            driver.execute_script(simple_monitor_script)
-            print("Simple download monitor loaded - will show spinner on download button click")
-        
-        # Add persistent logo hider
-        logo_hider_path = os.path.join(current_dir, 'persistent_logo_hider.js')
-        if os.path.exists(logo_hider_path):
-            with open(logo_hider_path, 'r', encoding='utf-8') as f:
-                logo_hider_script = f.read()
-            driver.execute_script(logo_hider_script)
-            print("Persistent logo hider configured - will continuously hide Google Cloud logo")
-        
-        # Add quality filter to hide 270p and 1080p options
-        quality_filter_path = os.path.join(current_dir, 'quality_filter.js')
-        if os.path.exists(quality_filter_path):
-            with open(quality_filter_path, 'r', encoding='utf-8') as f:
-                quality_filter_script = f.read()
-            driver.execute_script(quality_filter_script)
-            print("Quality filter configured - 270p and 1080p options will be hidden")
-        
-        # Add chat deleter script
-        chat_deleter_path = os.path.join(current_dir, 'chat_deleter.js')
-        if os.path.exists(chat_deleter_path):
-            with open(chat_deleter_path, 'r', encoding='utf-8') as f:
-                chat_deleter_script = f.read()
-            driver.execute_script(chat_deleter_script)
-            print("Chat deleter configured - will delete chats before going home")
-        
-        # Add debug chat deleter if requested
-        if '--debug-chat' in sys.argv:
-            debug_chat_path = os.path.join(current_dir, 'debug_chat_deleter.js')
-            if os.path.exists(debug_chat_path):
-                with open(debug_chat_path, 'r', encoding='utf-8') as f:
-                    debug_chat_script = f.read()
-                driver.execute_script(debug_chat_script)
-                print("Debug chat deleter loaded - use window.debugDeleteChats() in console")
-        
-        # Add debug video finder if requested
-        if '--debug-video' in sys.argv:
-            debug_video_path = os.path.join(current_dir, 'debug_video_finder.js')
-            if os.path.exists(debug_video_path):
-                with open(debug_video_path, 'r', encoding='utf-8') as f:
-                    debug_video_script = f.read()
-                driver.execute_script(debug_video_script)
-                print("Debug video finder loaded - use window.debugVideoFinder() in console")
-        
-        # Add refresh blocker
-        refresh_blocker_path = os.path.join(current_dir, 'refresh_blocker.js')
-        if os.path.exists(refresh_blocker_path):
-            with open(refresh_blocker_path, 'r', encoding='utf-8') as f:
-                refresh_blocker_script = f.read()
-            driver.execute_script(refresh_blocker_script)
-            print("Refresh blocker configured - F5 and Ctrl/Cmd+R disabled")
-        
-        # Add home button injector with base path
-        home_button_path = os.path.join(current_dir, 'home_button_injector.js')
-        if os.path.exists(home_button_path):
-            # Set the base path first
-            driver.execute_script(f"window.veoBasePath = '{current_dir}';")
-            with open(home_button_path, 'r', encoding='utf-8') as f:
-                home_button_script = f.read()
-            driver.execute_script(home_button_script)
-            print("Home button injector configured - will add home button to external pages")
-        
-        # Add Veo 2 auto-switcher globally
-        veo2_switcher_path = os.path.join(current_dir, 'veo2_auto_switcher.js')
-        if os.path.exists(veo2_switcher_path):
-            with open(veo2_switcher_path, 'r', encoding='utf-8') as f:
-                veo2_script = f.read()
-            driver.execute_script(veo2_script)
-            print("Veo 2 auto-switcher configured - will auto-click quality switch button")
-        
-        # Framework function blocker disabled
-        # if platform.system() == 'Windows':
-        #     aggressive_blocker_path = os.path.join(current_dir, 'aggressive_framework_blocker.js')
-        #     if os.path.exists(aggressive_blocker_path):
-        #         with open(aggressive_blocker_path, 'r', encoding='utf-8') as f:
-        #             blocker_script = f.read()
-        #         driver.execute_script(blocker_script)
-        #         print("Aggressive framework blocker loaded - targeting _0x4fef57 and similar functions")
+        if scripts_registered():
+            # Registered scripts already ran; pick up any edited files for the next page
+            script_injection.refresh()
+        else:
+            names = script_bundler.inject(driver, download_qr_interceptor_scripts() + list(extra_scripts))
+            report_injected_scripts(names)
         
         print("Press Alt+D to test QR overlay")
         print("Developer tools: Run with --devtools flag to enable")
@@ -524,347 +488,299 @@ def setup_download_qr_interceptor(driver):
     except Exception as e:
         print(f"Error setting up download monitor: {e}")
 
-def hide_flow_ui_elements(driver):
-    """Hide UI elements in Google Flow interface"""
+def hide_flow_ui_elements(driver, mode=None):
+    """Apply the Flow UI hide rules for mode ('text' or 'asset')
+    
+    The rules live in ui_hide_rules.js as constructed stylesheets adopted at
+    document start, so this only selects the mode-dependent rules. Without
+    registered scripts the stylesheet is injected here first.
+    """
     try:
-        # First check if we're in image/asset mode
-        mode_check_script = """
-        return sessionStorage.getItem('veo_flow_mode') || 
-               (window.location.hash.includes('veo_mode=asset') ? 'asset' : 'text');
-        """
-        current_mode = driver.execute_script(mode_check_script)
+        if not scripts_registered():
+            script_bundler.inject(driver, ['ui_hide_rules.js'])
         
-        hide_script = """
-        // Remove any existing hiding styles first
-        const existingStyle = document.getElementById('veo-hiding-styles');
-        if (existingStyle) {
-            existingStyle.remove();
-        }
+        if mode is None:
+            mode = driver.execute_script("""
+            return sessionStorage.getItem('veo_flow_mode') || 
+                   (window.location.hash.includes('veo_mode=asset') ? 'asset' : 'text');
+            """)
         
-        // Check if we're in image/asset mode
-        const isImageMode = sessionStorage.getItem('veo_flow_mode') === 'asset' ||
-                          window.location.hash.includes('veo_mode=asset');
+        driver.execute_script("if (window.veoHideRules) window.veoHideRules.setMode(arguments[0]);", mode)
+        print(f"UI hide rules applied ({'asset' if mode == 'asset' else 'text'} mode)")
         
-        // Hide elements immediately with a minimal delay
-        setTimeout(() => {
-            // Hide specific elements by searching for them
-            // Hide date dividers
-            const dateElements = document.querySelectorAll('.MqrLh');
-            dateElements.forEach(el => {
-                if (el.textContent.includes('2025년') || el.textContent.includes('월') || el.textContent.includes('일')) {
-                    const container = el.closest('[data-known-size]') || el.parentElement.parentElement;
-                    if (container) container.style.display = 'none';
-                }
-            });
-            
-            // Hide breadcrumb
-            const breadcrumb = document.querySelector('.goSPNE');
-            if (breadcrumb) breadcrumb.style.display = 'none';
+    except Exception as e:
+        print(f"Error hiding UI elements: {e}")
+
+
+def handle_url_change(driver, state, new_url, page=None):
+    """Set up the page when the main frame moves to a different page (hash changes are ignored)
+    
+    page is the PageState the URL came from, if any, so the mode does not need another call.
+    """
+    current_url = state['current_url']
+    if new_url == current_url:
+        return
+    
+    # Extract base URL without hash for comparison
+    current_base = current_url.split('#')[0]
+    new_base = new_url.split('#')[0]
+    
+    # Only process if base URL changed or this is first time on Flow
+    if new_base != current_base:
+        # Check if navigating to Google Flow project page directly
+        if FLOW_URL in new_url and not state['flow_clicked']:
+            print("\n" + "#" * 60)
+            print("[NAVIGATION] Navigated to Google Flow project")
+            print(f"[NAVIGATION] URL: {new_url}")
+            print("#" * 60)
             
-            // Hide top toolbar immediately in text mode, preserve in image mode
-            if (!isImageMode) {
-                const toolbar = document.querySelector('.gxAzIM');
-                if (toolbar) toolbar.style.display = 'none';
-                console.log('Hiding toolbar immediately (text mode)');
-            } else {
-                console.log('Preserving toolbar buttons (image mode)');
-            }
+            # Check URL hash for mode
+            requested_mode = None
+            if '#veo_mode=' in new_url:
+                try:
+                    hash_part = new_url.split('#veo_mode=')[1]
+                    requested_mode = hash_part.split('&')[0]  # In case there are other params
+                    print(f"[NAVIGATION] Mode from URL hash: '{requested_mode}'")
+                except:
+                    print("[NAVIGATION] Error parsing URL hash")
             
-            // Hide profile and buttons
-            const profile = document.querySelector('.gNJurX');
-            if (profile) profile.style.display = 'none';
+            # Also check session storage as fallback
+            if not requested_mode:
+                if page is not None:
+                    requested_mode = page.mode
+                else:
+                    requested_mode = driver.execute_script("return sessionStorage.getItem('veo_flow_mode');")
+                print(f"[NAVIGATION] Mode from session storage: '{requested_mode}'")
             
-            const discord = document.querySelector('a[href*="discord"]');
-            if (discord) discord.style.display = 'none';
+            if requested_mode == 'asset':
+                print("[NAVIGATION] \u2192 Asset mode requested, initiating mode change...")
+                # Use Python Selenium to change mode
+                if wait_and_change_mode(driver):
+                    print("[NAVIGATION] \u2713 Mode changed successfully")
+                    # Clear the hash from URL
+                    driver.execute_script("history.replaceState(null, '', window.location.pathname + window.location.search);")
+                else:
+                    print("[NAVIGATION] \u2717 Failed to change mode")
+            elif requested_mode == 'text':
+                print("[NAVIGATION] Text mode requested (default mode, no change needed)")
+            else:
+                print(f"[NAVIGATION] No mode change needed (requested: '{requested_mode}')")
             
-            const help = document.querySelector('a[href*="faq"]');
-            if (help) help.style.display = 'none';
+            # Setup download QR interceptor with the Flow page extras in one call
+            print("[NAVIGATION] Setting up download QR interceptor...")
+            flow_scripts = ['home_button_auto_hider.js']
+            if requested_mode == 'asset':
+                # Image mode UI preserver (for asset/image mode)
+                flow_scripts.append('image_mode_ui_preserver.js')
+            setup_download_qr_interceptor(driver, flow_scripts)
             
-            // Hide Google Cloud button on top left
-            const googleCloudButton = document.querySelector('.Logo_container__QTJew');
-            if (googleCloudButton) googleCloudButton.style.display = 'none';
+            # Hide UI elements
+            print("[NAVIGATION] Hiding UI elements...")
+            hide_flow_ui_elements(driver, 'asset' if requested_mode == 'asset' else 'text')
             
-            // Also hide the entire navigation container if it only contains the logo
-            const navContainer = document.querySelector('.Navigation_navigation__K3ZWw');
-            if (navContainer) navContainer.style.display = 'none';
+            print("#" * 60 + "\n")
+            state['flow_clicked'] = True
+        
+        # Check if navigating to sketch page
+        elif SKETCH_URL in new_url and not state['sketch_clicked']:
+            print("Navigated to Sketch to Video page...")
             
-            // Hide the fixed position control that contains the logo
-            const fixedControl = document.querySelector('.FixedPositionControl_topLeft__LnSf_');
-            if (fixedControl) fixedControl.style.display = 'none';
+            # Inject persistent logo hider and home button for sketch page
+            if not scripts_registered():
+                time.sleep(2)
+                script_bundler.inject(driver, sketch_page_scripts())
+                print("Injected hide rules and home button for sketch page")
             
-            console.log('UI elements hidden selectively. Mode:', isImageMode ? 'image' : 'text');
-        }, 50);
-        """
-        
-        driver.execute_script(hide_script)
-        print("UI elements hidden")
+            state['sketch_clicked'] = True
         
+        # Reset flags when navigating away from specific pages
+        else:
+            if FLOW_URL not in new_url:
+                state['flow_clicked'] = False
+            if SKETCH_URL not in new_url:
+                state['sketch_clicked'] = False
+    
+    # Update current URL after processing
+    state['current_url'] = new_url
+
+
+# Navigation state read in one round trip: (url, mode, signal, ready_state)
+PageState = collections.namedtuple('PageState', 'url mode signal ready_state')
+
+PAGE_PROBE_SCRIPT = """
+    // Requested Flow mode: URL hash first, then session storage
+    const hashMatch = location.hash.match(/veo_mode=([^&]*)/);
+    let mode = hashMatch ? hashMatch[1] : null;
+    if (!mode) {
+        try { mode = sessionStorage.getItem('veo_flow_mode'); } catch (e) {}
+    }
+    
+    // Consume a pending navigation signal left by the home button or chat deleter
+    let signal = null;
+    const directNav = document.getElementById('veo-navigate-to-pg1');
+    const chatsDeleted = document.getElementById('veo-chats-deleted-go-home');
+    if (directNav) {
+        directNav.remove();
+        signal = 'direct';
+    } else if (chatsDeleted) {
+        chatsDeleted.remove();
+        signal = 'chats-deleted';
+    }
+    
+    return [location.href, mode, signal, document.readyState];
+"""
+
+
+def probe_page(driver):
+    """Read URL, requested mode, pending signal and readyState in one call"""
+    return PageState(*driver.execute_script(PAGE_PROBE_SCRIPT))
+
+
+def handle_nav_signal(driver, state, nav_signal):
+    """Go back to pg1 after the home button or chat deletion signalled it"""
+    if not nav_signal:
+        return
+    
+    if nav_signal == 'chats-deleted':
+        print("Chats deleted - navigating to pg1...")
+    else:
+        print("Home button clicked - navigating to pg1...")
+    
+    # Clean up downloaded files
+    try:
+        from download_cleanup import cleanup_recent_downloads
+        cleanup_recent_downloads()
     except Exception as e:
-        print(f"Error hiding UI elements: {e}")
+        print(f"Error cleaning up downloads: {e}")
+    
+    show_pg1(driver)
+    state.update(current_url="pg1", flow_clicked=False, sketch_clicked=False)
 
 
 def monitor_navigation(driver, credentials):
-    current_url = driver.current_url
-    flow_clicked = False
-    sketch_clicked = False
-    project_url = credentials.get('flow_project_url', '')
-    interceptor_refresh_count = 0
+    state = {'current_url': driver.current_url, 'flow_clicked': False, 'sketch_clicked': False}
     
-    print("Navigation monitoring active")
+    # URL changes and home button presses arrive as CDP events; poll if that is unavailable
+    nav_events = NavigationEvents(driver)
+    if nav_events.start():
+        print("Navigation monitoring active (DevTools events)")
+    else:
+        print("Navigation monitoring active (polling)")
     
-    while True:
-        try:
-            time.sleep(0.1)
-            new_url = driver.current_url
-            
-            # Check if URL changed (ignore minor hash changes)
-            if new_url != current_url:
-                # Extract base URL without hash for comparison
-                current_base = current_url.split('#')[0]
-                new_base = new_url.split('#')[0]
+    try:
+        while True:
+            try:
+                if nav_events.available:
+                    event = nav_events.get(timeout=1.0)
+                    if event is None:
+                        if not nav_events.available:
+                            # The DevTools connection closed; the polling path also notices a closed window
+                            print("Navigation monitoring switched to polling")
+                        continue
+                    kind, value = event
+                    if kind == EVENT_NAVIGATED:
+                        handle_url_change(driver, state, value)
+                    elif kind == EVENT_SIGNAL:
+                        handle_nav_signal(driver, state, value)
+                    continue
                 
-                # Only process if base URL changed or this is first time on Flow
-                if new_base != current_base:
-                    # Check if navigating to Google Flow project page directly
-                    if "labs.google/fx/ko/tools/flow" in new_url and not flow_clicked:
-                        print("\n" + "#" * 60)
-                        print("[NAVIGATION] Navigated to Google Flow project")
-                        print(f"[NAVIGATION] URL: {new_url}")
-                        print("#" * 60)
-                        
-                        # Check URL hash for mode
-                        requested_mode = None
-                        if '#veo_mode=' in new_url:
-                            try:
-                                hash_part = new_url.split('#veo_mode=')[1]
-                                requested_mode = hash_part.split('&')[0]  # In case there are other params
-                                print(f"[NAVIGATION] Mode from URL hash: '{requested_mode}'")
-                            except:
-                                print("[NAVIGATION] Error parsing URL hash")
-                        
-                        # Also check session storage as fallback
-                        if not requested_mode:
-                            requested_mode = driver.execute_script("return sessionStorage.getItem('veo_flow_mode');")
-                            print(f"[NAVIGATION] Mode from session storage: '{requested_mode}'")
-                        
-                        if requested_mode == 'asset':
-                            print("[NAVIGATION] \u2192 Asset mode requested, initiating mode change...")
-                            # Use Python Selenium to change mode
-                            if wait_and_change_mode(driver):
-                                print("[NAVIGATION] \u2713 Mode changed successfully")
-                                # Clear the hash from URL
-                                driver.execute_script("history.replaceState(null, '', window.location.pathname + window.location.search);")
-                            else:
-                                print("[NAVIGATION] \u2717 Failed to change mode")
-                        elif requested_mode == 'text':
-                            print("[NAVIGATION] Text mode requested (default mode, no change needed)")
-                        else:
-                            print(f"[NAVIGATION] No mode change needed (requested: '{requested_mode}')")
-                        
-                        # Setup download QR interceptor
-                        print("[NAVIGATION] Setting up download QR interceptor...")
-                        setup_download_qr_interceptor(driver)
-                        
-                        # Hide UI elements
-                        print("[NAVIGATION] Hiding UI elements...")
-                        hide_flow_ui_elements(driver)
-                        
-                        # Add home button auto-hider
-                        current_dir = os.path.dirname(os.path.abspath(__file__))
-                        home_hider_path = os.path.join(current_dir, 'home_button_auto_hider.js')
-                        if os.path.exists(home_hider_path):
-                            with open(home_hider_path, 'r', encoding='utf-8') as f:
-                                hider_script = f.read()
-                            driver.execute_script(hider_script)
-                            print("[NAVIGATION] Home button auto-hider loaded - will hide during processing")
-                        
-                        # Add Veo 2 auto-switcher
-                        veo2_switcher_path = os.path.join(current_dir, 'veo2_auto_switcher.js')
-                        if os.path.exists(veo2_switcher_path):
-                            with open(veo2_switcher_path, 'r', encoding='utf-8') as f:
-                                veo2_script = f.read()
-                            driver.execute_script(veo2_script)
-                            print("[NAVIGATION] Veo 2 auto-switcher loaded - will auto-click 'Switch to Veo 2 - Quality' button")
-                        
-                        # Add image mode UI preserver (for asset/image mode)
-                        if requested_mode == 'asset':
-                            preserver_path = os.path.join(current_dir, 'image_mode_ui_preserver.js')
-                            if os.path.exists(preserver_path):
-                                with open(preserver_path, 'r', encoding='utf-8') as f:
-                                    preserver_script = f.read()
-                                driver.execute_script(preserver_script)
-                                print("[NAVIGATION] Image mode UI preserver loaded - input box buttons will be preserved")
-                        
-                        print("#" * 60 + "\n")
-                        flow_clicked = True
-                        interceptor_refresh_count = 0
-                    
-                    # Check if navigating to sketch page
-                    elif "gcdemos-25-int-dreamstudio" in new_url and not sketch_clicked:
-                        print("Navigated to Sketch to Video page...")
-                        time.sleep(2)
-                    
-                        # Inject persistent logo hider for sketch page
-                        current_dir = os.path.dirname(os.path.abspath(__file__))
-                        logo_hider_path = os.path.join(current_dir, 'persistent_logo_hider.js')
-                        if os.path.exists(logo_hider_path):
-                            with open(logo_hider_path, 'r', encoding='utf-8') as f:
-                                logo_hider_script = f.read()
-                            driver.execute_script(logo_hider_script)
-                            print("Injected logo hider for sketch page")
-                        
-                        # Inject home button for sketch page
-                        home_button_path = os.path.join(current_dir, 'home_button_injector.js')
-                        if os.path.exists(home_button_path):
-                            driver.execute_script(f"window.veoBasePath = '{current_dir}';")
-                            with open(home_button_path, 'r', encoding='utf-8') as f:
-                                home_button_script = f.read()
-                            driver.execute_script(home_button_script)
-                            print("Injected home button for sketch page")
-                        
-                        sketch_clicked = True
-                    
-                    # Reset flags when navigating away from specific pages
-                    else:
-                        if "labs.google/fx/ko/tools/flow" not in new_url:
-                            flow_clicked = False
-                        if "gcdemos-25-int-dreamstudio" not in new_url:
-                            sketch_clicked = False
+                time.sleep(0.1)
+                page = probe_page(driver)
                 
-                # Update current URL after processing
-                current_url = new_url
-            
-            # Check if home button was clicked by checking for navigation signals
-            try:
-                # Check for navigation signals
-                nav_signal = driver.execute_script("""
-                    // Check for direct navigation signal
-                    const directNav = document.getElementById('veo-navigate-to-pg1');
-                    if (directNav) {
-                        directNav.remove();
-                        return 'direct';
-                    }
-                    
-                    // Check for chats deleted signal
-                    const chatsDeleted = document.getElementById('veo-chats-deleted-go-home');
-                    if (chatsDeleted) {
-                        chatsDeleted.remove();
-                        return 'chats-deleted';
-                    }
-                    
-                    return null;
-                """)
+                # Wait for the new document to be parsed before setting it up
+                if page.ready_state != 'loading':
+                    handle_url_change(driver, state, page.url, page)
                 
-                if nav_signal:
-                    if nav_signal == 'chats-deleted':
-                        print("Chats deleted - navigating to pg1...")
-                    else:
-                        print("Home button clicked - navigating to pg1...")
-                    
-                    # Clean up downloaded files
-                    try:
-                        from download_cleanup import cleanup_recent_downloads
-                        cleanup_recent_downloads()
-                    except Exception as e:
-                        print(f"Error cleaning up downloads: {e}")
-                    
-                    show_pg1(driver)
-                    current_url = "pg1"
-                    flow_clicked = False
-                    sketch_clicked = False
-            except:
-                pass
-            
-            
-        except Exception as e:
-            if "no such window" in str(e).lower():
-                print("Browser was closed.")
-                break
-            else:
-                time.sleep(0.5)
+                # Home button or chat deletion asked to go home
+                handle_nav_signal(driver, state, page.signal)
+                
+            except Exception as e:
+                if "no such window" in str(e).lower():
+                    print("Browser was closed.")
+                    break
+                else:
+                    time.sleep(0.5)
+    finally:
+        nav_events.stop()
+
+def start_upload_service():
+    """Install Drive dependencies if needed and start the OAuth upload service (optional)"""
+    global oauth_service
+    
+    # First install dependencies if needed
+    try:
+        import google.auth
+        from googleapiclient.discovery import build
+    except ImportError:
+        print("Installing required dependencies...")
+        import subprocess
+        subprocess.check_call([sys.executable, "-m", "pip", "install", 
+                             "google-auth", "google-api-python-client", 
+                             "google-auth-oauthlib", "google-auth-httplib2"])
+        print("Dependencies installed!")
+    
+    try:
+        from oauth_drive_service import start_oauth_drive_service, stop_oauth_drive_service
+        oauth_service = start_oauth_drive_service()
+        if oauth_service:
+            print("✅ Automatic upload service started")
+            print("Downloads will be automatically uploaded to Google Drive")
+            atexit.register(stop_oauth_drive_service)
+        else:
+            print("⚠️  Automatic upload service failed to start")
+            print("Downloads will be saved to ~/Downloads")
+            print("💡 Tip: Add your email as test user in Google Cloud Console")
+            print("   Or run: python manual_upload_helper.py")
+    except Exception as e:
+        print(f"⚠️  Could not start automatic upload: {e}")
+        print("Downloads will be saved to ~/Downloads")
+        print("💡 Run in another terminal: python manual_upload_helper.py")
+    return oauth_service
+
+def prepare_pages(upload_service):
+    """Read the page scripts and render pg2.html before the browser needs them"""
+    script_bundler.build(download_qr_interceptor_scripts(upload_service is not None))
+    pg2_page.path()
 
 def main():
     driver = None
+    startup = StartupOrchestrator()
     try:
-        # Try to start integrated Drive service
         print("=" * 60)
         print("Starting Veo Application with Automatic Upload")
         print("=" * 60)
         
-        # First install dependencies if needed
-        try:
-            import google.auth
-            from googleapiclient.discovery import build
-        except ImportError:
-            print("Installing required dependencies...")
-            import subprocess
-            subprocess.check_call([sys.executable, "-m", "pip", "install", 
-                                 "google-auth", "google-api-python-client", 
-                                 "google-auth-oauthlib", "google-auth-httplib2"])
-            print("Dependencies installed!")
-        
-        # Start OAuth Drive service (optional)
-        global oauth_service
-        try:
-            from oauth_drive_service import start_oauth_drive_service, stop_oauth_drive_service
-            oauth_service = start_oauth_drive_service()
-            if oauth_service:
-                print("✅ Automatic upload service started")
-                print("Downloads will be automatically uploaded to Google Drive")
-                atexit.register(stop_oauth_drive_service)
-            else:
-                print("⚠️  Automatic upload service failed to start")
-                print("Downloads will be saved to ~/Downloads")
-                print("💡 Tip: Add your email as test user in Google Cloud Console")
-                print("   Or run: python manual_upload_helper.py")
-        except Exception as e:
-            print(f"⚠️  Could not start automatic upload: {e}")
-            print("Downloads will be saved to ~/Downloads")
-            print("💡 Run in another terminal: python manual_upload_helper.py")
-        
-        print("=" * 60)
-        
         # Load credentials from file
         credentials = load_credentials()
-        
-        driver = setup_driver()
-        
         email = credentials['google']['email']
         password = credentials['google']['password']
         
-        if login_to_google(driver, email, password):
+        # Independent phases start together; each waits only for what it needs
+        startup.submit('drive', start_upload_service)
+        startup.submit('chromedriver', resolve_chromedriver)
+        startup.submit('chrome', lambda: launch_chrome(startup.result('chromedriver'), build_chrome_options()),
+                       after=['chromedriver'])
+        # The Flow bundle depends on whether the upload service came up
+        startup.submit('pages', lambda: prepare_pages(startup.result('drive')), after=['drive'])
+        
+        driver = startup.result('chrome')
+        startup.submit('login', login_to_google, driver, email, password)
+        
+        # Page scripts run from document start on every navigation from here on;
+        # registered after login so the two never drive the browser at the same time
+        startup.submit('page scripts', lambda: register_page_scripts(driver, startup.result('drive') is not None),
+                       after=['drive', 'login'])
+        
+        logged_in = startup.result('login')
+        startup.result('page scripts')
+        startup.result('pages')
+        startup.report()
+        
+        if logged_in:
             print("Starting application flow...")
             
-            # Inject early fixes IMMEDIATELY
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            
-            # Fix innerHTML for Windows Trusted Types first
-            if platform.system() == 'Windows':
-                patcher_path = os.path.join(current_dir, 'innerHTML_patcher.js')
-                if os.path.exists(patcher_path):
-                    with open(patcher_path, 'r', encoding='utf-8') as f:
-                        patcher_script = f.read()
-                    driver.execute_script(patcher_script)
-                    print("innerHTML patcher injected early for Windows")
-            
-            # Then inject console filter
-            early_filter_path = os.path.join(current_dir, 'early_console_filter.js')
-            if os.path.exists(early_filter_path):
-                with open(early_filter_path, 'r', encoding='utf-8') as f:
-                    early_filter_script = f.read()
-                driver.execute_script(early_filter_script)
-                print("Early console filter injected globally")
-            
-            # Framework blocker disabled
-            # if platform.system() == 'Windows':
-            #     aggressive_blocker_path = os.path.join(current_dir, 'aggressive_framework_blocker.js')
-            #     if os.path.exists(aggressive_blocker_path):
-            #         with open(aggressive_blocker_path, 'r', encoding='utf-8') as f:
-            #             blocker_script = f.read()
-            #         driver.execute_script(blocker_script)
-            #         print("Aggressive framework blocker injected early - will catch _0x4fef57")
-            
-            # Setup download QR interceptor globally
+            # Setup download QR interceptor globally (innerHTML patcher and
+            # early console filter run first within the bundle)
             setup_download_qr_interceptor(driver)
             
             show_pg1(driver)
@@ -881,8 +797,9 @@ def main():
         print(f"Error in main: {e}")
         
     finally:
+        startup.shutdown()
         if driver:
             driver.quit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
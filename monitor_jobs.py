@@ -0,0 +1,199 @@
+"""Upload monitor jobs: one shared Downloads poller feeding a bounded upload pool"""
+
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Job states
+JOB_MONITORING = 'monitoring'
+JOB_UPLOADING = 'uploading'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_PENDING = 32
+DEFAULT_TIMEOUT = 60
+DEFAULT_TTL = 300
+
+NO_VIDEO_ERROR = 'No new video file detected in Downloads folder'
+
+
+class ServiceBusy(Exception):
+    """Raised by submit() when max_pending jobs are already active"""
+
+
+class MonitorJob:
+    """One client waiting for its next download to land on Drive"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, timeout):
+        self.id = f'{int(time.time() * 1000)}-{next(self._ids)}'
+        self.state = JOB_MONITORING
+        self.video = None
+        self.result = None
+        self.created_at = time.time()
+        self.deadline = time.monotonic() + timeout
+        self.finished_at = None
+
+    def finish(self, result):
+        self.result = result
+        self.state = JOB_DONE if result.get('success') else JOB_FAILED
+        self.finished_at = time.time()
+
+    def status(self):
+        """Response body for /check-upload-status"""
+        if self.state == JOB_MONITORING:
+            message = 'Still waiting for download to complete'
+        elif self.state == JOB_UPLOADING:
+            message = 'Uploading to Google Drive'
+        else:
+            return self.result
+        # Clients keep polling while status is 'monitoring'
+        return {'success': True, 'status': 'monitoring', 'state': self.state, 'message': message}
+
+
+class MonitorJobService:
+    """Monitor jobs resolved by a single poller thread and a fixed upload pool
+
+    Each monitor request used to get its own thread that polled Downloads for
+    up to a minute. Here submit() only records a job; one poller thread checks
+    Downloads while any job is waiting and hands each new video to the oldest
+    waiting job, and uploads run on a pool of `workers` threads. The thread
+    count therefore stays the same however many clients are waiting.
+    submit() raises ServiceBusy once max_pending jobs are active. Finished
+    jobs are evicted ttl seconds after they finish, whether or not anyone
+    collected the result.
+    """
+
+    def __init__(self, service_factory, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING,
+                 timeout=DEFAULT_TIMEOUT, check_interval=2, ttl=DEFAULT_TTL):
+        self.service_factory = service_factory
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.check_interval = check_interval
+        self.ttl = ttl
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._stop = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='drive-upload')
+        self._poller = None
+
+    def start(self):
+        """Start the Downloads poller"""
+        self._poller = threading.Thread(target=self._poll, name='download-poller', daemon=True)
+        self._poller.start()
+
+    def stop(self):
+        self._stop.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        self._executor.shutdown(wait=False)
+
+    def submit(self):
+        """Record a new monitor job and return it"""
+        with self._wakeup:
+            self._evict()
+            active = sum(1 for job in self._jobs.values() if job.state in (JOB_MONITORING, JOB_UPLOADING))
+            if active >= self.max_pending:
+                raise ServiceBusy(f'{active} uploads already pending')
+            job = MonitorJob(self.timeout)
+            self._jobs[job.id] = job
+            self._wakeup.notify()
+        return job
+
+    def get(self, job_id):
+        """The job with job_id, or None if unknown or evicted"""
+        with self._lock:
+            self._evict()
+            return self._jobs.get(job_id)
+
+    def forget(self, job_id):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def upload_latest(self, max_age_seconds=10):
+        """Find and upload the newest video now, on the upload pool"""
+        return self._executor.submit(self._upload_latest, max_age_seconds).result()
+
+    def stats(self):
+        """Number of tracked jobs per state"""
+        counts = {JOB_MONITORING: 0, JOB_UPLOADING: 0, JOB_DONE: 0, JOB_FAILED: 0}
+        with self._lock:
+            for job in self._jobs.values():
+                counts[job.state] += 1
+        return counts
+
+    def _evict(self):
+        # Caller holds the lock
+        cutoff = time.time() - self.ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _waiting(self):
+        # Caller holds the lock; fails jobs past their deadline, oldest first
+        now = time.monotonic()
+        waiting = []
+        for job in self._jobs.values():
+            if job.state != JOB_MONITORING:
+                continue
+            if now >= job.deadline:
+                print(f"Timeout: No new video detected for upload {job.id}")
+                job.finish({'success': False, 'error': NO_VIDEO_ERROR})
+            else:
+                waiting.append(job)
+        waiting.sort(key=lambda job: job.created_at)
+        return waiting
+
+    def _poll(self):
+        while not self._stop.is_set():
+            with self._wakeup:
+                self._evict()
+                if not self._waiting():
+                    # Nothing to watch for: sleep until a job arrives
+                    self._wakeup.wait(self.ttl)
+                    continue
+
+            try:
+                video = self.service_factory().find_latest_video()
+            except Exception as e:
+                print(f"Error checking downloads: {e}")
+                video = None
+
+            if video:
+                self._assign(video)
+            self._stop.wait(self.check_interval)
+
+    def _assign(self, video):
+        with self._lock:
+            # A video already uploaded or uploading belongs to another job
+            if any(job.video == video for job in self._jobs.values() if job.state != JOB_FAILED):
+                return
+            waiting = self._waiting()
+            if not waiting:
+                return
+            job = waiting[0]
+            job.state = JOB_UPLOADING
+            job.video = video
+        print(f"New video detected: {video} (upload {job.id})")
+        self._executor.submit(self._upload, job, video)
+
+    def _upload(self, job, video):
+        try:
+            result = self.service_factory().upload_file(video)
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        with self._lock:
+            job.finish(result)
+
+    def _upload_latest(self, max_age_seconds):
+        service = self.service_factory()
+        latest_video = service.find_latest_video(max_age_seconds=max_age_seconds)
+        if not latest_video:
+            return {'success': False, 'message': 'No new video found'}
+        print(f"Found video: {latest_video}")
+        return service.upload_file(latest_video)
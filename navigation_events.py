@@ -0,0 +1,126 @@
+"""Navigation and page signal events pushed from Chrome over the DevTools protocol"""
+
+import queue
+import threading
+
+try:
+    import trio
+    TRIO_AVAILABLE = True
+except ImportError:
+    TRIO_AVAILABLE = False
+
+# Page scripts call window.veoNavSignal('<signal>') to reach Python directly
+NAV_BINDING = 'veoNavSignal'
+
+EVENT_NAVIGATED = 'navigated'
+EVENT_SIGNAL = 'signal'
+
+
+class NavigationEvents:
+    """Delivers main-frame URL changes and page signals without polling
+
+    A background thread holds a CDP session (Selenium's bidi_connection) and
+    listens for Page.frameNavigated, Page.domContentEventFired,
+    Page.navigatedWithinDocument and Runtime.bindingCalled. Events are queued
+    as (EVENT_NAVIGATED, url) or (EVENT_SIGNAL, payload). A new document's URL
+    is held back until its DOMContentLoaded, so the caller never sets up a
+    page that is still parsing. If the connection cannot be opened, closes or
+    drops, available becomes False, get() returns None and the caller should
+    poll instead.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.available = False
+        self._events = queue.Queue()
+        self._ready = threading.Event()
+        self._thread = None
+        self._trio_token = None
+        self._cancel_scope = None
+
+    def start(self, timeout=10):
+        """Open the CDP session; returns True once events are flowing"""
+        if not TRIO_AVAILABLE or not hasattr(self.driver, 'bidi_connection'):
+            return False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout)
+        return self.available
+
+    def get(self, timeout=None):
+        """Next event, or None if nothing arrived within timeout"""
+        try:
+            return self._events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def stop(self):
+        if self._trio_token and self._cancel_scope:
+            try:
+                trio.from_thread.run_sync(self._cancel_scope.cancel, trio_token=self._trio_token)
+            except (RuntimeError, trio.RunFinishedError):
+                pass
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def _run(self):
+        try:
+            trio.run(self._listen)
+            if self.available:
+                print("Navigation events connection closed")
+        except Exception as e:
+            print(f"Navigation events stopped: {e}")
+        finally:
+            self.available = False
+            self._ready.set()
+            # Wake a caller blocked in get() so it can switch to polling
+            self._events.put(None)
+
+    async def _listen(self):
+        self._trio_token = trio.lowlevel.current_trio_token()
+        async with self.driver.bidi_connection() as connection:
+            session, devtools = connection.session, connection.devtools
+            await session.execute(devtools.page.enable())
+            await session.execute(devtools.runtime.enable())
+            await session.execute(devtools.runtime.add_binding(name=NAV_BINDING))
+            frame_tree = await session.execute(devtools.page.get_frame_tree())
+            # pending_url: a new main-frame document that is not parsed yet
+            main_frame = {'id': frame_tree.frame.id, 'pending_url': None}
+
+            async def on_navigated():
+                async for event in session.listen(devtools.page.FrameNavigated):
+                    if event.frame.parent_id is None:
+                        main_frame['id'] = event.frame.id
+                        main_frame['pending_url'] = event.frame.url + (event.frame.url_fragment or '')
+
+            async def on_dom_content():
+                # Only fired for the main frame
+                async for event in session.listen(devtools.page.DomContentEventFired):
+                    url, main_frame['pending_url'] = main_frame['pending_url'], None
+                    if url:
+                        self._events.put((EVENT_NAVIGATED, url))
+
+            async def on_navigated_within_document():
+                async for event in session.listen(devtools.page.NavigatedWithinDocument):
+                    if event.frame_id != main_frame['id']:
+                        continue
+                    if main_frame['pending_url']:
+                        # Still loading: report the final URL once the DOM is ready
+                        main_frame['pending_url'] = event.url
+                    else:
+                        self._events.put((EVENT_NAVIGATED, event.url))
+
+            async def on_binding_called():
+                async for event in session.listen(devtools.runtime.BindingCalled):
+                    if event.name == NAV_BINDING:
+                        self._events.put((EVENT_SIGNAL, event.payload))
+
+            with trio.CancelScope() as cancel_scope:
+                self._cancel_scope = cancel_scope
+                self.available = True
+                self._ready.set()
+                async with trio.open_nursery() as nursery:
+                    nursery.start_soon(on_navigated)
+                    nursery.start_soon(on_dom_content)
+                    nursery.start_soon(on_navigated_within_document)
+                    nursery.start_soon(on_binding_called)
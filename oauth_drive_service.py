@@ -4,23 +4,31 @@
 import os
 import json
 import threading
-import time
 import webbrowser
 from pathlib import Path
 from datetime import datetime
-import hashlib
+import mimetypes
 import http.server
 import socketserver
 import urllib.parse
 import platform
 import sys
 
+from download_watcher import create_download_watcher
+from download_completion import DownloadCompletionTracker
+from upload_index import UploadIndex
+from upload_status import UploadEventHub, create_status_server, STATUS_PORT
+from resumable_upload import ResumableUploader, chunk_size_from_env
+from upload_jobs import UploadJobQueue, DEFAULT_WORKERS
+from upload_hashing import HashingFileReader, file_sha256, quick_fingerprint
+from drive_metadata import DriveMetadata, GRANT_TIMEOUT
+from folder_cache import DriveFolderResolver, subfolder_format_from_env
+
 try:
-    from google.auth.transport.requests import Request
+    from google.auth.transport.requests import Request, AuthorizedSession
     from google.oauth2.credentials import Credentials
     from google_auth_oauthlib.flow import Flow
     from googleapiclient.discovery import build
-    from googleapiclient.http import MediaFileUpload
     GOOGLE_API_AVAILABLE = True
 except ImportError:
     GOOGLE_API_AVAILABLE = False
@@ -31,19 +39,33 @@ class OAuthDriveService:
     
     def __init__(self):
         self.service = None
-        self.folder_id = None
         self.folder_name = 'Veo_Uploads'
+        self.folder_resolver = DriveFolderResolver(
+            os.path.join(os.path.dirname(__file__), 'folder_cache.json'),
+            'oauth',
+            self.folder_name,
+            self.get_thread_service,
+            make_public=False,
+            subfolder_format=subfolder_format_from_env()
+        )
         self.download_dir = os.path.expanduser('~/Downloads')
         self.monitored_files = set()
-        self.upload_queue = []
+        self.upload_queue = None
+        self.upload_workers = int(os.environ.get('VEO_UPLOAD_WORKERS', DEFAULT_WORKERS))
+        self.upload_chunk_size = chunk_size_from_env()
+        self.thread_local = threading.local()
+        self.inflight_uploads = {}  # Quick fingerprint -> [(filepath, filename)] waiting on that upload
+        self.inflight_lock = threading.Lock()
         self.running = False
         self.monitor_thread = None
-        self.upload_thread = None
-        self.uploaded_hashes = set()
+        self.download_watcher = None
+        self.completion_tracker = None
         self.web_server = None
         self.web_thread = None
         self.web_port = None
-        self.latest_upload_data = None
+        self.upload_events = UploadEventHub()
+        self.web_ready = threading.Event()
+        self.drive_metadata = DriveMetadata(self.get_thread_service)
         self.oauth_server = None
         self.credentials = None
         
@@ -57,6 +79,9 @@ class OAuthDriveService:
             self.client_config = None
         
         self.token_file = os.path.join(os.path.dirname(__file__), 'token.json')
+        
+        # SHA256 -> Drive file index, opened on first lookup
+        self.upload_index = UploadIndex(os.path.join(os.path.dirname(__file__), 'upload_index.db'))
         self.scopes = ['https://www.googleapis.com/auth/drive.file']
         
     def initialize(self):
@@ -92,16 +117,9 @@ class OAuthDriveService:
             self.service = build('drive', 'v3', credentials=self.credentials)
             print("✅ Google Drive service initialized with OAuth")
             
-            # Create or find upload folder
-            self.folder_id = self.get_or_create_folder()
-            if self.folder_id:
-                print(f"📁 Using folder '{self.folder_name}' (ID: {self.folder_id})")
-                folder_link = f"https://drive.google.com/drive/folders/{self.folder_id}"
-                print(f"📂 View all uploads: {folder_link}")
-                return True
-            else:
-                print("ERROR: Could not create/find upload folder")
-                return False
+            # Use the cached upload folder; Drive is checked in the background
+            self.folder_resolver.start()
+            return True
                 
         except Exception as e:
             print(f"ERROR: Failed to initialize Drive service: {e}")
@@ -229,82 +247,53 @@ class OAuthDriveService:
             
         return auth_code
     
-    def get_or_create_folder(self):
-        """Get or create the upload folder"""
-        try:
-            # Search for existing folder
-            results = self.service.files().list(
-                q=f"name='{self.folder_name}' and mimeType='application/vnd.google-apps.folder' and trashed=false",
-                spaces='drive',
-                fields='files(id, name)'
-            ).execute()
-            
-            files = results.get('files', [])
-            
-            if files:
-                # Folder exists
-                return files[0]['id']
-            else:
-                # Create new folder
-                file_metadata = {
-                    'name': self.folder_name,
-                    'mimeType': 'application/vnd.google-apps.folder'
-                }
-                
-                folder = self.service.files().create(
-                    body=file_metadata,
-                    fields='id'
-                ).execute()
-                
-                folder_id = folder.get('id')
-                print(f"✨ Created new folder '{self.folder_name}'")
-                return folder_id
-                
-        except Exception as e:
-            print(f"Error with folder: {e}")
-            return None
+    def get_thread_session(self):
+        """Authorized HTTP session for the calling thread, used for media uploads"""
+        session = getattr(self.thread_local, 'session', None)
+        if session is None:
+            session = AuthorizedSession(self.credentials)
+            self.thread_local.session = session
+        return session
+    
+    def get_thread_service(self):
+        """Drive client for the calling thread (httplib2 clients are not thread-safe)"""
+        service = getattr(self.thread_local, 'service', None)
+        if service is None:
+            service = build('drive', 'v3', credentials=self.credentials)
+            self.thread_local.service = service
+        return service
     
     def get_file_hash(self, filepath):
         """Get SHA256 hash of file to detect duplicates"""
-        try:
-            sha256_hash = hashlib.sha256()
-            with open(filepath, "rb") as f:
-                for byte_block in iter(lambda: f.read(4096), b""):
-                    sha256_hash.update(byte_block)
-            return sha256_hash.hexdigest()
-        except:
+        return file_sha256(filepath)
+    
+    def find_uploaded_record(self, filepath, fingerprint):
+        """Return the index record of an already uploaded file with the same content"""
+        record = self.upload_index.find_by_fingerprint(fingerprint)
+        if not record:
+            return None
+        
+        # Fingerprint only nominates a candidate; the full hash decides
+        file_hash = self.get_file_hash(filepath)
+        if file_hash != record['sha256']:
+            record = self.upload_index.get(file_hash) if file_hash else None
+        if record and not self.drive_file_exists(record['file_id']):
+            # Deleted or trashed on Drive: drop the stale link and upload again
+            print(f"🗑️  Indexed Drive file {record['file_id']} is gone, uploading again")
+            self.upload_index.remove(record['sha256'])
             return None
+        return record
     
-    def find_existing_file(self, filename, file_hash):
-        """Find existing file in Drive folder by name pattern"""
+    def drive_file_exists(self, file_id):
+        """False if Drive reports the file missing or trashed (other errors keep the cached link)"""
         try:
-            # Search for files with similar name in our folder
-            query = f"name contains '{filename}' and '{self.folder_id}' in parents and trashed = false"
-            results = self.service.files().list(
-                q=query,
-                fields="files(id, name)"
-            ).execute()
-            
-            files = results.get('files', [])
-            if files:
-                # Return the first matching file
-                file_id = files[0]['id']
-                # Try to make it public (but don't fail if we can't)
-                try:
-                    self.service.permissions().create(
-                        fileId=file_id,
-                        body={'type': 'anyone', 'role': 'reader'}
-                    ).execute()
-                except:
-                    pass
-                
-                # Always return direct download link format
-                return f"https://drive.google.com/uc?export=download&id={file_id}&confirm=t"
-            
-            return None
+            drive_file = self.get_thread_service().files().get(fileId=file_id, fields='id, trashed').execute()
         except Exception as e:
-            print(f"Error finding existing file: {e}")
-            return None
+            if getattr(getattr(e, 'resp', None), 'status', None) == 404:
+                return False
+            print(f"Could not check Drive file {file_id}: {e}")
+            return True
+        return not drive_file.get('trashed')
     
     def is_video_file(self, filename):
         """Check if file is a video"""
@@ -315,150 +304,231 @@ class OAuthDriveService:
         """Monitor downloads folder for new video files"""
         print(f"📁 Monitoring {self.download_dir} for new videos...")
         
-        # Track existing files at startup
+        self.download_watcher = create_download_watcher(self.download_dir, self.handle_download_event)
+        print(f"👀 Download watcher backend: {self.download_watcher.backend}")
+        
+        self.completion_tracker = DownloadCompletionTracker(
+            self.download_dir,
+            is_wanted=self.is_video_file,
+            on_complete=self.queue_finished_download,
+            on_started=self.announce_download,
+            reports_close=self.download_watcher.reports_close
+        )
+        self.completion_tracker.start()
+        
         try:
-            existing_files = set(os.listdir(self.download_dir))
-        except:
-            existing_files = set()
+            self.download_watcher.run()
+        except Exception as e:
+            print(f"Monitor error: {e}")
+    
+    def handle_download_event(self, event, filename):
+        """Handle a change in the downloads folder reported by the watcher"""
+        self.completion_tracker.handle_event(event, filename)
+    
+    def announce_download(self, filepath, filename):
+        """Show spinner immediately when a video download starts"""
+        print(f"🎬 Video detected: {filename}")
+        self.show_loading_spinner(filename)
+    
+    def queue_finished_download(self, filepath, filename):
+        """Fingerprint a completed download and add it to the upload queue
         
-        while self.running:
-            try:
-                current_files = set(os.listdir(self.download_dir))
-                new_files = current_files - existing_files
-                
-                for filename in new_files:
-                    if self.is_video_file(filename):
-                        filepath = os.path.join(self.download_dir, filename)
-                        
-                        # Show spinner immediately when video file appears
-                        print(f"🎬 Video detected: {filename}")
-                        self.show_loading_spinner()
-                        
-                        # Wait for file to be completely written
-                        time.sleep(0.5)
-                        
-                        # Check if file is complete
-                        try:
-                            file_size = os.path.getsize(filepath)
-                            time.sleep(0.3)
-                            if os.path.getsize(filepath) == file_size:  # File size stable
-                                file_hash = self.get_file_hash(filepath)
-                                
-                                if file_hash:
-                                    self.upload_queue.append((filepath, filename, file_hash))
-                                    # Don't skip duplicates - we want to show the dialog
-                        except:
-                            pass
-                
-                existing_files = current_files
-                time.sleep(0.5)  # Check more frequently for faster detection
-                
-            except Exception as e:
-                print(f"Monitor error: {e}")
-                time.sleep(2)
-    
-    def process_uploads(self):
-        """Process upload queue"""
-        while self.running:
-            if self.upload_queue:
-                filepath, filename, file_hash = self.upload_queue.pop(0)
-                
-                if os.path.exists(filepath):
-                    # Check if we already uploaded this file
-                    if file_hash in self.uploaded_hashes:
-                        print(f"📋 File already uploaded: {filename}")
-                        # Find the existing file in Drive
-                        existing_link = self.find_existing_file(filename, file_hash)
-                        if existing_link:
-                            print(f"🔗 Using existing link: {existing_link}")
-                            self.show_qr_in_browser(existing_link)
-                        else:
-                            # If can't find, upload again
-                            print(f"⬆️  Re-uploading {filename} to Google Drive...")
-                            download_link = self.upload_file(filepath, filename)
-                            if download_link:
-                                self.uploaded_hashes.add(file_hash)
-                                self.show_qr_in_browser(download_link)
-                    else:
-                        print(f"⬆️  Uploading {filename} to Google Drive...")
-                        download_link = self.upload_file(filepath, filename)
-                        
-                        if download_link:
-                            print(f"✅ Upload complete!")
-                            print(f"🔗 Download link: {download_link}")
-                            self.uploaded_hashes.add(file_hash)
-                            
-                            # Update latest upload data
-                            self.show_qr_in_browser(download_link)
-                        else:
-                            print(f"❌ Upload failed for {filename}")
-                
-            time.sleep(0.5)
+        A file whose fingerprint matches an upload still in flight waits for it
+        and is queued again afterwards, so it finds that upload in the index
+        instead of uploading a second copy.
+        """
+        fingerprint = quick_fingerprint(filepath)
+        if not fingerprint:
+            return
+        
+        with self.inflight_lock:
+            if fingerprint in self.inflight_uploads:
+                self.inflight_uploads[fingerprint].append((filepath, filename))
+                print(f"⏳ {filename} looks like an upload in progress - checking once it finishes")
+                return
+            self.inflight_uploads[fingerprint] = []
+        
+        # Don't skip duplicates - we want to show the dialog
+        if not self.upload_queue.submit(filepath, filename, fingerprint):
+            self.finish_inflight(fingerprint)
+    
+    def finish_inflight(self, fingerprint):
+        """Mark an upload finished and queue the files that were waiting on it"""
+        with self.inflight_lock:
+            waiting = self.inflight_uploads.pop(fingerprint, [])
+        
+        for filepath, filename in waiting:
+            if os.path.exists(filepath):
+                self.queue_finished_download(filepath, filename)
+    
+    def process_upload_job(self, job):
+        """Upload one queued file (runs on an upload worker) and return its link"""
+        try:
+            return self.upload_job_file(job)
+        finally:
+            self.finish_inflight(job.fingerprint)
+    
+    def upload_job_file(self, job):
+        filepath, filename, fingerprint = job.filepath, job.filename, job.fingerprint
+        
+        if not os.path.exists(filepath):
+            return None
+        
+        # Check if we already uploaded this file (local lookup, one metadata call to confirm)
+        record = self.find_uploaded_record(filepath, fingerprint)
+        if record:
+            print(f"📋 File already uploaded: {filename}")
+            existing_link = record['download_link']
+            print(f"🔗 Using existing link: {existing_link}")
+            self.show_qr_in_browser(existing_link, filename)
+            return existing_link
+        
+        print(f"⬆️  Uploading {filename} to Google Drive...")
+        download_link = self.upload_and_record(filepath, filename, fingerprint)
+        
+        if download_link:
+            print(f"✅ Upload complete!")
+            print(f"🔗 Download link: {download_link}")
+            
+            # Update latest upload data
+            self.show_qr_in_browser(download_link, filename)
+        else:
+            print(f"❌ Upload failed for {filename}")
+        return download_link
+    
+    def upload_and_record(self, filepath, filename, fingerprint):
+        """Upload a file and index it by SHA256, hashed from the bytes sent to Drive"""
+        try:
+            with HashingFileReader(filepath) as reader:
+                file_id = self.upload_to_drive(filepath, filename, reader)
+                if not file_id:
+                    return None
+                download_link = self.make_download_link(file_id)
+                self.upload_index.record(reader.hexdigest(), fingerprint, file_id, download_link, filepath)
+                return download_link
+        except OSError as e:
+            print(f"Upload error: {e}")
+            return None
+    
+    def make_download_link(self, file_id):
+        """Direct download link for a Drive file"""
+        # This format forces download even if permissions aren't perfect
+        return f"https://drive.google.com/uc?export=download&id={file_id}&confirm=t"
     
-    def upload_file(self, filepath, filename):
-        """Upload file to Google Drive"""
-        if not self.service or not self.folder_id:
+    def upload_file(self, filepath, filename, reader=None):
+        """Upload file to Google Drive and return its download link"""
+        file_id = self.upload_to_drive(filepath, filename, reader)
+        if file_id:
+            return self.make_download_link(file_id)
+        return None
+    
+    def upload_to_drive(self, filepath, filename, reader=None):
+        """Upload file to Google Drive, reading through reader when given, and return its ID"""
+        if not self.service:
             print("ERROR: Service not initialized properly")
             return None
+        
+        if reader is None:
+            with HashingFileReader(filepath) as reader:
+                return self.upload_to_drive(filepath, filename, reader)
+        
+        folder_id = self.folder_resolver.upload_folder()
+        if not folder_id:
+            print("ERROR: Could not create/find upload folder")
+            return None
             
         try:
             # Prepare file metadata
             file_metadata = {
                 'name': f'veo_{datetime.now().strftime("%Y%m%d_%H%M%S")}_{filename}',
-                'parents': [self.folder_id]
+                'parents': [folder_id]
             }
             
-            # Upload file
-            media = MediaFileUpload(filepath, resumable=True)
-            file = self.service.files().create(
-                body=file_metadata,
-                media_body=media,
-                fields='id'
-            ).execute()
+            # Use a pre-generated ID so the link is known without another round trip
+            reserved_id = self.drive_metadata.reserve_file_id()
+            if reserved_id:
+                file_metadata['id'] = reserved_id
+            
+            # Upload file in resumable chunks, retrying from the last committed offset
+            mimetype = mimetypes.guess_type(filepath)[0] or 'application/octet-stream'
+            uploader = ResumableUploader(self.get_thread_session(), chunk_size=self.upload_chunk_size)
+            file = uploader.upload(
+                reader,
+                os.path.getsize(filepath),
+                file_metadata,
+                mimetype,
+                progress=lambda sent, total: self.show_upload_progress(filename, sent, total)
+            )
             
             file_id = file.get('id')
             
-            # Make file publicly accessible
-            try:
-                self.service.permissions().create(
-                    fileId=file_id,
-                    body={'type': 'anyone', 'role': 'reader'}
-                ).execute()
-            except Exception as e:
-                print(f"Warning: Could not make file public: {e}")
-            
-            # Always return direct download link format
-            # This format forces download even if permissions aren't perfect
-            download_link = f"https://drive.google.com/uc?export=download&id={file_id}&confirm=t"
+            # Make file publicly accessible (batched with other grants); the link is
+            # only handed out once this file's grant is confirmed
+            if not self.wait_until_public(file_id, filename):
+                return None
             
-            return download_link
+            return file_id
             
         except Exception as e:
             print(f"Upload error: {e}")
             return None
     
-    def show_loading_spinner(self):
+    def wait_until_public(self, file_id, upload):
+        """Queue the public grant for file_id and wait until it is confirmed
+        
+        Returns False (and tells the browser) if the grant was dropped or timed out.
+        """
+        try:
+            granted = self.drive_metadata.make_public(file_id).result(timeout=GRANT_TIMEOUT)
+        except Exception:
+            granted = False
+        if not granted:
+            print(f"❌ {upload} was uploaded but could not be made public")
+            self.show_upload_failed(upload, 'Could not make the file public')
+        return granted
+    
+    def show_loading_spinner(self, upload=None):
         """Show loading spinner in browser immediately"""
         try:
-            # Update in-memory data with loading state
-            self.latest_upload_data = {
+            # Push loading state to subscribed browsers
+            self.upload_events.publish({
                 'loading': True,
+                'upload': upload,
                 'timestamp': datetime.now().isoformat()
-            }
+            })
             
             print(f"⏳ Showing loading spinner...")
             
         except Exception as e:
             print(f"Error showing loading spinner: {e}")
     
-    def show_qr_in_browser(self, download_link):
-        """Update latest upload data for browser to read"""
+    def show_upload_progress(self, upload, sent, total):
+        """Publish upload progress so the spinner can show a percentage"""
+        percent = int(sent * 100 / total) if total else 100
+        self.upload_events.publish({
+            'progress': percent,
+            'upload': upload,
+            'timestamp': datetime.now().isoformat()
+        })
+    
+    def show_upload_failed(self, upload, error):
+        """Publish a failed upload so the spinner stops waiting for a link"""
+        self.upload_events.publish({
+            'failed': True,
+            'error': error,
+            'upload': upload,
+            'timestamp': datetime.now().isoformat()
+        })
+    
+    def show_qr_in_browser(self, download_link, upload=None):
+        """Publish the download link for the browser to show as a QR code"""
         try:
-            # Update in-memory data
-            self.latest_upload_data = {
+            # Push link to subscribed browsers
+            self.upload_events.publish({
                 'link': download_link,
+                'upload': upload,
                 'timestamp': datetime.now().isoformat()
-            }
+            })
             
             print(f"📱 QR code ready. Browser will display it automatically.")
             
@@ -466,54 +536,15 @@ class OAuthDriveService:
             print(f"Error updating QR data: {e}")
     
     def start_web_server(self):
-        """Start a simple web server to serve upload data"""
-        class UploadDataHandler(http.server.SimpleHTTPRequestHandler):
-            service = self
-            
-            def do_GET(self):
-                if self.path.startswith('/latest_upload.json'):
-                    self.send_response(200)
-                    self.send_header('Content-type', 'application/json')
-                    self.send_header('Access-Control-Allow-Origin', '*')
-                    self.end_headers()
-                    
-                    if self.service.latest_upload_data:
-                        self.wfile.write(json.dumps(self.service.latest_upload_data).encode())
-                    else:
-                        self.wfile.write(b'{}')
-                else:
-                    self.send_response(404)
-                    self.end_headers()
-            
-            def log_message(self, format, *args):
-                pass  # Suppress logging
-        
-        UploadDataHandler.service = self
-        
+        """Start the status server that serves and pushes upload events"""
         try:
             # Use only port 8888
-            port = 8888
+            port = STATUS_PORT
             try:
-                # Create custom server class for Windows error handling
-                if platform.system() == 'Windows':
-                    class WindowsTCPServer(socketserver.TCPServer):
-                        def handle_error(self, request, client_address):
-                            """Suppress Windows connection abort errors"""
-                            exc_type, exc_value = sys.exc_info()[:2]
-                            if exc_type == ConnectionAbortedError:
-                                # Ignore - browser closed connection
-                                return
-                            if hasattr(exc_value, 'errno') and exc_value.errno in [10053, 10054]:
-                                # Windows: connection abort/reset
-                                return
-                            super().handle_error(request, client_address)
-                    
-                    self.web_server = WindowsTCPServer(('localhost', port), UploadDataHandler)
-                else:
-                    self.web_server = socketserver.TCPServer(('localhost', port), UploadDataHandler)
-                
+                self.web_server = create_status_server(self.upload_events, port)
                 self.web_port = port
                 print(f"📡 Web server started on http://localhost:{port}")
+                self.web_ready.set()
                 
                 # Store the port for JavaScript
                 self.update_js_port(port)
@@ -523,6 +554,8 @@ class OAuthDriveService:
                 print(f"Error: Could not start server on port {port} - {e}")
         except Exception as e:
             print(f"Web server error: {e}")
+        finally:
+            self.web_ready.set()
     
     def update_js_port(self, port):
         """Update JavaScript handler with correct port"""
@@ -553,29 +586,39 @@ class OAuthDriveService:
         self.web_thread = threading.Thread(target=self.start_web_server, daemon=True)
         self.web_thread.start()
         
-        # Give web server time to start
-        time.sleep(0.5)
+        # Wait until the server socket is bound (or failed), not a fixed delay
+        self.web_ready.wait(timeout=2)
+        
+        # Start upload workers before anything can be queued
+        self.upload_queue = UploadJobQueue(self.process_upload_job, workers=self.upload_workers)
+        self.upload_queue.start()
+        
+        # Batch permission grants and ID refills off the upload path
+        self.drive_metadata.start()
         
         # Start monitor thread
         self.monitor_thread = threading.Thread(target=self.monitor_downloads, daemon=True)
         self.monitor_thread.start()
         
-        # Start upload thread
-        self.upload_thread = threading.Thread(target=self.process_uploads, daemon=True)
-        self.upload_thread.start()
-        
         print("🚀 Automatic upload service started")
         return True
     
     def stop(self):
         """Stop the service"""
         self.running = False
+        if self.download_watcher:
+            self.download_watcher.stop()
+        if self.completion_tracker:
+            self.completion_tracker.stop()
         if self.monitor_thread:
             self.monitor_thread.join(timeout=2)
-        if self.upload_thread:
-            self.upload_thread.join(timeout=2)
+        if self.upload_queue:
+            self.upload_queue.stop()
+        self.drive_metadata.stop()
+        self.upload_events.close()
         if self.web_server:
             self.web_server.shutdown()
+        self.upload_index.close()
         print("🛑 Automatic upload service stopped")
 
 # Global service instance
@@ -0,0 +1,61 @@
+"""Local pages rendered from templates, re-rendered only when their inputs change"""
+
+import os
+import threading
+
+
+class RenderedPage:
+    """A template rendered to output_path and kept in memory
+
+    The page is rendered again only when the template or one of the
+    dependency files (e.g. credentials.json) has a new mtime, and the output
+    file is written only if the rendered HTML actually changed. Showing the
+    page again therefore costs a few stat() calls and no reads or writes.
+
+    The page stays a file instead of being served from memory because other
+    local pages link to it by relative path and it loads its images and links
+    back the same way; a data: or http: URL would break those file:// paths.
+    """
+
+    def __init__(self, template_path, output_path, render, dependencies=()):
+        self.template_path = template_path
+        self.output_path = output_path
+        self.render = render
+        self.dependencies = list(dependencies)
+        self.html = None
+        self._key = None
+        self._lock = threading.Lock()
+
+    def _mtimes(self):
+        mtimes = []
+        for path in [self.template_path] + self.dependencies:
+            try:
+                mtimes.append(os.stat(path).st_mtime)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def path(self):
+        """Path of the up-to-date rendered page (the existing file if there is no template)"""
+        with self._lock:
+            key = self._mtimes()
+            if key == self._key or key[0] is None:
+                return self.output_path
+
+            with open(self.template_path, 'r', encoding='utf-8') as f:
+                html = self.render(f.read())
+
+            if self.html is None:
+                # First render this run: compare with what an earlier run left on disk
+                try:
+                    with open(self.output_path, 'r', encoding='utf-8') as f:
+                        self.html = f.read()
+                except OSError:
+                    pass
+
+            if html != self.html:
+                with open(self.output_path, 'w', encoding='utf-8') as f:
+                    f.write(html)
+                self.html = html
+            self._key = key
+            return self.output_path
@@ -0,0 +1,130 @@
+// Generation progress tracker
+// Finds the percentage labels Flow renders while a video generates and watches
+// only their text (characterData), instead of scanning the whole page. New
+// labels are found from added nodes (and their parents) by the shared childList
+// watcher; only hidden labels (as the old page scan judged them) are ignored.
+// Fires 'veo:progress' on window with { active, percent, count } whenever the
+// state changes; veoProgress.subscribe(fn) also calls fn with the current state.
+(function() {
+    if (window.veoProgress) return;
+
+    // A label that is nothing but a percentage, e.g. "42%". React may render it as
+    // sibling text nodes ("42", "%") or wrap each part in its own element, so the
+    // text is read from the label element rather than from a single text node.
+    const PERCENT_TEXT = /^\s*(\d{1,3})\s*%\s*$/;
+    const PERCENT_VALUE = /(\d{1,3})\s*%/;
+    const PERCENT_PART = /[\d%]/;
+    const IGNORED = 'script, style, #veo-home-button';
+    // How many ancestors of a text node may hold the whole label, and its longest text
+    const LABEL_DEPTH = 2;
+    const MAX_LABEL_LENGTH = 12;
+
+    // Tracked progress elements -> last seen percentage (null if none)
+    const tracked = new Map();
+    const textObserver = new MutationObserver(update);
+    let state = { active: false, percent: null, count: 0 };
+
+    function track(textNode) {
+        if (!PERCENT_PART.test(textNode.data)) return;
+        let element = textNode.parentElement;
+        for (let depth = 0; element && depth < LABEL_DEPTH; depth++, element = element.parentElement) {
+            if (tracked.has(element)) return;
+            const text = element.textContent;
+            if (text.length > MAX_LABEL_LENGTH) return;
+            if (!PERCENT_TEXT.test(text)) continue;
+            if (element.closest(IGNORED)) return;
+            tracked.set(element, null);
+            // React may swap the text node instead of editing it, so childList too
+            textObserver.observe(element, { characterData: true, childList: true, subtree: true });
+            return;
+        }
+    }
+
+    // Look for progress labels in a newly added subtree (or the whole body once)
+    function scan(root) {
+        if (root.nodeType === Node.TEXT_NODE) {
+            track(root);
+            return;
+        }
+        if (root.nodeType !== Node.ELEMENT_NODE) return;
+        const walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT);
+        for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+            track(node);
+        }
+    }
+
+    // Forget labels that left the page; an observer cannot unobserve one target
+    function prune() {
+        let removed = false;
+        for (const element of tracked.keys()) {
+            if (!element.isConnected) {
+                tracked.delete(element);
+                removed = true;
+            }
+        }
+        if (removed) {
+            textObserver.disconnect();
+            for (const element of tracked.keys()) {
+                textObserver.observe(element, { characterData: true, childList: true, subtree: true });
+            }
+        }
+    }
+
+    // Same visibility test the old full-page scan applied
+    function isVisible(element) {
+        const rect = element.getBoundingClientRect();
+        if (rect.width === 0 || rect.height === 0) return false;
+        const style = window.getComputedStyle(element);
+        return style.display !== 'none' && style.visibility !== 'hidden' && style.opacity !== '0';
+    }
+
+    function update() {
+        prune();
+
+        const percents = [];
+        for (const element of tracked.keys()) {
+            const match = isVisible(element) && PERCENT_VALUE.exec(element.textContent);
+            const percent = match ? Math.min(100, parseInt(match[1], 10)) : null;
+            tracked.set(element, percent);
+            if (percent !== null) percents.push(percent);
+        }
+
+        // With several videos generating, report the one furthest behind
+        const next = {
+            active: percents.length > 0,
+            percent: percents.length ? Math.min(...percents) : null,
+            count: percents.length
+        };
+        if (next.active === state.active && next.percent === state.percent && next.count === state.count) return;
+
+        state = next;
+        window.dispatchEvent(new CustomEvent('veo:progress', { detail: Object.assign({}, state) }));
+    }
+
+    function subscribe(callback) {
+        const listener = (event) => callback(event.detail);
+        window.addEventListener('veo:progress', listener);
+        callback(Object.assign({}, state));
+        return () => window.removeEventListener('veo:progress', listener);
+    }
+
+    function rescan() {
+        if (document.body) scan(document.body);
+        update();
+    }
+
+    // Only nodes added since the last run are scanned; removals trigger a prune
+    veoDomWatch.watch('progress_tracker', (added) => {
+        for (const node of added) scan(node);
+        update();
+    }, { collect: true, removals: true, immediate: false });
+
+    window.veoProgress = {
+        current: () => Object.assign({}, state),
+        subscribe,
+        rescan,
+        tracked: () => Array.from(tracked.keys())
+    };
+
+    rescan();
+})();
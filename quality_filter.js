@@ -21,47 +21,24 @@ function filterQualityOptions() {
     });
 }
 
-// Monitor for dropdown menus opening
-const observer = new MutationObserver((mutations) => {
-    // Check if any dropdown menu was added or modified
-    for (const mutation of mutations) {
-        if (mutation.type === 'childList') {
-            // Check if any of the added nodes might be a dropdown menu
-            mutation.addedNodes.forEach(node => {
-                if (node.nodeType === 1) { // Element node
-                    // Check if it's a menu or contains menu items
-                    if (node.getAttribute('role') === 'menu' || 
-                        node.querySelector('[role="menuitem"]') ||
-                        node.querySelector('[role="option"]')) {
-                        // Filter quality options with a small delay to ensure rendering
-                        setTimeout(filterQualityOptions, 10);
-                    }
-                }
-            });
-        }
-    }
+// Filter whenever a menu or its options are rendered
+const qualityWatch = veoDomWatch.watch('quality_filter', filterQualityOptions, {
+    selector: '[role="menu"], [role="menuitem"], [role="option"], li[data-value]',
+    immediate: false
 });
 
-// Start observing
-observer.observe(document.body, {
-    childList: true,
-    subtree: true
-});
-
-// Also monitor click events on download buttons
+// Also filter after a download button click, while its dropdown is opening
 document.addEventListener('click', function(e) {
-    const target = e.target;
-    const button = target.closest('button');
+    const button = e.target.closest && e.target.closest('button');
+    if (!button) return;
     
-    if (button) {
-        // Check if it's a download button
-        const icon = button.querySelector('i.google-symbols') || button.querySelector('i');
-        if (icon && icon.textContent === 'download') {
-            // Filter options after dropdown opens
-            setTimeout(filterQualityOptions, 100);
-            setTimeout(filterQualityOptions, 300);
-            setTimeout(filterQualityOptions, 500);
-        }
+    // Check if it's a download button
+    const icon = button.querySelector('i.google-symbols') || button.querySelector('i');
+    if (icon && icon.textContent === 'download') {
+        qualityWatch.trigger();
+        setTimeout(qualityWatch.trigger, 100);
+        setTimeout(qualityWatch.trigger, 300);
+        setTimeout(qualityWatch.trigger, 500);
     }
 }, true);
 
@@ -0,0 +1,185 @@
+"""Chunked resumable uploads to Google Drive with retry and progress reporting"""
+
+import json
+import os
+import random
+import time
+
+DRIVE_UPLOAD_URL = 'https://www.googleapis.com/upload/drive/v3/files'
+
+# Chunks must be a multiple of 256 KB (except the last one)
+CHUNK_GRANULARITY = 256 * 1024
+DEFAULT_CHUNK_SIZE = 32 * CHUNK_GRANULARITY
+
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+
+class ResumableUploadError(Exception):
+    """Upload failed permanently or ran out of retries"""
+
+
+def normalize_chunk_size(chunk_size):
+    """Round a chunk size to the nearest valid multiple of 256 KB"""
+    chunks = max(1, round(chunk_size / CHUNK_GRANULARITY))
+    return chunks * CHUNK_GRANULARITY
+
+
+def chunk_size_from_env(default=DEFAULT_CHUNK_SIZE):
+    """Chunk size from VEO_UPLOAD_CHUNK_MB, falling back to default"""
+    value = os.environ.get('VEO_UPLOAD_CHUNK_MB')
+    if not value:
+        return default
+    try:
+        return normalize_chunk_size(float(value) * 1024 * 1024)
+    except ValueError:
+        return default
+
+
+class ResumableUploader:
+    """Drive resumable upload protocol over a requests-style session
+
+    session must provide post()/put() returning objects with status_code,
+    headers and json(), e.g. google.auth AuthorizedSession for Drive or a
+    plain requests.Session against a local fake endpoint. After a transient
+    error the uploader asks the server how much it has committed and resumes
+    from that offset, backing off exponentially between attempts.
+    """
+
+    def __init__(self, session, upload_url=DRIVE_UPLOAD_URL, chunk_size=DEFAULT_CHUNK_SIZE,
+                 max_retries=6, backoff_base=0.5, backoff_max=16.0, timeout=60, sleep=time.sleep):
+        self.session = session
+        self.upload_url = upload_url
+        self.chunk_size = normalize_chunk_size(chunk_size)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.sleep = sleep
+
+    def upload(self, reader, size, metadata, mimetype, fields='id', progress=None):
+        """Upload size bytes from reader and return the created file resource
+
+        progress(bytes_committed, size) is called after every committed chunk.
+        """
+        session_url = self._start_session(size, metadata, mimetype, fields)
+        offset = 0
+        failures = 0
+
+        while True:
+            try:
+                if offset >= size and size > 0:
+                    response = self._query_status(session_url, size)
+                else:
+                    response = self._send_chunk(session_url, reader, offset, size)
+            except (OSError, ConnectionError) as e:
+                response = None
+                error = e
+            else:
+                error = None
+
+            if response is not None and response.status_code in (200, 201):
+                if progress:
+                    progress(size, size)
+                return response.json()
+
+            if response is not None and response.status_code == 308:
+                new_offset = self._committed_offset(response)
+                advanced = new_offset > offset
+                offset = new_offset
+                if advanced:
+                    failures = 0
+                    if progress:
+                        progress(offset, size)
+                    continue
+
+                # Nothing new was committed, or every byte was but the file was never finalized
+                failures += 1
+                if failures > self.max_retries:
+                    if offset >= size:
+                        raise ResumableUploadError(f"Upload gave up: all {size} bytes committed but Drive never finalized the file")
+                    raise ResumableUploadError(f"Upload gave up after {self.max_retries} retries: stuck at byte {offset}")
+                self.sleep(self._backoff(failures))
+                continue
+
+            if response is not None and response.status_code not in RETRYABLE_STATUSES:
+                raise ResumableUploadError(f"Upload failed with HTTP {response.status_code}: {response.text[:200]}")
+
+            failures += 1
+            if failures > self.max_retries:
+                reason = error or f"HTTP {response.status_code}"
+                raise ResumableUploadError(f"Upload gave up after {self.max_retries} retries: {reason}")
+
+            self.sleep(self._backoff(failures))
+            offset = self._resume_offset(session_url, size, offset)
+
+    def _start_session(self, size, metadata, mimetype, fields):
+        """Open an upload session and return its URL"""
+        failures = 0
+        while True:
+            try:
+                response = self.session.post(
+                    f"{self.upload_url}?uploadType=resumable&fields={fields}",
+                    headers={
+                        'Content-Type': 'application/json; charset=UTF-8',
+                        'X-Upload-Content-Type': mimetype,
+                        'X-Upload-Content-Length': str(size),
+                    },
+                    data=json.dumps(metadata),
+                    timeout=self.timeout
+                )
+            except (OSError, ConnectionError) as e:
+                response, error = None, e
+            else:
+                error = None
+                if response.status_code == 200 and response.headers.get('Location'):
+                    return response.headers['Location']
+                if response.status_code not in RETRYABLE_STATUSES:
+                    raise ResumableUploadError(f"Could not start upload, HTTP {response.status_code}: {response.text[:200]}")
+
+            failures += 1
+            if failures > self.max_retries:
+                raise ResumableUploadError(f"Could not start upload: {error or response.status_code}")
+            self.sleep(self._backoff(failures))
+
+    def _send_chunk(self, session_url, reader, offset, size):
+        reader.seek(offset)
+        data = reader.read(min(self.chunk_size, size - offset)) if size else b''
+        end = offset + len(data) - 1
+        content_range = f"bytes {offset}-{end}/{size}" if data else f"bytes */{size}"
+        return self.session.put(
+            session_url,
+            headers={'Content-Range': content_range, 'Content-Length': str(len(data))},
+            data=data,
+            timeout=self.timeout
+        )
+
+    def _query_status(self, session_url, size):
+        return self.session.put(
+            session_url,
+            headers={'Content-Range': f"bytes */{size}", 'Content-Length': '0'},
+            data=b'',
+            timeout=self.timeout
+        )
+
+    def _resume_offset(self, session_url, size, offset):
+        """Ask the server how many bytes it committed; keep offset if it can't say"""
+        try:
+            response = self._query_status(session_url, size)
+        except (OSError, ConnectionError):
+            return offset
+        if response.status_code == 308:
+            return self._committed_offset(response)
+        if response.status_code in (200, 201):
+            return size
+        return offset
+
+    def _committed_offset(self, response):
+        # Range: bytes=0-<last committed byte>; absent means nothing committed
+        committed = response.headers.get('Range')
+        if not committed:
+            return 0
+        return int(committed.rsplit('-', 1)[-1]) + 1
+
+    def _backoff(self, failures):
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (failures - 1)))
+        return delay * (0.5 + random.random() / 2)
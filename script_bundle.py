@@ -0,0 +1,102 @@
+"""Bundles the injected page scripts so a page is set up with one WebDriver call"""
+
+import os
+import threading
+
+try:
+    import rjsmin
+    MINIFY_AVAILABLE = True
+except ImportError:
+    MINIFY_AVAILABLE = False
+
+
+class InlineScript:
+    """A generated snippet (e.g. a config global) placed between bundled files"""
+
+    def __init__(self, name, source):
+        self.name = name
+        self.source = source
+
+
+class ConditionalScript:
+    """A script file that only runs when a JS condition is true in the page"""
+
+    def __init__(self, filename, condition):
+        self.name = filename
+        self.condition = condition
+
+
+class ScriptBundler:
+    """Loads page scripts once and concatenates them in the order given
+
+    Each script is wrapped in its own function, which is what execute_script
+    did for the separate calls: top-level declarations and early returns stay
+    local, and an exception only skips that one script. File contents and
+    finished bundles are cached and rebuilt only when a file's mtime changes.
+    """
+
+    def __init__(self, base_dir, minify=True):
+        self.base_dir = base_dir
+        self.minify = minify and MINIFY_AVAILABLE
+        if minify and not MINIFY_AVAILABLE:
+            print("ℹ️  rjsmin not installed, injecting page scripts unminified (pip install rjsmin)")
+        self._lock = threading.Lock()
+        self._sources = {}  # filename -> (mtime, source)
+        self._bundles = {}  # script names -> (versions, bundle source)
+
+    def _load(self, filename):
+        """(mtime, source) for a script file, or None if it does not exist"""
+        path = os.path.join(self.base_dir, filename)
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return None
+        cached = self._sources.get(filename)
+        if cached and cached[0] == mtime:
+            return cached
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        if self.minify:
+            source = rjsmin.jsmin(source)
+        self._sources[filename] = (mtime, source)
+        return self._sources[filename]
+
+    def build(self, parts):
+        """Return (bundle source, names included) for filenames and script objects"""
+        with self._lock:
+            seen = set()
+            loaded = []
+            for part in parts:
+                name = part if isinstance(part, str) else part.name
+                if name in seen:
+                    continue
+                seen.add(name)
+                condition = getattr(part, 'condition', None)
+                if isinstance(part, InlineScript):
+                    loaded.append((name, part.source, part.source, condition))
+                    continue
+                entry = self._load(name)
+                if entry:
+                    loaded.append((name, (entry[0], condition), entry[1], condition))
+
+            names = tuple(item[0] for item in loaded)
+            versions = tuple(item[1] for item in loaded)
+            cached = self._bundles.get(names)
+            if cached and cached[0] == versions:
+                return cached[1], list(names)
+            bundle = '\n'.join(self._wrap(name, source, condition) for name, _, source, condition in loaded)
+            self._bundles[names] = (versions, bundle)
+            return bundle, list(names)
+
+    def _wrap(self, name, source, condition=None):
+        call = f"(function() {{\n{source}\n}})();"
+        if condition:
+            call = f"if ({condition}) {call}"
+        return f"try {{ {call} }} catch (e) {{ console.error('[Veo] Script {name} failed:', e); }}"
+
+    def inject(self, driver, parts):
+        """Run all parts in one execute_script call and return the names injected"""
+        bundle, names = self.build(parts)
+        if names:
+            driver.execute_script(bundle)
+        return names
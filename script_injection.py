@@ -0,0 +1,99 @@
+"""Registers page script bundles with Chrome so they run on every new document"""
+
+import json
+import threading
+
+
+class ScriptInjectionManager:
+    """Keeps script bundles registered through Page.addScriptToEvaluateOnNewDocument
+
+    Chrome runs registered scripts in every new document before the page's
+    own scripts, so they survive navigations without being sent again. Each
+    registration is limited to URLs matching one of its regex patterns and
+    to the top-level frame. Scripts in the early group run at document start;
+    the rest wait for DOMContentLoaded, as they did when injected after load.
+
+    refresh() re-registers any bundle whose files changed on disk. If the
+    driver has no CDP support, available is False and callers fall back to
+    execute_script injection.
+    """
+
+    def __init__(self, driver, bundler):
+        self.driver = driver
+        self.bundler = bundler
+        self.available = hasattr(driver, 'execute_cdp_cmd')
+        self._lock = threading.Lock()
+        self._registrations = {}  # name -> dict(url_patterns, early, parts, source, identifier)
+
+    def register(self, name, url_patterns, early=(), parts=()):
+        """Register (or replace) a named bundle; returns the script names included"""
+        with self._lock:
+            self._registrations[name] = {
+                'url_patterns': list(url_patterns),
+                'early': list(early),
+                'parts': list(parts),
+                'source': None,
+                'identifier': None,
+            }
+            return self._sync(name)
+
+    def refresh(self):
+        """Re-register bundles whose script files changed since they were sent"""
+        with self._lock:
+            for name in list(self._registrations):
+                self._sync(name)
+
+    def unregister_all(self):
+        with self._lock:
+            for registration in self._registrations.values():
+                self._remove(registration)
+            self._registrations.clear()
+
+    def _sync(self, name):
+        registration = self._registrations[name]
+        source, names = self._build(registration)
+        if source == registration['source'] or not self.available:
+            return names
+
+        self._remove(registration)
+        try:
+            result = self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': source})
+        except Exception as e:
+            print(f"CDP script injection unavailable: {e}")
+            self.available = False
+            return names
+        registration['source'] = source
+        registration['identifier'] = result.get('identifier')
+        return names
+
+    def _remove(self, registration):
+        if registration['identifier'] is None:
+            return
+        try:
+            self.driver.execute_cdp_cmd('Page.removeScriptToEvaluateOnNewDocument',
+                                        {'identifier': registration['identifier']})
+        except Exception:
+            pass
+        registration['identifier'] = None
+
+    def _build(self, registration):
+        early_source, early_names = self.bundler.build(registration['early'])
+        # A script already in the early group is not bundled a second time
+        parts = [part for part in registration['parts']
+                 if (part if isinstance(part, str) else part.name) not in early_names]
+        late_source, late_names = self.bundler.build(parts)
+        patterns = json.dumps(registration['url_patterns'])
+        source = f"""(function() {{
+    if (window.top !== window) return;
+    if (!{patterns}.some(function(pattern) {{ return new RegExp(pattern).test(location.href); }})) return;
+{early_source}
+    function veoRunPageScripts() {{
+{late_source}
+    }}
+    if (document.readyState === 'loading') {{
+        document.addEventListener('DOMContentLoaded', veoRunPageScripts, {{ once: true }});
+    }} else {{
+        veoRunPageScripts();
+    }}
+}})();"""
+        return source, early_names + late_names
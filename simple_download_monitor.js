@@ -6,67 +6,155 @@ window.simpleDownloadMonitorInitialized = true;
 
 // Removed showQROverlay function - no longer showing download link dialog
 
+// Responses are classified from status, headers and URL first; a body is read
+// only when it is likely an export response, and then streamed until the
+// download URL shows up.
+
+// URLs that may carry an export's download URL
+const EXPORT_URL = /\/(render|transcode|export|download)|[?&](output|export)_format=/;
+const API_URL = /\/v1\/|_api\//;
+// Export responses are small JSON; anything bigger is media or a listing
+const MAX_EXPORT_BODY = 256 * 1024;
+// Top-level fields that hold an export's download URL
+const DOWNLOAD_URL_KEYS = ['downloadUrl', 'url', 'output_url', 'exportUrl', 'download_url', 'signed_url', 'signedUrl'];
+// Cheap pre-check; it also matches nested fields, so a hit is confirmed with JSON.parse
+const DOWNLOAD_URL_FIELD = new RegExp(`"(${DOWNLOAD_URL_KEYS.join('|')})"\\s*:\\s*"https?:`);
+const PLAIN_URL = /https?:\/\/[^\s"'<>]+/;
+// Carried over between chunks so a field split across two chunks is still found
+const SCAN_OVERLAP = 256;
+
+const monitorStats = {
+    responses: 0,
+    byHeader: 0,
+    streamed: 0,
+    bytesStreamed: 0,
+    skipped: 0,
+    bytesSkipped: 0,
+    skippedUnknownLength: 0,
+    detected: 0
+};
+
+function downloadDetected() {
+    // Found download URL in response
+    // No longer showing download dialog
+    monitorStats.detected++;
+    window._expectingDownload = false;
+}
+
+function contentLength(headers) {
+    const length = parseInt(headers.get('content-length'), 10);
+    return isNaN(length) ? null : length;
+}
+
+// 'attachment', 'json' or 'text' (body worth scanning) or null, from status, headers and URL only
+function classifyResponse(url, status, headers) {
+    if (status < 200 || status >= 300) return null;
+    
+    const disposition = headers.get('content-disposition');
+    if (disposition && disposition.includes('attachment')) return 'attachment';
+    
+    // A download URL only clears _expectingDownload, so bodies matter only while it is set
+    if (!window._expectingDownload || !url || !(EXPORT_URL.test(url) || API_URL.test(url))) return null;
+    
+    const type = headers.get('content-type') || '';
+    const kind = type.includes('json') ? 'json' : type.includes('text/plain') ? 'text' : null;
+    if (!kind) return null;
+    
+    const length = contentLength(headers);
+    if (length !== null && length > MAX_EXPORT_BODY) return null;
+    return kind;
+}
+
+// Bodies the old monitor buffered and parsed: fetch while a download was expected or
+// for export and API URLs, XHR only for export paths
+function oldFetchWouldParse(url) {
+    return window._expectingDownload || !!(url && (EXPORT_URL.test(url) || API_URL.test(url)));
+}
+
+function oldXHRWouldParse(url) {
+    return !!(url && /\/(render|transcode|export|download)/.test(url));
+}
+
+// Count bodies the old monitor would have parsed but this one does not
+function recordSkipped(wouldParse, headers) {
+    if (!wouldParse) return;
+    monitorStats.skipped++;
+    const length = contentLength(headers);
+    if (length === null) monitorStats.skippedUnknownLength++;
+    else monitorStats.bytesSkipped += length;
+}
+
+// Parse a (size-capped) JSON body and look for a download URL field at the top level
+function hasTopLevelDownloadUrl(text) {
+    try {
+        const data = JSON.parse(text);
+        return !!data && DOWNLOAD_URL_KEYS.some(key => data[key]);
+    } catch (e) {
+        return false;
+    }
+}
+
+// JSON needs one of the download URL fields at the top level; plain text just needs a URL
+function matchesDownload(text, kind) {
+    if (kind === 'json') return DOWNLOAD_URL_FIELD.test(text) && hasTopLevelDownloadUrl(text);
+    return PLAIN_URL.test(text);
+}
+
+// Read the body chunk by chunk up to the size cap. Plain text stops at the first URL;
+// JSON is kept and parsed once at the end, and only if a download URL field showed up.
+async function scanBody(response, kind) {
+    monitorStats.streamed++;
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let body = '';
+    let candidate = false;
+    let tail = '';
+    let read = 0;
+    try {
+        while (read < MAX_EXPORT_BODY) {
+            const { done, value } = await reader.read();
+            if (done) {
+                if (candidate && hasTopLevelDownloadUrl(body + decoder.decode())) downloadDetected();
+                break;
+            }
+            read += value.byteLength;
+            const chunk = decoder.decode(value, { stream: true });
+            const text = tail + chunk;
+            tail = text.slice(-SCAN_OVERLAP);
+            if (kind === 'json') {
+                body += chunk;
+                if (!candidate) candidate = DOWNLOAD_URL_FIELD.test(text);
+            } else if (PLAIN_URL.test(text)) {
+                downloadDetected();
+                break;
+            }
+        }
+    } finally {
+        monitorStats.bytesStreamed += read;
+        reader.cancel().catch(() => {});
+    }
+}
+
 // Only monitor fetch requests without modifying them
 const originalFetch = window.fetch;
 window.fetch = function(...args) {
     const url = typeof args[0] === 'string' ? args[0] : args[0]?.url;
-    const options = args[1] || {};
     
     // Removed fetch logging to reduce console noise
     
     // Call original fetch
     return originalFetch.apply(this, args).then(response => {
-        // Check if this might be a download response
-        if (window._expectingDownload || (url && (
-            url.includes('/render') ||
-            url.includes('/transcode') ||
-            url.includes('/export') ||
-            url.includes('/download') ||
-            url.includes('output_format=') ||
-            url.includes('export_format=') ||
-            url.includes('/v1/') || // API endpoints
-            url.includes('_api/')
-        ))) {
-            // Potential download response detected
-            
-            // Clone response to read it
-            const cloned = response.clone();
-            
-            // Check response headers for download indication
-            const contentDisposition = response.headers.get('content-disposition');
-            if (contentDisposition && contentDisposition.includes('attachment')) {
-                // Download detected via Content-Disposition header
-                // No longer showing download dialog
-                window._expectingDownload = false;
-            } else {
-                // Try to parse response body
-                cloned.text().then(text => {
-                    try {
-                        const data = JSON.parse(text);
-                        // Look for download URL in response
-                        if (data.downloadUrl || data.url || data.output_url || data.exportUrl || 
-                            data.download_url || data.signed_url || data.signedUrl) {
-                            const downloadUrl = data.downloadUrl || data.url || data.output_url || 
-                                              data.exportUrl || data.download_url || data.signed_url || 
-                                              data.signedUrl;
-                            // Found download URL in response
-                            // No longer showing download dialog
-                            window._expectingDownload = false;
-                        }
-                    } catch (e) {
-                        // Not JSON or error parsing
-                        if (window._expectingDownload && text.includes('http')) {
-                            // Try to extract URL from text
-                            const urlMatch = text.match(/(https?:\/\/[^\s"'<>]+)/);
-                            if (urlMatch) {
-                                // Extracted URL from response
-                                // No longer showing download dialog
-                                window._expectingDownload = false;
-                            }
-                        }
-                    }
-                }).catch(() => {});
-            }
+        monitorStats.responses++;
+        const kind = classifyResponse(url, response.status, response.headers);
+        
+        if (kind === 'attachment') {
+            // Download detected via Content-Disposition header
+            monitorStats.byHeader++;
+            downloadDetected();
+        } else if (kind && response.body) {
+            scanBody(response.clone(), kind).catch(() => {});
+        } else {
+            recordSkipped(oldFetchWouldParse(url), response.headers);
         }
         
         return response;
@@ -90,22 +178,19 @@ XMLHttpRequest.prototype.send = function(body) {
     // Add response listener
     const originalOnLoad = xhr.onload;
     xhr.onload = function() {
-        if (xhr._url && (
-            xhr._url.includes('/render') ||
-            xhr._url.includes('/transcode') ||
-            xhr._url.includes('/export') ||
-            xhr._url.includes('/download')
-        )) {
-            try {
-                const data = JSON.parse(xhr.responseText);
-                if (data.downloadUrl || data.url || data.output_url || data.exportUrl || data.download_url) {
-                    const downloadUrl = data.downloadUrl || data.url || data.output_url || data.exportUrl || data.download_url;
-                    // Found download URL in XHR response
-                    // No longer showing download dialog
-                }
-            } catch (e) {
-                // Not JSON
-            }
+        monitorStats.responses++;
+        // XHR has no Headers object; getResponseHeader has the same lookup
+        const headers = { get: (name) => xhr.getResponseHeader(name) };
+        const kind = classifyResponse(xhr._url, xhr.status, headers);
+        
+        if (kind === 'attachment') {
+            monitorStats.byHeader++;
+            downloadDetected();
+        } else if (kind && (xhr.responseType === '' || xhr.responseType === 'text')) {
+            // The browser already buffered it; a regex test replaces JSON.parse
+            if (matchesDownload(xhr.responseText, kind)) downloadDetected();
+        } else {
+            recordSkipped(oldXHRWouldParse(xhr._url), headers);
         }
         
         if (originalOnLoad) originalOnLoad.apply(this, arguments);
@@ -114,6 +199,8 @@ XMLHttpRequest.prototype.send = function(body) {
     return originalXHRSend.apply(this, [body]);
 };
 
+window.downloadMonitorStats = () => Object.assign({}, monitorStats);
+
 // Store reference to the download button that was clicked
 let lastClickedDownloadButton = null;
 
@@ -0,0 +1,63 @@
+"""Concurrent startup phases with readiness futures and a timing breakdown"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class StartupOrchestrator:
+    """Runs named startup phases in parallel, each once its dependencies are done
+
+    submit() returns a Future for the phase result. A phase that depends on
+    another one receives nothing extra; it reads what it needs through
+    result(name). A failed dependency fails every phase that waits on it.
+    report() prints when each phase started and how long it took, relative to
+    when the orchestrator was created.
+    """
+
+    def __init__(self, max_workers=6):
+        self.started = time.monotonic()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='startup')
+        self._futures = {}
+        self._timings = {}  # name -> (start offset, duration, ok)
+        self._lock = threading.Lock()
+
+    def submit(self, name, fn, *args, after=(), **kwargs):
+        """Schedule fn(*args, **kwargs) as phase name after the phases in after"""
+        dependencies = [self._futures[dependency] for dependency in after]
+
+        def run_phase():
+            for dependency in dependencies:
+                dependency.result()
+            start = time.monotonic()
+            ok = False
+            try:
+                result = fn(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                with self._lock:
+                    self._timings[name] = (start - self.started, time.monotonic() - start, ok)
+
+        future = self._executor.submit(run_phase)
+        self._futures[name] = future
+        return future
+
+    def result(self, name, timeout=None):
+        """Block until phase name is done and return its result (or raise its error)"""
+        return self._futures[name].result(timeout)
+
+    def report(self):
+        """Print the per-phase timing breakdown"""
+        total = time.monotonic() - self.started
+        print("-" * 60)
+        print(f"Startup finished in {total:.2f}s")
+        with self._lock:
+            phases = sorted(self._timings.items(), key=lambda item: item[1][0])
+        for name, (offset, duration, ok) in phases:
+            status = "" if ok else "  (failed)"
+            print(f"  {name:<14} +{offset:5.2f}s  {duration:6.2f}s{status}")
+        print("-" * 60)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
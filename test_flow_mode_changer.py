@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Flow mode changer against a local mock of the mode dropdown
+
+The mock renders the combobox late, opens the listbox and applies the new
+mode after short delays, like the real page. Needs Chrome and chromedriver.
+"""
+import http.server
+import sys
+import threading
+import time
+
+import pytest
+
+# Collected by pytest like the other test_*.py scripts; skip where there is no browser stack
+pytest.importorskip("selenium")
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+
+from flow_mode_changer import change_to_asset_mode, ASSET_MODE_TEXT
+
+# Delays (ms) the mock page applies before each step becomes possible
+BUTTON_DELAY = 800
+LISTBOX_DELAY = 150
+APPLY_DELAY = 100
+
+MOCK_PAGE = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"></head>
+<body>
+<script>
+setTimeout(() => {{
+    const button = document.createElement('button');
+    button.setAttribute('role', 'combobox');
+    button.setAttribute('aria-expanded', 'false');
+    button.innerHTML = '<span>텍스트로 동영상 만들기</span>';
+    document.body.appendChild(button);
+
+    button.addEventListener('click', () => {{
+        button.setAttribute('aria-expanded', 'true');
+        setTimeout(() => {{
+            const listbox = document.createElement('div');
+            listbox.setAttribute('role', 'listbox');
+            for (const label of ['텍스트로 동영상 만들기', '프레임으로 동영상 만들기', '{ASSET_MODE_TEXT}']) {{
+                const option = document.createElement('div');
+                option.setAttribute('role', 'option');
+                option.innerHTML = '<span>' + label + '</span>';
+                option.setAttribute('aria-selected', String(button.textContent.includes(label)));
+                option.addEventListener('click', () => {{
+                    option.setAttribute('aria-selected', 'true');
+                    listbox.remove();
+                    button.setAttribute('aria-expanded', 'false');
+                    setTimeout(() => {{ button.innerHTML = '<span>' + label + '</span>'; }}, {APPLY_DELAY});
+                }});
+                listbox.appendChild(option);
+            }}
+            document.body.appendChild(listbox);
+        }}, {LISTBOX_DELAY});
+    }});
+}}, {BUTTON_DELAY});
+</script>
+</body></html>
+""".encode('utf-8')
+
+
+class MockFlowHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(MOCK_PAGE)))
+        self.end_headers()
+        self.wfile.write(MOCK_PAGE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_mode_change_timing(runs=5):
+    server = http.server.ThreadingHTTPServer(('localhost', 0), MockFlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    options = Options()
+    options.add_argument('--headless=new')
+    try:
+        driver = webdriver.Chrome(options=options)
+    except WebDriverException as e:
+        server.shutdown()
+        pytest.skip(f"Chrome is not available: {e.msg}")
+
+    timings = []
+    try:
+        for _ in range(runs):
+            driver.get(f'http://localhost:{server.server_port}/')
+            started = time.monotonic()
+            assert change_to_asset_mode(driver)
+            timings.append(time.monotonic() - started)
+    finally:
+        driver.quit()
+        server.shutdown()
+
+    # Time the page itself needs before the switch can possibly finish
+    floor = (BUTTON_DELAY + LISTBOX_DELAY + APPLY_DELAY) / 1000
+    average = sum(timings) / len(timings)
+    print(f"✓ Mode changed in {average:.2f}s on average "
+          f"(best {min(timings):.2f}s, worst {max(timings):.2f}s, page floor {floor:.2f}s)")
+    assert max(timings) < floor + 1.5
+
+
+if __name__ == "__main__":
+    test_mode_change_timing(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
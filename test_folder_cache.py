@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Test that the upload folder resolver recovers when its first lookup fails
+
+No cache exists and the background lookup hits a network error; a later
+upload_folder() call must look the folder up again instead of returning
+None for the rest of the session.
+"""
+import os
+import tempfile
+
+from folder_cache import DriveFolderResolver
+
+
+class FlakyDriveService:
+    """files().list() fails the first `failures` times, then finds the folder"""
+
+    def __init__(self, failures=1):
+        self.failures = failures
+        self.lists = 0
+
+    def files(self):
+        return self
+
+    def list(self, **kwargs):
+        return self
+
+    def get(self, **kwargs):
+        return self
+
+    def execute(self):
+        self.lists += 1
+        if self.lists <= self.failures:
+            raise OSError('network unreachable')
+        return {'files': [{'id': 'folder-id', 'name': 'Veo_Uploads'}]}
+
+
+def test_upload_folder_recovers_after_failed_lookup():
+    service = FlakyDriveService()
+    with tempfile.TemporaryDirectory() as directory:
+        cache_path = os.path.join(directory, 'folder_cache.json')
+        resolver = DriveFolderResolver(cache_path, 'test', 'Veo_Uploads', lambda: service)
+        resolver.start()
+
+        # The background lookup failed; the next upload retries it
+        assert resolver.upload_folder(timeout=5) == 'folder-id'
+        assert service.lists == 2
+        assert resolver.root_id == 'folder-id'
+
+        # Cached for the next session
+        restarted = DriveFolderResolver(cache_path, 'test', 'Veo_Uploads', lambda: service)
+        restarted.start()
+        assert restarted.root_id == 'folder-id'
+    print("✓ Upload folder recovered after a failed first lookup")
+
+
+if __name__ == "__main__":
+    test_upload_folder_recovers_after_failed_lookup()
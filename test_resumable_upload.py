@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test the resumable upload engine against a local fake Drive upload endpoint
+"""
+import hashlib
+import http.server
+import os
+import re
+import tempfile
+import threading
+
+import requests
+
+from resumable_upload import ResumableUploader, CHUNK_GRANULARITY
+from upload_hashing import HashingFileReader
+
+
+class FakeUploadHandler(http.server.BaseHTTPRequestHandler):
+    """Minimal Drive resumable protocol that fails every third chunk halfway"""
+
+    received = bytearray()
+    requests_seen = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        FakeUploadHandler.received = bytearray()
+        self.send_response(200)
+        self.send_header('Location', f'http://localhost:{self.server.server_port}/session/1')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_PUT(self):
+        FakeUploadHandler.requests_seen += 1
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        content_range = self.headers['Content-Range']
+        received = FakeUploadHandler.received
+
+        match = re.match(r'bytes (\d+)-(\d+)/(\d+)', content_range)
+        if match:
+            start, total = int(match.group(1)), int(match.group(3))
+            if start != len(received):
+                return self._reply(400)
+            if FakeUploadHandler.requests_seen % 3 == 0:
+                # Commit only part of the chunk, then fail like a dropped connection
+                received.extend(body[:len(body) // 2 // CHUNK_GRANULARITY * CHUNK_GRANULARITY])
+                return self._reply(503)
+            received.extend(body)
+        else:
+            total = int(content_range.rsplit('/', 1)[1])
+
+        if len(received) >= total:
+            return self._reply(200, b'{"id": "fake-file-id"}')
+        return self._reply(308, range_end=len(received) - 1)
+
+    def _reply(self, status, body=b'', range_end=None):
+        self.send_response(status)
+        if range_end is not None and range_end >= 0:
+            self.send_header('Range', f'bytes=0-{range_end}')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_resumable_upload():
+    server = http.server.ThreadingHTTPServer(('localhost', 0), FakeUploadHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    data = os.urandom(10 * CHUNK_GRANULARITY + 1234)
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        f.write(data)
+        path = f.name
+
+    progress = []
+    try:
+        uploader = ResumableUploader(
+            requests.Session(),
+            upload_url=f'http://localhost:{server.server_port}/upload',
+            chunk_size=2 * CHUNK_GRANULARITY,
+            sleep=lambda seconds: None
+        )
+        with HashingFileReader(path) as reader:
+            result = uploader.upload(reader, len(data), {'name': 'test.mp4'}, 'video/mp4',
+                                     progress=lambda sent, total: progress.append(sent))
+            digest = reader.hexdigest()
+    finally:
+        server.shutdown()
+        os.remove(path)
+
+    assert result == {'id': 'fake-file-id'}
+    assert bytes(FakeUploadHandler.received) == data
+    assert digest == hashlib.sha256(data).hexdigest()
+    assert progress[-1] == len(data)
+    print(f"✓ Uploaded {len(data)} bytes in {FakeUploadHandler.requests_seen} requests with retries")
+
+
+if __name__ == "__main__":
+    test_resumable_upload()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Load-test the Drive upload server with dozens of concurrent monitor requests
+
+The real Flask app is served in-process (waitress if installed, else
+Werkzeug's threaded server) with a fake Drive service, so no credentials
+or network are needed. Checks that /health stays fast while every client
+is waiting, that the thread count does not grow with the number of
+clients, that requests past the pending limit get a 503, and that every
+client eventually receives its own upload.
+"""
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import drive_upload_server_v2 as server
+from monitor_jobs import MonitorJobService
+
+CLIENTS = 48
+UPLOAD_SECONDS = 0.1
+MAX_HEALTH_LATENCY = 0.5
+
+
+class FakeDriveService:
+    """Downloads folder and Drive upload simulated in memory"""
+
+    def __init__(self):
+        self.videos = []
+        self.uploaded = []
+        self.lock = threading.Lock()
+
+    def add_video(self, name):
+        with self.lock:
+            self.videos.append(name)
+
+    def find_latest_video(self, download_dir="~/Downloads", max_age_seconds=60):
+        with self.lock:
+            return self.videos[-1] if self.videos else None
+
+    def upload_file(self, file_path):
+        time.sleep(UPLOAD_SECONDS)
+        with self.lock:
+            # The real service deletes the local file after uploading
+            self.videos.remove(file_path)
+            self.uploaded.append(file_path)
+        return {'success': True, 'download_link': f'https://drive.example/{file_path}', 'file_name': file_path}
+
+
+def start_server():
+    """Serve server.app on a free port; returns (base_url, shutdown)"""
+    if server.WAITRESS_AVAILABLE:
+        from waitress.server import create_server
+        httpd = create_server(server.app, host='localhost', port=0, threads=server.REQUEST_THREADS)
+        threading.Thread(target=httpd.run, daemon=True).start()
+        return f'http://localhost:{httpd.effective_port}', httpd.close
+    from werkzeug.serving import make_server
+    httpd = make_server('localhost', 0, server.app, threaded=True)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return f'http://localhost:{httpd.port}', httpd.shutdown
+
+
+def timed(call, *args, **kwargs):
+    started = time.monotonic()
+    response = call(*args, **kwargs)
+    return response, time.monotonic() - started
+
+
+def health_latencies(base_url, count=20):
+    return [timed(requests.get, f'{base_url}/health', timeout=5)[1] for _ in range(count)]
+
+
+def test_concurrent_monitors(clients=CLIENTS):
+    fake = FakeDriveService()
+    server.jobs = MonitorJobService(lambda: fake, workers=2, max_pending=clients,
+                                    timeout=60, check_interval=0.02, ttl=30)
+    server.jobs.start()
+    base_url, shutdown = start_server()
+    threads_before = threading.active_count()
+
+    try:
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            started = list(pool.map(lambda _: timed(requests.post, f'{base_url}/start-upload-monitor', timeout=5),
+                                    range(clients)))
+        assert all(response.status_code == 200 for response, _ in started)
+        upload_ids = [response.json()['upload_id'] for response, _ in started]
+        assert len(set(upload_ids)) == clients
+        start_latency = max(latency for _, latency in started)
+
+        # Every client is now waiting for a download
+        waiting_health = health_latencies(base_url)
+        thread_growth = threading.active_count() - threads_before
+
+        overflow = requests.post(f'{base_url}/start-upload-monitor', timeout=5)
+        assert overflow.status_code == 503, overflow.status_code
+
+        # Downloads land; each one must go to exactly one client
+        for index in range(clients):
+            fake.add_video(f'video_{index}.mp4')
+
+        pending = set(upload_ids)
+        results = {}
+        busy_health = []
+        deadline = time.monotonic() + 30
+        while pending and time.monotonic() < deadline:
+            for upload_id in list(pending):
+                status = requests.get(f'{base_url}/check-upload-status/{upload_id}', timeout=5).json()
+                if status.get('status') != 'monitoring':
+                    results[upload_id] = status
+                    pending.discard(upload_id)
+            busy_health.extend(health_latencies(base_url, 2))
+            time.sleep(0.1)
+
+        assert not pending, f'{len(pending)} clients never got a result'
+        assert all(result.get('success') for result in results.values())
+        assert len({result['file_name'] for result in results.values()}) == clients
+        # Collected results are dropped right away
+        assert requests.get(f'{base_url}/check-upload-status/{upload_ids[0]}', timeout=5).status_code == 404
+    finally:
+        shutdown()
+        server.jobs.stop()
+
+    worst_health = max(waiting_health + busy_health)
+    print(f"✓ {clients} monitors started (slowest request {start_latency * 1000:.0f} ms)")
+    print(f"✓ /health while waiting: worst {max(waiting_health) * 1000:.0f} ms, "
+          f"during uploads: worst {max(busy_health) * 1000:.0f} ms")
+    print(f"✓ Thread growth with {clients} waiting clients: {thread_growth}")
+    print(f"✓ All {clients} uploads delivered, extra request rejected with 503")
+    assert worst_health < MAX_HEALTH_LATENCY
+    assert thread_growth < clients // 2
+
+
+if __name__ == "__main__":
+    test_concurrent_monitors(int(sys.argv[1]) if len(sys.argv) > 1 else CLIENTS)
@@ -0,0 +1,110 @@
+// Declarative UI hide rules for Google Flow and the Sketch page
+// All rules are compiled into constructed stylesheets adopted at document start,
+// so hidden elements never paint and nothing has to find them again when the page
+// re-renders. Rules with a page only apply on that page ('flow' or 'sketch'); rules
+// with a mode only apply in that Flow mode ('text' or 'asset'), and
+// veoHideRules.setMode() swaps the mode sheet without touching the DOM.
+(function() {
+    if (window.veoHideRules) return;
+
+    const HIDE_RULES = [
+        // Google Cloud logo and the navigation/control containers around it
+        { selector: '.Logo_container__QTJew' },
+        { selector: '.Navigation_navigation__K3ZWw' },
+        { selector: '.FixedPositionControl_topLeft__LnSf_' },
+        // Breadcrumb
+        { selector: '.goSPNE', page: 'flow' },
+        // Profile, Discord and help links
+        { selector: '.gNJurX', page: 'flow' },
+        { selector: 'a[href*="discord"]', page: 'flow' },
+        { selector: 'a[href*="faq"]', page: 'flow' },
+        // Date dividers in the project feed
+        { selector: '[data-veo-date-divider]', page: 'flow' },
+        // Top toolbar: hidden in text mode, kept for the input buttons in asset mode
+        { selector: '.gxAzIM', page: 'flow', mode: 'text' }
+    ];
+
+    const page = location.pathname.includes('/tools/flow') ? 'flow' : 'sketch';
+    const pageRules = HIDE_RULES.filter(rule => !rule.page || rule.page === page);
+
+    function compile(rules) {
+        if (!rules.length) return '';
+        return rules.map(rule => rule.selector).join(',\n') + ' {\n    display: none !important;\n}';
+    }
+
+    function requestedMode() {
+        const hashMatch = location.hash.match(/veo_mode=([^&]*)/);
+        if (hashMatch) return hashMatch[1];
+        try {
+            return sessionStorage.getItem('veo_flow_mode') || 'text';
+        } catch (e) {
+            return 'text';
+        }
+    }
+
+    const baseSheet = new CSSStyleSheet();
+    baseSheet.replaceSync(compile(pageRules.filter(rule => !rule.mode)));
+    const modeSheet = new CSSStyleSheet();
+    let currentMode = null;
+
+    function setMode(mode) {
+        mode = mode === 'asset' ? 'asset' : 'text';
+        if (mode === currentMode) return;
+        currentMode = mode;
+        modeSheet.replaceSync(compile(pageRules.filter(rule => rule.mode === mode)));
+    }
+
+    setMode(requestedMode());
+    document.adoptedStyleSheets = [...document.adoptedStyleSheets, baseSheet, modeSheet];
+
+    // A new mode request in the hash switches rules; clearing the hash keeps the mode
+    window.addEventListener('hashchange', () => {
+        if (location.hash.includes('veo_mode=')) setMode(requestedMode());
+    });
+
+    // A date label sits deep inside its feed item, and every outer list container is
+    // a [data-known-size] too, so :has() cannot pick the item. Mark the nearest one
+    // here instead, only for labels that read as a date, and clear marks left on
+    // items the feed has reused for something else.
+    const DATE_LABEL = '.MqrLh';
+    const DATE_TEXT = /2025년|월|일/;
+
+    function markDateDividers() {
+        document.querySelectorAll('[data-veo-date-divider]').forEach(item => {
+            const label = item.querySelector(DATE_LABEL);
+            if (!label || !DATE_TEXT.test(label.textContent)) item.removeAttribute('data-veo-date-divider');
+        });
+        document.querySelectorAll(DATE_LABEL).forEach(label => {
+            if (!DATE_TEXT.test(label.textContent)) return;
+            const item = label.closest('[data-known-size]') || (label.parentElement && label.parentElement.parentElement);
+            if (item) item.setAttribute('data-veo-date-divider', '');
+        });
+    }
+
+    // Runs on the shared DOM watch, which loads after this early script
+    function watchDateDividers() {
+        if (!window.veoDomWatch) return false;
+        window.veoDomWatch.watch('date_dividers', markDateDividers, { selector: DATE_LABEL, removals: true });
+        return true;
+    }
+
+    // Without it (late injection) mark the current feed once
+    function startDateDividers() {
+        if (!watchDateDividers()) markDateDividers();
+    }
+
+    if (page === 'flow') {
+        if (document.readyState === 'loading') {
+            document.addEventListener('DOMContentLoaded', startDateDividers, { once: true });
+        } else {
+            setTimeout(startDateDividers, 0);
+        }
+    }
+
+    window.veoHideRules = {
+        setMode,
+        mode: () => currentMode,
+        page: () => page,
+        rules: () => pageRules.slice()
+    };
+})();
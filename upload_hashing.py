@@ -0,0 +1,108 @@
+"""Single-pass hashing helpers for uploads (SHA-256 computed while the file is sent)"""
+
+import os
+import io
+import mmap
+import hashlib
+
+# Large reads keep the number of syscalls low for 100+ MB exports
+READ_BUFFER_SIZE = 8 * 1024 * 1024
+
+# Bytes sampled from each end of the file for the quick fingerprint
+FINGERPRINT_SAMPLE_SIZE = 1024 * 1024
+
+
+class HashingFileReader(io.RawIOBase):
+    """Read-only file wrapper that hashes every byte as it is read
+
+    The upload library reads the file sequentially in chunks and may seek back
+    to resend a chunk after an error. Bytes are only hashed once, in order, so
+    the digest stays correct across retries. If anything was skipped the rest
+    of the file is hashed when the digest is requested.
+    """
+
+    def __init__(self, filepath, buffer_size=READ_BUFFER_SIZE):
+        super().__init__()
+        self.filepath = filepath
+        self._file = open(filepath, 'rb', buffering=buffer_size)
+        self._hash = hashlib.sha256()
+        self._hashed_upto = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self._file.seek(offset, whence)
+
+    def tell(self):
+        return self._file.tell()
+
+    def read(self, size=-1):
+        start = self._file.tell()
+        data = self._file.read(size)
+        self._update(start, data)
+        return data
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def _update(self, start, data):
+        end = start + len(data)
+        if start <= self._hashed_upto < end:
+            self._hash.update(memoryview(data)[self._hashed_upto - start:])
+            self._hashed_upto = end
+
+    def hexdigest(self):
+        """SHA-256 of the whole file, reading only what the upload skipped"""
+        size = os.fstat(self._file.fileno()).st_size
+        if self._hashed_upto < size:
+            position = self._file.tell()
+            self._file.seek(self._hashed_upto)
+            for block in iter(lambda: self._file.read(READ_BUFFER_SIZE), b''):
+                self._hash.update(block)
+                self._hashed_upto += len(block)
+            self._file.seek(position)
+        return self._hash.hexdigest()
+
+    def close(self):
+        if not self.closed:
+            self._file.close()
+        super().close()
+
+
+def file_sha256(filepath):
+    """SHA-256 of a file in one pass using mmap"""
+    try:
+        sha256_hash = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return sha256_hash.hexdigest()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                sha256_hash.update(mapped)
+        return sha256_hash.hexdigest()
+    except (OSError, ValueError):
+        return None
+
+
+def quick_fingerprint(filepath, sample_size=FINGERPRINT_SAMPLE_SIZE):
+    """Cheap duplicate candidate key: size plus hash of the first and last sample
+
+    Only reads up to 2 * sample_size bytes. A match must be confirmed with
+    file_sha256 before it is trusted.
+    """
+    try:
+        with open(filepath, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            sample_hash = hashlib.sha256()
+            sample_hash.update(f.read(sample_size))
+            if size > sample_size:
+                f.seek(max(sample_size, size - sample_size))
+                sample_hash.update(f.read(sample_size))
+        return f"{size}:{sample_hash.hexdigest()}"
+    except OSError:
+        return None
@@ -0,0 +1,100 @@
+"""Persistent index of uploaded files keyed by content hash"""
+
+import os
+import sqlite3
+import threading
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    sha256 TEXT PRIMARY KEY,
+    fingerprint TEXT,
+    file_id TEXT NOT NULL,
+    download_link TEXT NOT NULL,
+    size INTEGER,
+    mtime REAL,
+    uploaded_at REAL
+);
+CREATE INDEX IF NOT EXISTS uploads_fingerprint ON uploads (fingerprint);
+"""
+
+_COLUMNS = ('sha256', 'fingerprint', 'file_id', 'download_link', 'size', 'mtime', 'uploaded_at')
+
+
+class UploadIndex:
+    """SQLite map of SHA256 -> Drive file ID, download link, size and mtime
+
+    The database is opened on first use so startup does no disk work, and a
+    repeat download resolves to its existing link without uploading again.
+    Callers confirm the Drive file still exists and remove() stale entries.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def _fetch_one(self, query, params):
+        with self._lock:
+            try:
+                row = self._connection().execute(query, params).fetchone()
+            except sqlite3.Error as e:
+                print(f"Upload index error: {e}")
+                return None
+        return dict(row) if row else None
+
+    def get(self, sha256):
+        """Return the record for a content hash, or None"""
+        return self._fetch_one(f"SELECT {', '.join(_COLUMNS)} FROM uploads WHERE sha256 = ?", (sha256,))
+
+    def find_by_fingerprint(self, fingerprint):
+        """Return the most recent record with this quick fingerprint, or None"""
+        return self._fetch_one(
+            f"SELECT {', '.join(_COLUMNS)} FROM uploads WHERE fingerprint = ? ORDER BY uploaded_at DESC LIMIT 1",
+            (fingerprint,)
+        )
+
+    def record(self, sha256, fingerprint, file_id, download_link, filepath=None):
+        """Store or replace the upload record for a content hash"""
+        size = mtime = None
+        if filepath:
+            try:
+                stat = os.stat(filepath)
+                size, mtime = stat.st_size, stat.st_mtime
+            except OSError:
+                pass
+
+        with self._lock:
+            try:
+                conn = self._connection()
+                conn.execute(
+                    f"INSERT OR REPLACE INTO uploads ({', '.join(_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (sha256, fingerprint, file_id, download_link, size, mtime, time.time())
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"Upload index error: {e}")
+
+    def remove(self, sha256):
+        """Forget a content hash (e.g. when the Drive file is gone)"""
+        with self._lock:
+            try:
+                conn = self._connection()
+                conn.execute("DELETE FROM uploads WHERE sha256 = ?", (sha256,))
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"Upload index error: {e}")
+
+    def close(self):
+        """Close the database if it was opened"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
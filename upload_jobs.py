@@ -0,0 +1,146 @@
+"""Bounded upload job queue served by a pool of worker threads"""
+
+import itertools
+import queue
+import threading
+import time
+
+# Job states
+JOB_QUEUED = 'queued'
+JOB_UPLOADING = 'uploading'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_PENDING = 16
+# How long submit() waits for room before dropping a file
+SUBMIT_TIMEOUT = 10
+
+_STOP = object()
+
+
+class UploadJob:
+    """One file moving through the upload pipeline"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, filepath, filename, fingerprint):
+        self.id = next(self._ids)
+        self.filepath = filepath
+        self.filename = filename
+        self.fingerprint = fingerprint
+        self.state = JOB_QUEUED
+        self.link = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'filename': self.filename,
+            'state': self.state,
+            'link': self.link,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class UploadJobQueue:
+    """queue.Queue of UploadJobs handled by N workers
+
+    Workers block on the queue, so a submitted job starts immediately and an
+    idle queue costs nothing. submit() waits up to SUBMIT_TIMEOUT seconds
+    when max_pending jobs are waiting, then logs and drops the file, so the
+    download watcher is slowed down but never stuck and the queue never grows
+    without bound. handler(job) returns the download link or None.
+    """
+
+    def __init__(self, handler, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING, history=50):
+        self.handler = handler
+        self.worker_count = max(1, workers)
+        self.history = history
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._jobs = {}
+        self._jobs_lock = threading.Lock()
+        self._workers = []
+
+    def start(self):
+        """Start the worker threads"""
+        for index in range(self.worker_count):
+            worker = threading.Thread(target=self._work, name=f'upload-worker-{index + 1}', daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def stop(self, timeout=2):
+        """Ask workers to exit once their current job is finished"""
+        for _ in self._workers:
+            try:
+                self._queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                break
+        for worker in self._workers:
+            worker.join(timeout=timeout)
+        self._workers = []
+
+    def submit(self, filepath, filename, fingerprint, timeout=SUBMIT_TIMEOUT):
+        """Queue a file for upload, waiting up to timeout seconds while the queue is full
+
+        Returns the job, or None if it could not be queued within timeout.
+        """
+        job = UploadJob(filepath, filename, fingerprint)
+        with self._jobs_lock:
+            self._jobs[job.id] = job
+        try:
+            self._queue.put(job, timeout=timeout)
+        except queue.Full:
+            job.state = JOB_FAILED
+            job.error = 'queue full'
+            job.finished_at = time.time()
+            print(f"⚠️  Upload queue still full after {timeout}s, dropping {filename}")
+            self._prune()
+            return None
+        return job
+
+    def jobs(self):
+        """Snapshot of recent jobs, oldest first"""
+        with self._jobs_lock:
+            return [job.to_dict() for job in self._jobs.values()]
+
+    def pending(self):
+        """Number of jobs waiting for a worker"""
+        return self._queue.qsize()
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is _STOP:
+                    return
+                self._run(job)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job):
+        job.state = JOB_UPLOADING
+        job.started_at = time.time()
+        try:
+            job.link = self.handler(job)
+            job.state = JOB_DONE if job.link else JOB_FAILED
+        except Exception as e:
+            job.state = JOB_FAILED
+            job.error = str(e)
+            print(f"Upload worker error: {e}")
+        job.finished_at = time.time()
+        self._prune()
+
+    def _prune(self):
+        """Keep only the most recent finished jobs"""
+        with self._jobs_lock:
+            finished = [job_id for job_id, job in self._jobs.items()
+                        if job.state in (JOB_DONE, JOB_FAILED)]
+            for job_id in finished[:max(0, len(finished) - self.history)]:
+                del self._jobs[job_id]
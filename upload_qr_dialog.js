@@ -11,6 +11,10 @@ let currentDialog = null;
 let shownUploads = new Set();
 let lastShownUploadKey = null;
 let dismissedUploads = new Set(); // Track uploads that user has closed
+let lastUploadEventId = 0; // Highest event ID received from the status server
+let pendingUploadLinks = []; // Links that arrived while another QR code was showing
+let displayedUpload = null; // Upload whose spinner or QR code is on screen
+let activeUploads = new Map(); // Uploads still being sent to Drive -> { percent, seen }
 
 // Function to show loading spinner with video preview
 window.showUploadLoadingSpinner = function(downloadButton) {
@@ -207,6 +211,7 @@ window.showUploadLoadingSpinner = function(downloadButton) {
         font-size: 14px;
         color: #5f6368;
     `;
+    loadingText.className = 'veo-upload-progress-text';
     loadingText.textContent = '링크를 생성하고 있습니다...';
     
     spinnerContainer.appendChild(spinner);
@@ -471,6 +476,7 @@ window.showUploadQRDialog = function(downloadLink) {
             dismissedUploads.add(lastShownUploadKey);
         }
         lastShownUploadKey = null;
+        showNextPendingUpload();
     };
     
     // Assemble elements
@@ -537,6 +543,7 @@ window.showUploadQRDialog = function(downloadLink) {
                 dismissedUploads.add(lastShownUploadKey);
             }
             lastShownUploadKey = null;
+            showNextPendingUpload();
         }
     };
     
@@ -551,6 +558,7 @@ window.showUploadQRDialog = function(downloadLink) {
             }
             lastShownUploadKey = null;
             document.removeEventListener('keydown', handleEscape);
+            showNextPendingUpload();
         }
     };
     document.addEventListener('keydown', handleEscape);
@@ -567,61 +575,203 @@ window.addEventListener('message', (event) => {
     }
 });
 
-// Also check for upload data periodically
+// Show the next QR code that arrived while another one was on screen
+function showNextPendingUpload() {
+    const next = pendingUploadLinks.shift();
+    if (next) {
+        lastShownUploadKey = next.key;
+        displayedUpload = next.upload;
+        window.showUploadQRDialog(next.link);
+        return;
+    }
+    
+    // Another upload is still running: bring its spinner back
+    for (const [upload, active] of activeUploads) {
+        if (Date.now() - active.seen >= 30000) {
+            activeUploads.delete(upload);
+            continue;
+        }
+        displayedUpload = upload;
+        window.showUploadLoadingSpinner();
+        if (active.percent !== null) {
+            updateUploadProgress(active.percent);
+        }
+        return;
+    }
+}
+
+// Show upload percentage under the spinner while the file is sent to Drive
+function updateUploadProgress(percent) {
+    const progressText = currentDialog && currentDialog.querySelector('.veo-upload-progress-text');
+    if (progressText) {
+        progressText.textContent = `링크를 생성하고 있습니다... ${percent}%`;
+    }
+}
+
+// Replace the spinner text when the upload on screen failed
+function showUploadFailure() {
+    const progressText = currentDialog && currentDialog.querySelector('.veo-upload-progress-text');
+    if (progressText) {
+        progressText.textContent = '링크를 만들지 못했습니다. 다시 다운로드해 주세요.';
+    }
+    const spinner = currentDialog && currentDialog.querySelector('.veo-spinner');
+    if (spinner) {
+        spinner.style.display = 'none';
+    }
+}
+
+// Show spinner or QR dialog for an upload event from the status server
+function handleUploadData(data) {
+    if (!data || !data.timestamp) {
+        return;
+    }
+    
+    // Events carry increasing IDs; skip anything already handled
+    if (data.id) {
+        if (data.id <= lastUploadEventId) {
+            return;
+        }
+        lastUploadEventId = data.id;
+    }
+    
+    if (typeof data.progress === 'number') {
+        if (data.upload) {
+            activeUploads.set(data.upload, { percent: data.progress, seen: Date.now() });
+        }
+        // Concurrent uploads all report progress; only the one on screen is shown
+        if (!data.upload || data.upload === displayedUpload) {
+            updateUploadProgress(data.progress);
+        }
+        return;
+    }
+    
+    if (data.failed) {
+        if (data.upload) {
+            activeUploads.delete(data.upload);
+        }
+        if (!data.upload || data.upload === displayedUpload) {
+            showUploadFailure();
+        }
+        return;
+    }
+    
+    if (data.upload) {
+        if (data.link) {
+            activeUploads.delete(data.upload);
+        } else if (data.loading && !activeUploads.has(data.upload)) {
+            activeUploads.set(data.upload, { percent: null, seen: Date.now() });
+        }
+    }
+    
+    // Create unique key for this upload
+    const uploadKey = `${data.timestamp}_${data.link || 'loading'}`;
+    
+    // Check if user has dismissed this upload
+    if (dismissedUploads.has(uploadKey)) {
+        return;
+    }
+    
+    // Check if we've already shown this upload
+    if (shownUploads.has(uploadKey)) {
+        return;
+    }
+    
+    // Only show recent events (within last 30 seconds)
+    const uploadTime = new Date(data.timestamp);
+    const timeDiff = (new Date() - uploadTime) / 1000; // seconds
+    if (timeDiff >= 30) {
+        return;
+    }
+    
+    shownUploads.add(uploadKey);
+    
+    // Don't replace a QR code someone may still be scanning
+    const showingQR = currentDialog && currentDialog.isConnected && !currentDialog.querySelector('.veo-spinner');
+    if (showingQR) {
+        if (data.link) {
+            pendingUploadLinks.push({ key: uploadKey, link: data.link, upload: data.upload });
+        }
+        return;
+    }
+    
+    // Keep the spinner of an upload that is still running; this one waits its turn
+    const showingSpinner = currentDialog && currentDialog.isConnected && currentDialog.querySelector('.veo-spinner');
+    if (data.loading && showingSpinner && displayedUpload && displayedUpload !== data.upload &&
+        activeUploads.has(displayedUpload)) {
+        return;
+    }
+    
+    lastShownUploadKey = uploadKey;
+    displayedUpload = data.upload || null;
+    
+    if (data.loading) {
+        // New upload starting - showing spinner
+        window.showUploadLoadingSpinner();
+    } else if (data.link) {
+        // New upload detected
+        window.showUploadQRDialog(data.link);
+    }
+}
+
+// Fallback: catch up on upload events by polling
 async function checkForUploadComplete() {
     // Use only port 8888
     const port = 8888;
     
     try {
-        const response = await fetch(`http://localhost:${port}/latest_upload.json?` + Date.now());
+        const response = await fetch(`http://localhost:${port}/events.json?since=${lastUploadEventId}&t=` + Date.now());
         if (response.ok) {
-                const data = await response.json();
-                // Fetched upload data
-                if (data.timestamp) {
-                    // Create unique key for this upload
-                    const uploadKey = `${data.timestamp}_${data.link || 'loading'}`;
-                    
-                    // Check if user has dismissed this upload
-                    if (dismissedUploads.has(uploadKey)) {
-                        // User dismissed this upload
-                        return;
-                    }
-                    
-                    // Check if we've already shown this upload
-                    if (!shownUploads.has(uploadKey)) {
-                        // Check if this is a recent event (within last 30 seconds)
-                        const uploadTime = new Date(data.timestamp);
-                        const now = new Date();
-                        const timeDiff = (now - uploadTime) / 1000; // seconds
-                        // Time diff check
-                        
-                        if (timeDiff < 30) {  // Show uploads from last 30 seconds
-                            shownUploads.add(uploadKey);
-                            lastShownUploadKey = uploadKey;
-                            
-                            if (data.loading) {
-                                // New upload starting - showing spinner
-                                window.showUploadLoadingSpinner();
-                            } else if (data.link) {
-                                // New upload detected
-                                window.showUploadQRDialog(data.link);
-                            }
-                        } else {
-                            // Upload too old
-                        }
-                    } else {
-                        // Already shown this upload
-                    }
-                }
-            }
-        } catch (error) {
-            // Server not responding on port 8888
+            const data = await response.json();
+            (data.events || []).forEach(handleUploadData);
         }
+    } catch (error) {
+        // Server not responding on port 8888
     }
+}
 
-// Clear any existing interval before creating new one
+function startUploadPolling() {
+    if (!window.uploadCheckInterval) {
+        // Check every 2 seconds (less frequent to reduce logs)
+        window.uploadCheckInterval = setInterval(checkForUploadComplete, 2000);
+    }
+}
+
+// Subscribe once to the server's event stream; events arrive as soon as they happen
+// and a reconnecting EventSource resumes from Last-Event-ID without missing any
+function subscribeToUploadEvents() {
+    if (!window.EventSource) {
+        startUploadPolling();
+        return;
+    }
+    
+    const source = new EventSource('http://localhost:8888/events');
+    window.uploadEventSource = source;
+    
+    source.onmessage = (event) => {
+        try {
+            handleUploadData(JSON.parse(event.data));
+        } catch (error) {
+            // Ignore malformed events
+        }
+    };
+    
+    source.onerror = () => {
+        // EventSource reconnects by itself; only fall back if it gave up
+        if (source.readyState === source.CLOSED) {
+            window.uploadEventSource = null;
+            startUploadPolling();
+        }
+    };
+}
+
+// Clear any existing subscription before creating a new one
 if (window.uploadCheckInterval) {
     clearInterval(window.uploadCheckInterval);
+    window.uploadCheckInterval = null;
+}
+if (window.uploadEventSource) {
+    window.uploadEventSource.close();
+    window.uploadEventSource = null;
 }
 
 // Check if we should enable upload monitoring
@@ -638,8 +788,7 @@ if (window.disableUploadMonitoring) {
     .then(response => {
         if (response.ok) {
             console.log('✅ Upload server detected on port 8888 - monitoring enabled');
-            // Check every 2 seconds (less frequent to reduce logs)
-            window.uploadCheckInterval = setInterval(checkForUploadComplete, 2000);
+            subscribeToUploadEvents();
         } else {
             console.log('⚠️ Upload server responded but not ready');
         }
@@ -648,7 +797,7 @@ if (window.disableUploadMonitoring) {
         // This is expected if no server is running
         console.log('ℹ️ Upload server not available - automatic upload monitoring disabled');
         console.log('💡 To enable uploads, ensure oauth_drive_service.py is running');
-        // Don't set up interval if server is not available
+        // Don't subscribe if server is not available
         window.disableUploadMonitoring = true;
     });
 }
@@ -658,6 +807,9 @@ window.addEventListener('beforeunload', () => {
     if (window.uploadCheckInterval) {
         clearInterval(window.uploadCheckInterval);
     }
+    if (window.uploadEventSource) {
+        window.uploadEventSource.close();
+    }
 });
 
 // Dialog handler ready - will show spinner and QR dialog when videos are uploaded
@@ -0,0 +1,189 @@
+"""Upload status server: event history, catch-up queries and a Server-Sent Events push channel"""
+
+import collections
+import json
+import platform
+import sys
+import threading
+import http.server
+import urllib.parse
+
+STATUS_PORT = 8888
+
+# Seconds between SSE keepalive comments (also how often dead clients are noticed)
+KEEPALIVE_INTERVAL = 15
+
+# Number of recent events kept for clients catching up with ?since=<id>
+EVENT_HISTORY = 100
+
+
+class UploadEventHub:
+    """Ring buffer of upload events with monotonically increasing IDs
+
+    Subscribers remember the last ID they saw and ask for everything after it,
+    so two uploads finishing close together are both delivered.
+    """
+
+    def __init__(self, history=EVENT_HISTORY):
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._events = collections.deque(maxlen=history)
+        self.closed = False
+
+    def publish(self, data):
+        """Append a new event and wake every waiting subscriber"""
+        with self._cond:
+            self._seq += 1
+            event = dict(data, id=self._seq)
+            self._events.append(event)
+            self._cond.notify_all()
+            return event
+
+    def latest(self):
+        """The most recent event, or None"""
+        with self._cond:
+            return self._events[-1] if self._events else None
+
+    def last_id(self):
+        """ID of the most recent event (0 before the first one)"""
+        with self._cond:
+            return self._seq
+
+    def events_since(self, since_id):
+        """Buffered events with an ID greater than since_id, oldest first"""
+        with self._cond:
+            return [event for event in self._events if event['id'] > since_id]
+
+    def history_for(self, upload):
+        """All buffered events that belong to one upload"""
+        with self._cond:
+            return [event for event in self._events if event.get('upload') == upload]
+
+    def wait_since(self, since_id, timeout):
+        """Block until events newer than since_id exist; [] on timeout or close"""
+        with self._cond:
+            self._cond.wait_for(lambda: self.closed or self._seq > since_id, timeout)
+            if self.closed:
+                return []
+            return [event for event in self._events if event['id'] > since_id]
+
+    def close(self):
+        """Release all waiting subscribers"""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class UploadStatusHandler(http.server.BaseHTTPRequestHandler):
+    """Serves /latest_upload.json, /events.json?since=<id> and the /events SSE stream"""
+
+    hub = None
+
+    def do_OPTIONS(self):
+        # Chrome sends a Private Network Access preflight from https pages
+        self.send_response(204)
+        self._send_cors_headers()
+        self.send_header('Access-Control-Allow-Methods', 'GET')
+        self.send_header('Access-Control-Allow-Headers', '*')
+        self.end_headers()
+
+    def do_GET(self):
+        parsed = urllib.parse.urlparse(self.path)
+        params = urllib.parse.parse_qs(parsed.query)
+
+        if parsed.path == '/latest_upload.json':
+            self._send_json(self.hub.latest() or {})
+        elif parsed.path == '/events.json':
+            since_id = self._since_id(params)
+            events = self.hub.events_since(since_id if since_id is not None else 0)
+            self._send_json({'events': events, 'last_id': self.hub.last_id()})
+        elif parsed.path == '/uploads.json' and 'upload' in params:
+            self._send_json({'events': self.hub.history_for(params['upload'][0])})
+        elif parsed.path == '/events':
+            self._stream_events(self._since_id(params))
+        else:
+            self.send_response(404)
+            self.end_headers()
+
+    def _since_id(self, params):
+        """?since=<id>, else the Last-Event-ID sent by a reconnecting EventSource"""
+        value = params.get('since', [None])[0] or self.headers.get('Last-Event-ID')
+        try:
+            return int(value) if value is not None else None
+        except ValueError:
+            return None
+
+    def _send_cors_headers(self):
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Private-Network', 'true')
+
+    def _send_json(self, data):
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self._send_cors_headers()
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream_events(self, since_id):
+        self.send_response(200)
+        self.send_header('Content-type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self._send_cors_headers()
+        self.end_headers()
+
+        try:
+            self.wfile.write(b'retry: 1000\n\n')
+
+            if since_id is None:
+                # New subscriber: replay only the current state
+                latest = self.hub.latest()
+                pending = [latest] if latest else []
+                since_id = self.hub.last_id()
+            else:
+                # Catch up on everything missed since since_id
+                pending = self.hub.events_since(since_id)
+
+            while True:
+                for event in pending:
+                    self._write_event(event)
+                    since_id = event['id']
+                if self.hub.closed:
+                    break
+
+                pending = self.hub.wait_since(since_id, KEEPALIVE_INTERVAL)
+                if not pending:
+                    self.wfile.write(b': keepalive\n\n')
+                    self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+            pass  # Browser closed the stream
+
+    def _write_event(self, event):
+        self.wfile.write(f"id: {event['id']}\ndata: {json.dumps(event)}\n\n".encode())
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass  # Suppress logging
+
+
+class UploadStatusServer(http.server.ThreadingHTTPServer):
+    """One thread per connection, so a slow client or open stream never blocks others"""
+
+    daemon_threads = True
+    allow_reuse_address = platform.system() != 'Windows'
+
+    def handle_error(self, request, client_address):
+        """Suppress connection abort errors when the browser goes away"""
+        exc_type, exc_value = sys.exc_info()[:2]
+        if exc_type in (ConnectionAbortedError, ConnectionResetError, BrokenPipeError):
+            return
+        if platform.system() == 'Windows' and getattr(exc_value, 'errno', None) in (10053, 10054):
+            return
+        super().handle_error(request, client_address)
+
+
+def create_status_server(hub, port=STATUS_PORT):
+    """Create (but do not start) the status server bound to localhost:port"""
+    handler = type('BoundUploadStatusHandler', (UploadStatusHandler,), {'hub': hub})
+    return UploadStatusServer(('localhost', port), handler)
@@ -107,33 +107,8 @@
         }
     }
     
-    // Start monitoring with interval
-    const checkInterval = setInterval(monitorForButton, 500); // Check every 500ms
-    
-    // Also use MutationObserver for immediate detection
-    const observer = new MutationObserver((mutations) => {
-        // Quick check if any mutation might have added the button
-        for (const mutation of mutations) {
-            if (mutation.type === 'childList') {
-                for (const node of mutation.addedNodes) {
-                    if (node.nodeType === 1) { // Element node
-                        // Check if it's a button or contains buttons
-                        if (node.tagName === 'BUTTON' || 
-                            (node.querySelector && node.querySelector('button'))) {
-                            monitorForButton();
-                            break;
-                        }
-                    }
-                }
-            }
-        }
-    });
-    
-    // Start observing
-    observer.observe(document.body, {
-        childList: true,
-        subtree: true
-    });
+    // Check whenever a button (e.g. the switch toast) is rendered or its label changes
+    const watcher = veoDomWatch.watch('veo2_auto_switcher', monitorForButton, { selector: 'button', text: true });
     
     // Add keyboard shortcut to toggle monitoring (Ctrl+Shift+V)
     document.addEventListener('keydown', (e) => {
@@ -148,8 +123,7 @@
     // Cleanup function
     window.veo2AutoSwitcherCleanup = function() {
         isMonitoring = false;
-        clearInterval(checkInterval);
-        observer.disconnect();
+        watcher.stop();
         console.log('🛑 Veo 2 Auto-Switcher stopped');
     };
     